@@ -1,35 +1,131 @@
-from flask import Flask, render_template, request, make_response, jsonify
-from src.core.nlp_pipeline import process_scrolls
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-import plotly.io as pio
+from flask import Flask, render_template, request, make_response, Response, stream_with_context, g
+from flask.json.provider import DefaultJSONProvider
+from src.core.nlp_pipeline import process_scrolls, FIELDS as PIPELINE_FIELDS, MODES as PIPELINE_MODES, PIPELINE_FINGERPRINT
 import os
+import hashlib
 import json
+import re
 from werkzeug.utils import secure_filename
 import tempfile
 import pathlib
-from src.services.processing_service import analyze_text
+import functools
+import math
+import queue
+import threading
+import time
+from src.services.processing_service import analyze_text, analyze_text_with_context
+from src.services.analysis_store import make_store as make_analysis_store
+from src.services.comparison_service import analyze_sides, combine_results, compare_results, cure_effectiveness
+from src.services.exports import (PYARROW_AVAILABLE, cure_batches, cure_schema, encode_chunks, gzip_chunks,
+                                  iter_arrow, iter_csv, iter_json, iter_parquet, iter_txt, record_batches,
+                                  record_schema)
+from src.utils.cache import TTLCache, SingleFlight
 from src.utils.logging import get_logger
+from src.utils.rate_limit import make_limiter
+from src.utils.profiling import RequestProfiler
+from src.nlp.parallel import configure as configure_parallel_parse
+from src.nlp.rule_based import configure_memo as configure_line_memo
+from src.nlp.facets import FACETS as RECORD_FACETS, SORT_KEYS as RECORD_SORT_KEYS
+from src.nlp.table import RecordTable
+from src.utils.http import choose_encoding, compress, content_etag
+from src.utils.serialization import configure as configure_json, default as json_default, dumps as json_dumps
+from src.utils.metrics import REGISTRY, PROMETHEUS_CONTENT_TYPE, HTTP_REQUESTS, HTTP_SECONDS, timed_stage, collect_timings
+from src.utils.resources import module_available
+from config.settings import settings
 
-try:
-    from PyPDF2 import PdfReader
-    PYPDF2_AVAILABLE = True
-except Exception:
-    PYPDF2_AVAILABLE = False
+# Upload / PDF export libraries are imported by the handlers that use them
+PYPDF2_AVAILABLE = module_available('PyPDF2')
+FPDF_AVAILABLE = module_available('fpdf')
 
-try:
-    from fpdf import FPDF
-    FPDF_AVAILABLE = True
-except Exception:
-    FPDF_AVAILABLE = False
 
+class _JSONProvider(DefaultJSONProvider):
+    """Flask JSON (jsonify, |tojson) through the app's encoder (src/utils/serialization.py)."""
 
-from config.settings import settings
+    def dumps(self, obj, **kwargs):
+        if kwargs:  # explicit json.dumps options (indent, sort_keys, ...): stdlib behaviour
+            kwargs.setdefault('default', json_default)
+            return json.dumps(obj, **kwargs)
+        return json_dumps(obj).decode('utf-8')
+
+    def response(self, *args, **kwargs):
+        return json_response(self._prepare_response_obj(args, kwargs))
+
+
+def json_response(obj, status=200, headers=None):
+    """JSON response for every API route; encoding is timed as the 'serialize' stage."""
+    with timed_stage('serialize') as info:
+        body = json_dumps(obj)
+        info['bytes'] = len(body)
+    return Response(body, status=status, headers=headers, mimetype='application/json')
+
+
+configure_json(settings.JSON_BACKEND)
 app = Flask(__name__)
+app.json = _JSONProvider(app)
 logger = get_logger()
 GROQ_API_KEY = settings.GROQ_API_KEY
 
+# Token-bucket rate limiters (per client IP). Buckets are evicted once idle and can be
+# shared across workers with RATE_LIMIT_BACKEND=sqlite.
+_RAG_LIMITER = make_limiter('ask-rag', settings.RAG_RATE_PER_MIN,
+                            backend=settings.RATE_LIMIT_BACKEND, path=settings.RATE_LIMIT_DB)
+_PROCESS_LIMITER = make_limiter('process', settings.PROCESS_RATE_PER_MIN,
+                                backend=settings.RATE_LIMIT_BACKEND, path=settings.RATE_LIMIT_DB)
+
+
+_PROFILER = RequestProfiler(settings.PROFILE_DIR, token=settings.PROFILE_TOKEN,
+                            sample_rate=settings.PROFILE_SAMPLE_RATE,
+                            max_files=settings.PROFILE_MAX_FILES, max_age=settings.PROFILE_MAX_AGE)
+
+# Finished analyses that /api/records/query can filter and page through.
+_ANALYSES = make_analysis_store(settings.ANALYSIS_STORE_BACKEND, settings.ANALYSIS_STORE_PATH or None,
+                                maxsize=settings.ANALYSIS_STORE_SIZE, ttl=settings.ANALYSIS_STORE_TTL)
+
+# Large uploads are parsed on a process pool (see src/nlp/parallel.py).
+configure_parallel_parse(workers=settings.PARSE_WORKERS, min_bytes=settings.PARSE_PARALLEL_MIN_BYTES)
+configure_line_memo(settings.LINE_MEMO_SIZE)
+
+
+def profiled(view):
+    """Run the view under cProfile when requested by an admin or sampled.
+
+    The stored profile id is returned in the ``X-Profile-Id`` response header.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        # only POSTs are profiled; don't spend a sample (or a token check) on anything else
+        if request.method != 'POST':
+            return view(*args, **kwargs)
+        supplied = request.headers.get('X-Profile-Token') or request.args.get('profile')
+        enabled, reason = _PROFILER.should_profile(supplied)
+        if not enabled:
+            return view(*args, **kwargs)
+        # cache the body so form/JSON parsing in the view still sees it
+        body = request.get_data(cache=True)
+        meta = {'path': request.path, 'method': request.method, 'reason': reason}
+        rv, profile_id = _PROFILER.run(lambda: view(*args, **kwargs), body, meta)
+        resp = make_response(rv)
+        resp.headers['X-Profile-Id'] = profile_id
+        return resp
+    return wrapper
+
+
+def rate_limited(limiter, methods=('POST',)):
+    """Reject requests over ``limiter``'s budget with 429 and a Retry-After header."""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method in methods:
+                allowed, retry_after = limiter.check(request.remote_addr or 'unknown')
+                if not allowed:
+                    resp = json_response({'error': 'Rate limit exceeded. Try again later.'}, 429)
+                    resp.headers['Retry-After'] = str(max(1, int(math.ceil(retry_after))))
+                    return resp
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
 SAMPLE_TEXT = """
 Healer A used herb willow for fever, it worked well.
 Healer B used honey for cough, patients improved.
@@ -42,81 +138,69 @@ Healer John used saltwater for fever — it didn't help.
 # Word cloud removed — server-side word cloud generation was removed per request.
 
 
-@app.route('/app', methods=['GET', 'POST'])
-def index():
-    text = SAMPLE_TEXT
-    table_html = None
-    pos_div = None
-    neg_div = None
-    summary = None
-
-    if request.method == 'POST':
-        # accept textarea or file upload (pdf, json, txt)
-        uploaded = request.files.get('file')
-        text = request.form.get('text', '')
-        if uploaded and uploaded.filename:
-            filename = secure_filename(uploaded.filename)
-            ext = os.path.splitext(filename)[1].lower()
-            if ext == '.pdf' and PYPDF2_AVAILABLE:
-                try:
-                    reader = PdfReader(uploaded.stream)
-                    pages = [p.extract_text() or '' for p in reader.pages]
-                    text = '\n'.join(pages)
-                except Exception:
-                    text = uploaded.stream.read().decode('utf-8', errors='ignore')
-            elif ext == '.json':
-                try:
-                    j = json.load(uploaded.stream)
-                    # if it's a list of strings
-                    if isinstance(j, list):
-                        text = '\n'.join([str(x) for x in j])
-                    elif isinstance(j, dict):
-                        # join values
-                        text = '\n'.join([str(v) for v in j.values()])
-                    else:
-                        text = str(j)
-                except Exception:
-                    text = uploaded.stream.read().decode('utf-8', errors='ignore')
-            else:
-                # treat as text
+def _read_upload(uploaded):
+    """Extract text from an uploaded pdf, json or text file."""
+    filename = secure_filename(uploaded.filename)
+    ext = os.path.splitext(filename)[1].lower()
+    if ext == '.pdf' and PYPDF2_AVAILABLE:
+        with timed_stage('pdf_extract') as st:
+            try:
+                from PyPDF2 import PdfReader
+                reader = PdfReader(uploaded.stream)
+                pages = [p.extract_text() or '' for p in reader.pages]
+                text = '\n'.join(pages)
+            except Exception:
                 text = uploaded.stream.read().decode('utf-8', errors='ignore')
+            st['bytes'] = len(text)
+        return text
+    with timed_stage('upload_decode') as st:
+        if ext == '.json':
+            try:
+                j = json.load(uploaded.stream)
+                # if it's a list of strings
+                if isinstance(j, list):
+                    text = '\n'.join([str(x) for x in j])
+                elif isinstance(j, dict):
+                    # join values
+                    text = '\n'.join([str(v) for v in j.values()])
+                else:
+                    text = str(j)
+            except Exception:
+                text = uploaded.stream.read().decode('utf-8', errors='ignore')
+        else:
+            # treat as text
+            text = uploaded.stream.read().decode('utf-8', errors='ignore')
+        st['bytes'] = len(text)
+    return text
 
-        # Process text and render results page
-        result = analyze_text(text)
-        result.setdefault('records', [])
-        result.setdefault('cures_pos_counts', {})
-        result.setdefault('cures_neg_counts', {})
-        result.setdefault('keywords', [])
-        result.setdefault('summary', '')
 
-        # compute percent effectiveness and insight one-liner
-        pos = result.get('cures_pos_counts', {})
-        neg = result.get('cures_neg_counts', {})
-        all_cures = set(list(pos.keys()) + list(neg.keys()))
-        effectiveness = {}
-        for c in all_cures:
-            p = int(pos.get(c, 0))
-            n = int(neg.get(c, 0))
-            total = p + n
-            pct = int((p / total) * 100) if total > 0 else 0
-            effectiveness[c] = {'pos': p, 'neg': n, 'total': total, 'pct': pct}
-
-        # strongest cure: highest pct (require at least 1 total), tie-breaker by pos count
-        strongest = None
-        most_failed = None
-        if effectiveness:
-            strongest = max(all_cures, key=lambda k: (effectiveness[k]['pct'], effectiveness[k]['pos']))
-            most_failed = max(all_cures, key=lambda k: (effectiveness[k]['neg'], effectiveness[k]['total']))
-
-        insight_parts = []
-        if strongest and effectiveness[strongest]['total'] > 0:
-            insight_parts.append(f"Strongest cure: {strongest} ({effectiveness[strongest]['pct']}% effective)")
-        if most_failed and effectiveness[most_failed]['neg'] > 0:
-            insight_parts.append(f"Most failed cure: {most_failed} ({effectiveness[most_failed]['neg']} failures)")
-        result['insight'] = ' • '.join(insight_parts) if insight_parts else result.get('summary','')
-
-        # Create Plotly bar charts server-side
+def _add_insight_and_charts(result):
+    """Add effectiveness insight and server-side Plotly chart divs to ``result``."""
+    # compute percent effectiveness and insight one-liner
+    pos = result.get('cures_pos_counts', {})
+    neg = result.get('cures_neg_counts', {})
+    effectiveness = cure_effectiveness(pos, neg)
+    all_cures = set(effectiveness)
+
+    # strongest cure: highest pct (require at least 1 total), tie-breaker by pos count
+    strongest = None
+    most_failed = None
+    if effectiveness:
+        strongest = max(all_cures, key=lambda k: (effectiveness[k]['pct'], effectiveness[k]['pos']))
+        most_failed = max(all_cures, key=lambda k: (effectiveness[k]['neg'], effectiveness[k]['total']))
+
+    insight_parts = []
+    if strongest and effectiveness[strongest]['total'] > 0:
+        insight_parts.append(f"Strongest cure: {strongest} ({effectiveness[strongest]['pct']}% effective)")
+    if most_failed and effectiveness[most_failed]['neg'] > 0:
+        insight_parts.append(f"Most failed cure: {most_failed} ({effectiveness[most_failed]['neg']} failures)")
+    result['insight'] = ' • '.join(insight_parts) if insight_parts else result.get('summary','')
+
+    # Create Plotly bar charts server-side
+    with timed_stage('charts', records=len(result.get('records', []))):
         try:
+            import plotly.graph_objects as go
+            import plotly.io as pio
             # Positive chart
             pos_items = sorted(pos.items(), key=lambda x: x[1], reverse=True)
             pos_names = [k for k, v in pos_items]
@@ -139,8 +223,66 @@ def index():
             result.setdefault('pos_chart_div', '')
             result.setdefault('neg_chart_div', '')
 
+
+def _render_result(result, context=None):
+    """Render result.html with only the first page of records.
+
+    The records are stored (see /api/records/query) and the page fetches further
+    pages, sorted and filtered server-side, as the user scrolls. Network and timeline data are
+    aggregated here instead of shipping every record to the browser. The pipeline
+    ``context`` is stored with them so an edit of the text is re-analyzed incrementally.
+    The page embeds the input text once (the edit form); the cleaned text that record
+    offsets point into is stored too and fetched from /api/records/source on demand.
+    """
+    records = result.get('records', [])
+    with timed_stage('analysis_store', records=len(records)):
+        stored = _ANALYSES.put(records, scores=result.get('sentiment_scores'),
+                               meta={'clean_text': result.get('clean_text', '')}, context=context)
+    sort = _parse_sort(request.args.get('sort', settings.RESULT_SORT), stored) or ('index', False)
+    view = stored.index.query(sort=sort[0], descending=sort[1], page_size=min(settings.RESULT_PAGE_SIZE, settings.RECORDS_MAX_PAGE_SIZE), facet_limit=0)
+    view['analysis_id'] = stored.id
+    view['sort'] = ('-' if sort[1] else '') + sort[0]
+    view['network'] = [{'healer': h, 'cure': c, 'count': n}
+                       for h, c, n in stored.table.pair_counts('healer', 'cure', limit=settings.RESULT_NETWORK_EDGES)]
+    view['timeline'] = stored.table.running_effectiveness()
+    healers = stored.index.facet_counts(None, limit=settings.RESULT_FILTER_OPTIONS)['healer']
+    view['healers'] = sorted(healers.items())
+    with timed_stage('render', records=len(records), nbytes=len(result.get('original_text', ''))):
+        return render_template('result.html', result=result, view=view)
+
+
+@app.route('/app', methods=['GET', 'POST'])
+@rate_limited(_PROCESS_LIMITER)
+@profiled
+def index():
+    text = SAMPLE_TEXT
+    table_html = None
+    pos_div = None
+    neg_div = None
+    summary = None
+
+    if request.method == 'POST':
+        # accept textarea or file upload (pdf, json, txt)
+        uploaded = request.files.get('file')
+        text = request.form.get('text', '')
+        if uploaded and uploaded.filename:
+            text = _read_upload(uploaded)
+
+        # Process text and render results page (clean_text backs source highlighting).
+        # An edit of an earlier result (previous_id) only re-analyzes what changed.
+        previous = _ANALYSES.get(request.form.get('previous_id', ''))
+        result, context = analyze_text_with_context(text, PIPELINE_FIELDS + ('clean_text',),
+                                                    previous=previous.context if previous else None)
+        result.setdefault('records', [])
+        result.setdefault('cures_pos_counts', {})
+        result.setdefault('cures_neg_counts', {})
+        result.setdefault('keywords', [])
+        result.setdefault('summary', '')
+
+        _add_insight_and_charts(result)
+
         result['original_text'] = text
-        return render_template('result.html', result=result)
+        return _render_result(result, context)
 
     # For GET requests render the input form
     return render_template('index.html', text=text, table_html=table_html, pos_div=pos_div, neg_div=neg_div, summary=summary)
@@ -154,11 +296,99 @@ def landing():
 # Lightweight JSON health endpoint
 @app.route('/health', methods=['GET'])
 def health():
-    return jsonify({'status': 'ok'})
+    return json_response({'status': 'ok'})
+
+
+@app.before_request
+def _start_request_timer():
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def _record_request_metrics(response):
+    started = getattr(g, 'request_started', None)
+    endpoint = request.endpoint or 'unknown'
+    if started is not None:
+        HTTP_SECONDS.observe(time.perf_counter() - started, endpoint=endpoint)
+    HTTP_REQUESTS.inc(endpoint=endpoint, method=request.method, status=response.status_code)
+    return response
+
+
+_COMPRESSIBLE = ('text/html', 'application/json')
+
+
+@app.after_request
+def _compress_response(response):
+    """Negotiated br/gzip for HTML and JSON bodies of at least COMPRESS_MIN_BYTES.
+
+    Streamed responses (exports) handle their own encoding. A strong ETag gets the
+    coding appended (``"<tag>-gzip"``), since the compressed bytes differ.
+    """
+    if (response.status_code != 200 or response.is_streamed or response.direct_passthrough
+            or 'Content-Encoding' in response.headers or response.mimetype not in _COMPRESSIBLE):
+        return response
+    response.vary.add('Accept-Encoding')
+    body = response.get_data()
+    encoding = choose_encoding(request.accept_encodings.quality, settings.COMPRESSION)
+    if encoding is None or len(body) < settings.COMPRESS_MIN_BYTES:
+        return response
+    with timed_stage('compress', nbytes=len(body)):
+        response.set_data(compress(body, encoding, settings.COMPRESS_LEVEL))
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(f'{etag}-{encoding}')
+    return response
+
+
+def _not_modified(etag):
+    """304 for an ``If-None-Match`` naming ``etag`` in any of its content-codings, else None."""
+    tags = request.if_none_match
+    if tags and (tags.contains(etag) or any(tags.contains(f'{etag}-{e}') for e in ('br', 'gzip'))):
+        resp = Response(status=304)
+        resp.set_etag(etag)
+        resp.vary.add('Accept-Encoding')
+        return resp
+    return None
+
+
+# Prometheus scrape endpoint (per-worker counters and stage histograms)
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return Response(REGISTRY.render(), mimetype=PROMETHEUS_CONTENT_TYPE)
 
 
 # JSON API: synchronous processing endpoint
+def _request_option(name):
+    """``?name=`` query value, else the JSON body's ``name`` (None if neither is given)."""
+    raw = request.args.get(name)
+    if raw is None and request.is_json:
+        data = request.get_json(silent=True)
+        if isinstance(data, dict):
+            raw = data.get(name)
+    return raw
+
+
+def _requested_fields():
+    """Fields named by ``?fields=a,b`` or a JSON ``fields`` list/string; None means all.
+
+    Entries that are not strings (or a ``fields`` that is neither a list nor a string)
+    are returned as they are, for the caller to report as unknown.
+    """
+    raw = _request_option('fields')
+    if raw is None:
+        return None
+    if isinstance(raw, str):
+        raw = raw.split(',')
+    elif not isinstance(raw, list):
+        return [raw]
+    fields = [f.strip() if isinstance(f, str) else f for f in raw]
+    return [f for f in fields if f != ''] or None
+
+
 @app.route('/api/process', methods=['POST'])
+@rate_limited(_PROCESS_LIMITER)
+@profiled
 def api_process():
     """Accept JSON or form data with a 'text' field and return JSON processing result.
 
@@ -181,27 +411,197 @@ def api_process():
                 text = None
 
     if not text or not str(text).strip():
-        return make_response((json.dumps({'error': 'no text provided'}), 400, {'Content-Type': 'application/json'}))
+        return json_response({'error': 'no text provided'}, 400)
+
+    # optional per-stage timing breakdown: ?timings=1 or {"timings": true}
+    want_timings = request.args.get('timings') in ('1', 'true') or (
+        request.is_json and (request.get_json(silent=True) or {}).get('timings') is True)
+
+    # optional field selection: ?fields=records,cures_pos_counts or {"fields": [...]}
+    fields = _requested_fields()
+    if fields is not None:
+        unknown = [f for f in fields if not isinstance(f, str) or f not in PIPELINE_FIELDS and f != 'original_text']
+        if unknown:
+            return json_response({'error': 'unknown_fields', 'unknown': unknown,
+                                  'valid': list(PIPELINE_FIELDS) + ['original_text']}, 400)
+
+    # latency budget: ?mode=fast|balanced|full and ?deadline_ms=N (or the same JSON keys)
+    mode = _request_option('mode') or settings.PIPELINE_MODE
+    if not isinstance(mode, str) or mode not in PIPELINE_MODES:
+        return json_response({'error': 'unknown_mode', 'valid': list(PIPELINE_MODES)}, 400)
+    deadline_ms = _request_option('deadline_ms')
+    try:
+        deadline_ms = float(deadline_ms) if deadline_ms is not None else None
+    except (TypeError, ValueError):
+        deadline_ms = -1
+    if deadline_ms is not None and (deadline_ms < 0 or not math.isfinite(deadline_ms)):
+        return json_response({'error': 'invalid_deadline_ms'}, 400)
+
+    # ?format=columnar: records as parallel arrays (categoricals as codes + dictionary);
+    # ?original_text=0 (or {"original_text": false}) leaves out the echoed input
+    fmt = _request_option('format') or 'rows'
+    if fmt not in ('rows', 'columnar'):
+        return json_response({'error': 'unknown_format', 'valid': ['rows', 'columnar']}, 400)
+    echo_text = str(_request_option('original_text')).lower() not in ('0', 'false')
+
+    # ?store=1 or {"store": true}: keep the records for /api/records/query and return analysis_id
+    store = str(_request_option('store')).lower() in ('1', 'true')
+    # ?previous=<analysis_id>: incremental re-analysis of an edit of that stored analysis (a full
+    # run when the analysis was stored by another worker, which keeps its pipeline context)
+    previous_id = _request_option('previous')
+    previous = _ANALYSES.get(str(previous_id)) if previous_id else None
+    if previous_id and previous is None:
+        return json_response({'error': 'unknown_analysis'}, 404)
+    pipeline_fields = [f for f in fields if f != 'original_text'] if fields is not None else None
+    if store and pipeline_fields is not None and 'records' not in pipeline_fields:
+        pipeline_fields.append('records')
+
+    # Strong ETag over everything that determines the response; If-None-Match answers 304
+    # before any processing. Not for responses that differ per call (timings, stored ids,
+    # deadline-dependent degradation).
+    etag = None
+    if not (want_timings or store or previous or deadline_ms or (deadline_ms is None and settings.PIPELINE_DEADLINE_MS)):
+        etag = content_etag(PIPELINE_FINGERPRINT, text, ','.join(fields) if fields is not None else '*',
+                            mode, fmt, str(echo_text))
+        not_modified = _not_modified(etag)
+        if not_modified is not None:
+            return not_modified
 
     try:
-        result = analyze_text(text)
+        with collect_timings() as timings:
+            if store or previous:
+                result, context = analyze_text_with_context(text, pipeline_fields, mode=mode, deadline_ms=deadline_ms,
+                                                            previous=previous.context if previous else None)
+            else:
+                result = analyze_text(text, pipeline_fields, mode=mode, deadline_ms=deadline_ms)
+            if store:
+                with timed_stage('analysis_store', records=len(result['records'])):
+                    stored = _ANALYSES.put(result['records'], scores=result.get('sentiment_scores'), context=context)
+                result['analysis_id'] = stored.id
+                if fields is not None and 'records' not in fields:
+                    del result['records']
+        result['mode'] = mode
+        result.setdefault('degraded', [])
+        if want_timings:
+            result['timings_ms'] = {k: round(v * 1000, 3) for k, v in timings.items()}
         # ensure keys exist for stable clients
-        result.setdefault('records', [])
-        result.setdefault('cures_pos_counts', {})
-        result.setdefault('cures_neg_counts', {})
-        result.setdefault('keywords', [])
-        result.setdefault('summary', '')
-        result.setdefault('entities', {})
-        result.setdefault('topics', [])
-        result['original_text'] = text
+        if fields is None:
+            result.setdefault('records', [])
+            result.setdefault('cures_pos_counts', {})
+            result.setdefault('cures_neg_counts', {})
+            result.setdefault('keywords', [])
+            result.setdefault('summary', '')
+            result.setdefault('entities', {})
+            result.setdefault('topics', [])
+        if fmt == 'columnar' and 'records' in result:
+            with timed_stage('columnar', records=len(result['records'])):
+                result['records'] = RecordTable.from_records(result['records']).to_columnar()
+        if echo_text and (fields is None or 'original_text' in fields):
+            result['original_text'] = text
         # return JSON
-        return make_response((json.dumps(result, ensure_ascii=False), 200, {'Content-Type': 'application/json'}))
+        resp = json_response(result)
+        if etag:
+            resp.set_etag(etag)
+        return resp
     except Exception as e:
         app.logger.exception('Processing failed')
-        return make_response((json.dumps({'error': 'processing_failed'}), 500, {'Content-Type': 'application/json'}))
+        return json_response({'error': 'processing_failed'}, 500)
+
+
+def _parse_sort(value, stored):
+    """``'cure'`` / ``'-cure'`` -> ``('cure', descending)``, or None if not a sort key of ``stored``."""
+    value = str(value or 'index')
+    key = value.lstrip('-')
+    if key not in RECORD_SORT_KEYS or (key == 'score' and stored.table.scores is None):
+        return None
+    return key, value.startswith('-')
+
+
+def _query_filters(data):
+    """Facet filters from JSON ``filters`` or from ``?facet=a,b`` / repeated query params.
+
+    None if JSON ``filters`` is not an object of strings or lists of strings.
+    """
+    if data.get('filters') is not None:
+        filters = data['filters']
+        if not isinstance(filters, dict):
+            return None
+        for values in filters.values():
+            if not (isinstance(values, str)
+                    or isinstance(values, list) and all(isinstance(v, str) for v in values)):
+                return None
+        return filters
+    filters = {}
+    for facet in request.args:
+        if facet in RECORD_FACETS:
+            values = [v.strip() for raw in request.args.getlist(facet) for v in raw.split(',') if v.strip()]
+            if values:
+                filters[facet] = values
+    return filters
+
+
+@app.route('/api/records/query', methods=['GET', 'POST'])
+def api_records_query():
+    """Filter, sort and page the records of a stored analysis, with facet counts.
+
+    Example: GET /api/records/query?analysis_id=<id>&sentiment=positive&cure=garlic,honey&sort=-cure&page=2
+    or POST {"analysis_id": "<id>", "filters": {"sentiment": ["positive"]}, "op": "or", "page_size": 100}
+    """
+    data = request.get_json(silent=True) if request.is_json else None
+    data = data if isinstance(data, dict) else {}
+
+    def option(name, default=None):
+        return data.get(name, request.args.get(name, default))
+
+    analysis_id = option('analysis_id')
+    stored = _ANALYSES.get(analysis_id) if isinstance(analysis_id, str) else None
+    if stored is None:
+        return json_response({'error': 'unknown_analysis'}, 404)
+
+    filters = _query_filters(data)
+    if filters is None:
+        return json_response({'error': 'invalid_filters',
+                              'expected': 'an object of facet -> string or list of strings'}, 400)
+    unknown = [f for f in filters if f not in RECORD_FACETS]
+    sort = _parse_sort(option('sort', 'index'), stored)
+    op = str(option('op', 'and')).lower()
+    try:
+        page = int(option('page', 1))
+        page_size = int(option('page_size', settings.RECORDS_PAGE_SIZE))
+        facet_limit = int(option('facets', 50))  # 0 = no facet counts (next pages of a list)
+    except (TypeError, ValueError):
+        return json_response({'error': 'invalid_page'}, 400)
+    if unknown:
+        return json_response({'error': 'unknown_facets', 'unknown': unknown, 'valid': list(RECORD_FACETS)}, 400)
+    if sort is None:
+        return json_response({'error': 'invalid_sort', 'valid': list(RECORD_SORT_KEYS)}, 400)
+    if op not in ('and', 'or'):
+        return json_response({'error': 'invalid_op', 'valid': ['and', 'or']}, 400)
+    if page < 1 or not 1 <= page_size <= settings.RECORDS_MAX_PAGE_SIZE:
+        return json_response({'error': 'invalid_page', 'max_page_size': settings.RECORDS_MAX_PAGE_SIZE}, 400)
+
+    with timed_stage('records_query', records=len(stored.table)):
+        result = stored.index.query(filters, op=op, sort=sort[0], descending=sort[1],
+                                    page=page, page_size=page_size, facet_limit=max(facet_limit, 0))
+    result['analysis_id'] = stored.id
+    result['sort'] = ('-' if sort[1] else '') + sort[0]
+    return json_response(result)
+
+
+@app.route('/api/records/source', methods=['GET'])
+def api_records_source():
+    """The cleaned text of a stored analysis (records' ``start``/``end`` are offsets into it).
+
+    Example: GET /api/records/source?analysis_id=<id>
+    """
+    stored = _ANALYSES.get(request.args.get('analysis_id', ''))
+    if stored is None:
+        return json_response({'error': 'unknown_analysis'}, 404)
+    return json_response({'analysis_id': stored.id, 'clean_text': stored.meta.get('clean_text', '')})
 
 
 @app.route('/api/similar', methods=['POST'])
+@rate_limited(_PROCESS_LIMITER)
 def api_similar():
     """Find similar cases to a given query text.
     
@@ -215,10 +615,10 @@ def api_similar():
     top_n = int(data.get('top_n', 3))
     
     if not query:
-        return make_response((json.dumps({'error': 'no query provided'}), 400, {'Content-Type': 'application/json'}))
+        return json_response({'error': 'no query provided'}, 400)
     
     if not text:
-        return make_response((json.dumps({'error': 'no text data provided'}), 400, {'Content-Type': 'application/json'}))
+        return json_response({'error': 'no text data provided'}, 400)
     
     try:
         # Process the text to get records
@@ -233,38 +633,54 @@ def api_similar():
             'similar_cases': similar,
             'count': len(similar)
         }
-        return make_response((json.dumps(response, ensure_ascii=False), 200, {'Content-Type': 'application/json'}))
+        return json_response(response)
     except Exception as e:
         app.logger.exception('Similar case search failed')
-        return make_response((json.dumps({'error': 'search_failed'}), 500, {'Content-Type': 'application/json'}))
+        return json_response({'error': 'search_failed'}, 500)
 
 
+# Answer cache for /ask-rag: identical (question, notes) pairs reuse the last answer,
+# and concurrent identical requests share a single upstream Groq call.
+_RAG_ANSWER_CACHE = TTLCache(maxsize=settings.RAG_CACHE_SIZE, ttl=settings.RAG_CACHE_TTL)
+_RAG_INFLIGHT = SingleFlight()
 
-import time
-import requests
 
-# Simple in-memory rate limit (per IP, per minute)
-_RAG_RATE_LIMIT = {}
-_RAG_LIMIT = 10  # max 10 requests/minute per IP
+def _rag_cache_key(question, context):
+    # normalize case, whitespace and trailing punctuation so preset variants collide
+    q = re.sub(r"\s+", " ", question.lower()).strip().rstrip('?!. ')
+    ctx_hash = hashlib.sha256(context.encode('utf-8')).hexdigest()
+    return f"{hashlib.sha256(q.encode('utf-8')).hexdigest()}:{ctx_hash}"
 
-def _check_rag_rate_limit(ip):
-    now = int(time.time() // 60)
-    key = f"{ip}:{now}"
-    count = _RAG_RATE_LIMIT.get(key, 0)
-    if count >= _RAG_LIMIT:
-        return False
-    _RAG_RATE_LIMIT[key] = count + 1
-    return True
 
-def _call_groq_rag_api(question, context, api_key):
+def _answer_rag_cached(question, context, api_key):
+    key = _rag_cache_key(question, context)
+    cached = _RAG_ANSWER_CACHE.get(key)
+    if cached is not None:
+        return cached, True
+
+    def compute():
+        # re-check: another request may have filled the cache while we queued
+        hit = _RAG_ANSWER_CACHE.get(key)
+        if hit is not None:
+            return hit, True
+        answer, ok = _call_groq_rag_api(question, context, api_key)
+        if ok:
+            _RAG_ANSWER_CACHE.set(key, answer)
+        return answer, ok
+
+    (answer, ok), _shared = _RAG_INFLIGHT.do(key, compute)
+    return answer, ok
+
+
+def _groq_request(question, context, api_key, stream=False):
+    """Build (url, headers, payload) for a Groq chat completion, or return an error string."""
     # Guardrail: Only allow if API key is set
     if not api_key:
-        return "RAG backend not configured. Contact admin.", False
+        return "RAG backend not configured. Contact admin."
     # Guardrail: Limit input size
     if len(context) > 8000:
-        return "Context too large for RAG. Please reduce input.", False
-    # Example Groq API call (replace with actual endpoint and params)
-    url = "https://api.groq.com/v1/chat/completions"
+        return "Context too large for RAG. Please reduce input."
+    url = settings.GROQ_API_URL
     headers = {
         "Authorization": f"Bearer {api_key}",
         "Content-Type": "application/json"
@@ -278,7 +694,18 @@ def _call_groq_rag_api(question, context, api_key):
         "max_tokens": 512,
         "temperature": 0.2
     }
+    if stream:
+        payload["stream"] = True
+    return url, headers, payload
+
+
+def _call_groq_rag_api(question, context, api_key):
+    req = _groq_request(question, context, api_key)
+    if isinstance(req, str):
+        return req, False
+    url, headers, payload = req
     try:
+        import requests
         resp = requests.post(url, headers=headers, json=payload, timeout=20)
         if resp.status_code == 200:
             data = resp.json()
@@ -289,13 +716,130 @@ def _call_groq_rag_api(question, context, api_key):
     except Exception as e:
         return f"Error contacting Groq API: {e}", False
 
+
+def _stream_groq_rag_api(question, context, api_key):
+    """Yield answer text fragments from a streamed Groq completion.
+
+    Raises RuntimeError with a user-facing message when the backend is unavailable
+    or the stream breaks off. The upstream connection is closed as soon as the
+    consumer stops iterating.
+    """
+    req = _groq_request(question, context, api_key, stream=True)
+    if isinstance(req, str):
+        raise RuntimeError(req)
+    url, headers, payload = req
+    import requests
+    try:
+        resp = requests.post(url, headers=headers, json=payload, timeout=20, stream=True)
+    except Exception as e:
+        raise RuntimeError(f"Error contacting Groq API: {e}")
+    try:
+        if resp.status_code != 200:
+            raise RuntimeError(f"Groq API error: {resp.status_code} {resp.text}")
+        for line in resp.iter_lines(decode_unicode=True):
+            # OpenAI-compatible SSE frames: "data: {...}" ... "data: [DONE]"
+            if not line or not line.startswith('data:'):
+                continue
+            chunk = line[len('data:'):].strip()
+            if chunk == '[DONE]':
+                break
+            try:
+                delta = json.loads(chunk)['choices'][0].get('delta', {}).get('content')
+            except (ValueError, KeyError, IndexError):
+                continue
+            if delta:
+                yield delta
+    except requests.RequestException as e:
+        # connection reset, chunked-encoding error or read timeout mid-stream
+        raise RuntimeError(f"Groq API stream interrupted: {e}")
+    finally:
+        resp.close()
+
+
+def _sse(data, event=None):
+    frame = f"event: {event}\n" if event else ''
+    return frame + f"data: {json_dumps(data).decode('utf-8')}\n\n"
+
+
+def _stream_rag_answer(question, context, api_key):
+    """Relay a RAG answer to the browser as server-sent events.
+
+    Emits ``delta`` frames (default event) while tokens arrive, then a ``done``
+    event carrying the full answer, or an ``error`` event.
+
+    The upstream call is coalesced with concurrent identical questions (streamed or
+    not) through _RAG_INFLIGHT: it runs on a helper thread that feeds this generator
+    the deltas, and a request that only waited on another one replays the finished
+    answer as a single delta marked ``cached``. A client that disconnects does not
+    cut the upstream stream short, so the requests waiting on it still get an answer.
+    """
+    key = _rag_cache_key(question, context)
+    cached = _RAG_ANSWER_CACHE.get(key)
+    if cached is not None:
+        yield _sse({'delta': cached})
+        yield _sse({'answer': cached, 'question': question, 'cached': True}, event='done')
+        return
+    deltas = queue.Queue()
+    outcome = []
+
+    def compute():
+        # re-check: another request may have filled the cache while we queued
+        hit = _RAG_ANSWER_CACHE.get(key)
+        if hit is not None:
+            return hit, True
+        parts = []
+        try:
+            for delta in _stream_groq_rag_api(question, context, api_key):
+                parts.append(delta)
+                deltas.put(delta)
+        except RuntimeError as e:
+            return str(e), False
+        answer = ''.join(parts)
+        if answer:
+            _RAG_ANSWER_CACHE.set(key, answer)
+        return answer, True
+
+    def lead_or_wait():
+        try:
+            outcome.append(_RAG_INFLIGHT.do(key, compute))
+        except Exception as e:
+            outcome.append(((f"Error contacting Groq API: {e}", False), False))
+        finally:
+            deltas.put(None)
+
+    threading.Thread(target=lead_or_wait, name='ask-rag-stream', daemon=True).start()
+    streamed = False
+    while True:
+        delta = deltas.get()
+        if delta is None:
+            break
+        streamed = True
+        yield _sse({'delta': delta})
+    (answer, ok), _shared = outcome[0]
+    if not ok:
+        yield _sse({'error': answer}, event='error')
+        return
+    done = {'answer': answer, 'question': question}
+    if not streamed:
+        # answered by a concurrent identical request (or the cache it filled)
+        if answer:
+            yield _sse({'delta': answer})
+        done['cached'] = True
+    yield _sse(done, event='done')
+
+
+def _wants_stream():
+    if request.args.get('stream') in ('1', 'true'):
+        return True
+    if request.is_json and (request.get_json(silent=True) or {}).get('stream') is True:
+        return True
+    return 'text/event-stream' in (request.headers.get('Accept') or '')
+
+
 @app.route('/ask-rag', methods=['POST'])
+@rate_limited(_RAG_LIMITER)
 def ask_rag():
     # Enhanced Q&A endpoint using Groq RAG backend
-    ip = request.remote_addr or 'unknown'
-    if not _check_rag_rate_limit(ip):
-        return make_response((json.dumps({'error': 'Rate limit exceeded. Try again later.'}), 429, {'Content-Type':'application/json'}))
-
     if request.is_json:
         q = request.json.get('question')
         text = request.json.get('text')
@@ -304,127 +848,187 @@ def ask_rag():
         text = request.form.get('text')
 
     if not q or not isinstance(q, str) or not q.strip():
-        return make_response((json.dumps({'error': 'No question provided'}), 400, {'Content-Type':'application/json'}))
+        return json_response({'error': 'No question provided'}, 400)
     if not text or not isinstance(text, str) or not text.strip():
-        return make_response((json.dumps({'error': 'No text context provided'}), 400, {'Content-Type':'application/json'}))
+        return json_response({'error': 'No text context provided'}, 400)
 
     # Guardrail: Only allow certain question types (optional, e.g. block unsafe)
     if any(x in q.lower() for x in ["hack", "password", "inject", "bypass", "admin"]):
-        return make_response((json.dumps({'error': 'Unsafe question blocked by guardrails.'}), 400, {'Content-Type':'application/json'}))
+        return json_response({'error': 'Unsafe question blocked by guardrails.'}, 400)
 
-    # Call Groq RAG API
-    answer, ok = _call_groq_rag_api(q.strip(), text.strip(), GROQ_API_KEY)
+    # Streaming mode: relay tokens as they arrive (?stream=1, {"stream": true} or Accept: text/event-stream)
+    if _wants_stream():
+        gen = _stream_rag_answer(q.strip(), text.strip(), GROQ_API_KEY)
+        return Response(stream_with_context(gen), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+    # Call Groq RAG API (cached, concurrent duplicates coalesced)
+    answer, ok = _answer_rag_cached(q.strip(), text.strip(), GROQ_API_KEY)
     if ok:
-        return make_response((json.dumps({'answer': answer, 'question': q}, ensure_ascii=False), 200, {'Content-Type':'application/json'}))
+        return json_response({'answer': answer, 'question': q})
     else:
-        return make_response((json.dumps({'error': answer}), 500, {'Content-Type':'application/json'}))
-    
+        return json_response({'error': answer}, 500)
 
 
 @app.route('/analyze', methods=['POST'])
+@rate_limited(_PROCESS_LIMITER)
 def analyze():
     # Compare Healers panel posts here (compare_a, compare_b). Render results at /analyze so URL is bookmarkable.
+    # Each side is analyzed (and cached) on its own; the page shows both plus the per-cure comparison.
     a = request.form.get('compare_a', '')
     b = request.form.get('compare_b', '')
     combined = (a or '') + '\n\n----\n\n' + (b or '')
     text = combined.strip() or request.form.get('text','')
-    result = process_scrolls(text)
+    if a.strip() or b.strip():
+        side_a, side_b = analyze_sides([a, b])
+        result = combine_results(side_a[0], side_b[0])
+        result['comparison'] = compare_results(side_a, side_b)
+        result['compare_a'], result['compare_b'] = a, b
+    else:
+        result = analyze_text(text, PIPELINE_FIELDS + ('clean_text',))
     result.setdefault('records', [])
     result.setdefault('cures_pos_counts', {})
     result.setdefault('cures_neg_counts', {})
     result.setdefault('keywords', [])
     result.setdefault('summary', '')
 
-    # compute insight + charts (same logic as index)
-    pos = result.get('cures_pos_counts', {})
-    neg = result.get('cures_neg_counts', {})
-    all_cures = set(list(pos.keys()) + list(neg.keys()))
-    effectiveness = {}
-    for c in all_cures:
-        p = int(pos.get(c, 0))
-        n = int(neg.get(c, 0))
-        total = p + n
-        pct = int((p / total) * 100) if total > 0 else 0
-        effectiveness[c] = {'pos': p, 'neg': n, 'total': total, 'pct': pct}
-    strongest = None
-    most_failed = None
-    if effectiveness:
-        strongest = max(all_cures, key=lambda k: (effectiveness[k]['pct'], effectiveness[k]['pos']))
-        most_failed = max(all_cures, key=lambda k: (effectiveness[k]['neg'], effectiveness[k]['total']))
-    insight_parts = []
-    if strongest and effectiveness[strongest]['total'] > 0:
-        insight_parts.append(f"Strongest cure: {strongest} ({effectiveness[strongest]['pct']}% effective)")
-    if most_failed and effectiveness[most_failed]['neg'] > 0:
-        insight_parts.append(f"Most failed cure: {most_failed} ({effectiveness[most_failed]['neg']} failures)")
-    result['insight'] = ' • '.join(insight_parts) if insight_parts else result.get('summary','')
+    _add_insight_and_charts(result)
+
+    result['original_text'] = text
+    return _render_result(result)
 
+
+@app.route('/api/compare', methods=['POST'])
+@rate_limited(_PROCESS_LIMITER)
+def api_compare():
+    """Compare two healers' notes: JSON or form ``a`` / ``b`` (or ``compare_a`` / ``compare_b``).
+
+    Returns per-side aggregates (``a``, ``b``; ``cached`` when the side was not
+    analyzed again) and ``cures``: each cure's effectiveness per side and ``diff_pct``.
+    """
+    data = request.get_json(silent=True) if request.is_json else request.form
+    if not isinstance(data, dict):
+        data = {}
+    a = str(data.get('a', data.get('compare_a', '')) or '')
+    b = str(data.get('b', data.get('compare_b', '')) or '')
+    if not a.strip() or not b.strip():
+        return json_response({'error': 'two texts required (a, b)'}, 400)
     try:
-        pos_items = sorted(pos.items(), key=lambda x: x[1], reverse=True)
-        pos_names = [k for k, v in pos_items]
-        pos_vals = [v for k, v in pos_items]
-        pos_text = [f"{effectiveness.get(n,{}).get('pct',0)}%" for n in pos_names]
-        pos_fig = go.Figure(go.Bar(x=pos_names, y=pos_vals, text=pos_text, textposition='auto', marker_color='seagreen'))
-        pos_fig.update_layout(title='Top Effective Cures', xaxis_title='Cure', yaxis_title='Positive reports')
-        result['pos_chart_div'] = pio.to_html(pos_fig, full_html=False, include_plotlyjs='cdn')
-
-        neg_items = sorted(neg.items(), key=lambda x: x[1], reverse=True)
-        neg_names = [k for k, v in neg_items]
-        neg_vals = [v for k, v in neg_items]
-        neg_text = [f"{effectiveness.get(n,{}).get('pct',0)}%" for n in neg_names]
-        neg_fig = go.Figure(go.Bar(x=neg_names, y=neg_vals, text=neg_text, textposition='auto', marker_color='indianred'))
-        neg_fig.update_layout(title='Top Ineffective Cures', xaxis_title='Cure', yaxis_title='Negative reports')
-        result['neg_chart_div'] = pio.to_html(neg_fig, full_html=False, include_plotlyjs='cdn')
+        with timed_stage('compare'):
+            comparison = compare_results(*analyze_sides([a, b]))
     except Exception:
-        result.setdefault('pos_chart_div', '')
-        result.setdefault('neg_chart_div', '')
+        app.logger.exception('Comparison failed')
+        return json_response({'error': 'processing_failed'}, 500)
+    return json_response(comparison)
 
-    result['original_text'] = text
-    return render_template('result.html', result=result)
+
+# Export formats and their routes; Parquet / Arrow IPC need pyarrow
+EXPORT_FORMATS = {
+    'csv': {'path': '/download', 'mimetype': 'text/csv'},
+    'json': {'path': '/download/json', 'mimetype': 'application/json'},
+    'txt': {'path': '/download/txt', 'mimetype': 'text/plain'},
+    'pdf': {'path': '/download/pdf', 'mimetype': 'application/pdf'},
+}
+if PYARROW_AVAILABLE:
+    EXPORT_FORMATS['parquet'] = {'path': '/download/parquet', 'mimetype': 'application/vnd.apache.parquet',
+                                 'tables': ['records', 'cures']}
+    EXPORT_FORMATS['arrow'] = {'path': '/download/arrow', 'mimetype': 'application/vnd.apache.arrow.stream',
+                               'tables': ['records', 'cures']}
+
+
+@app.context_processor
+def _inject_export_formats():
+    return {'export_formats': EXPORT_FORMATS}
+
+
+@app.after_request
+def _advertise_export_formats(response):
+    if request.path.startswith('/download'):
+        response.headers['X-Export-Formats'] = ', '.join(EXPORT_FORMATS)
+    return response
+
+
+@app.route('/download/formats', methods=['GET'])
+def download_formats():
+    return json_response({'formats': EXPORT_FORMATS})
+
+
+def _export_response(chunks, filename, mimetype, compressible=True):
+    """Stream an export as it is generated.
+
+    ``gzip=1`` (form or query) downloads a ``.gz`` file; otherwise a client sending
+    ``Accept-Encoding: gzip`` gets the same file compressed in transit. Formats that
+    are compressed already (Parquet) pass ``compressible=False``.
+    """
+    headers = {'Vary': 'Accept-Encoding'}
+    if not compressible:
+        body = encode_chunks(chunks)
+    elif str(request.values.get('gzip', '')).lower() in ('1', 'true'):
+        body, filename, mimetype = gzip_chunks(chunks), filename + '.gz', 'application/gzip'
+    elif request.accept_encodings['gzip']:
+        body = gzip_chunks(chunks)
+        headers['Content-Encoding'] = 'gzip'
+    else:
+        body = encode_chunks(chunks)
+    headers['Content-Disposition'] = f'attachment; filename={filename}'
+    return Response(stream_with_context(body), mimetype=mimetype, headers=headers)
 
 
 @app.route('/download', methods=['POST'])
+@profiled
 def download():
     text = request.form.get('text', '')
-    # Re-run processing and return CSV
+    # Re-run processing and stream CSV (columns as pandas gave them: keys in first-seen order)
     result = process_scrolls(text)
-    records = result.get('records', [])
-    df = pd.DataFrame(records)
-    csv = df.to_csv(index=False)
-    resp = make_response(csv)
-    resp.headers['Content-Disposition'] = 'attachment; filename=healers_results.csv'
-    resp.mimetype = 'text/csv'
-    return resp
+    return _export_response(iter_csv(result.get('records', [])), 'healers_results.csv', 'text/csv')
 
 
 @app.route('/download/json', methods=['POST'])
+@profiled
 def download_json():
     text = request.form.get('text', '')
     result = process_scrolls(text)
-    data = json.dumps(result, ensure_ascii=False, indent=2)
-    resp = make_response(data)
-    resp.headers['Content-Disposition'] = 'attachment; filename=healers_results.json'
-    resp.mimetype = 'application/json'
-    return resp
+    return _export_response(iter_json(result), 'healers_results.json', 'application/json')
 
 
 @app.route('/download/txt', methods=['POST'])
+@profiled
 def download_txt():
     text = request.form.get('text', '')
     result = process_scrolls(text)
-    lines = []
-    lines.append('Summary:')
-    lines.append(result.get('summary',''))
-    lines.append('\nRecords:')
-    for r in result.get('records', []):
-        lines.append(f"Healer: {r.get('healer')} | Cure: {r.get('cure')} | Symptom: {r.get('symptom')} | Outcome: {r.get('outcome')} | Sentiment: {r.get('sentiment')}")
-    data = '\n'.join(lines)
-    resp = make_response(data)
-    resp.headers['Content-Disposition'] = 'attachment; filename=healers_results.txt'
-    resp.mimetype = 'text/plain'
-    return resp
+    return _export_response(iter_txt(result), 'healers_results.txt', 'text/plain')
+
+
+def _columnar_export(fmt):
+    """Stream the records (``table=records``, default) or cure aggregates (``table=cures``)."""
+    if fmt not in EXPORT_FORMATS:
+        return json_response({'error': 'pyarrow is not installed', 'formats': list(EXPORT_FORMATS)}, 501)
+    which = request.values.get('table', 'records')
+    if which not in ('records', 'cures'):
+        return json_response({'error': 'unknown_table', 'valid': ['records', 'cures']}, 400)
+    table = process_scrolls(request.form.get('text', ''), ['table'])['table']
+    schema, batches = ((record_schema(table), record_batches(table)) if which == 'records'
+                       else (cure_schema(), cure_batches(table)))
+    if fmt == 'parquet':
+        return _export_response(iter_parquet(schema, batches), f'healers_{which}.parquet',
+                                EXPORT_FORMATS[fmt]['mimetype'], compressible=False)
+    return _export_response(iter_arrow(schema, batches), f'healers_{which}.arrow', EXPORT_FORMATS[fmt]['mimetype'])
+
+
+@app.route('/download/parquet', methods=['POST'])
+@profiled
+def download_parquet():
+    return _columnar_export('parquet')
+
+
+@app.route('/download/arrow', methods=['POST'])
+@profiled
+def download_arrow():
+    return _columnar_export('arrow')
 
 
 @app.route('/download/pdf', methods=['POST'])
+@profiled
 def download_pdf():
     text = request.form.get('text', '')
     result = process_scrolls(text)
@@ -444,6 +1048,8 @@ def download_pdf():
     pos_png = None
     neg_png = None
     try:
+        import plotly.graph_objects as go
+        import plotly.io as pio
         pos_counts = result.get('cures_pos_counts', {})
         neg_counts = result.get('cures_neg_counts', {})
         if pos_counts:
@@ -465,6 +1071,7 @@ def download_pdf():
         neg_png = None
 
     # Build PDF using FPDF, include images if we managed to render them
+    from fpdf import FPDF
     pdf = FPDF()
     pdf.set_auto_page_break(auto=True, margin=12)
     pdf.add_page()
@@ -521,4 +1128,3 @@ def download_pdf():
 
 if __name__ == '__main__':
     app.run(debug=True)
-
@@ -0,0 +1,215 @@
+# benchmarks/corpus.py
+"""
+Deterministic synthetic healer-corpus generator for scale testing.
+
+Lines use every phrasing ``extract_cure_and_symptom`` understands (used / tried /
+used ... against / applied / administered / gave ... to patients with / used a
+poultice of), mixed outcomes, formatting noise and unparseable filler. The same
+seed and options always produce the same corpus.
+
+Usage:
+    python -m benchmarks.corpus --size 10MB -o corpus.txt
+    python -m benchmarks.corpus --lines 100000 --format json -o corpus.json
+    python -m benchmarks.corpus --size 200KB --format pdf --seed 7 -o corpus.pdf
+"""
+import argparse
+import io
+import json
+import random
+import re
+import sys
+from typing import Iterator, List, Optional, TextIO
+
+BASE_HEALERS = ['Anna', 'John', 'Mira', 'Tomas', 'Signe', 'Liao', 'Noor', 'Old', 'Ines', 'Bao', 'Kofi', 'Ruth',
+                'A', 'B', 'C', 'D']
+BASE_CURES = ['willow bark', 'honey', 'garlic', 'saltwater', 'crushed mint', 'chamomile tea', 'river clay',
+              'fermented honey', 'yarrow', 'ginger root', 'elderberry syrup', 'thyme oil', 'nettle broth', 'comfrey']
+BASE_SYMPTOMS = ['fever', 'cough', 'infection', 'wound', 'stomach ache', 'inflammation', 'sleeplessness',
+                 'headache', 'rash', 'sore throat', 'joint pain', 'burns']
+TITLES = ['Healer', 'Healer', 'Healer', 'Dr.', 'Elder', 'Brother', 'Sister']
+
+PHRASINGS = [
+    '{title} {healer} used {cure} for {symptom}{sep}{outcome}',
+    '{title} {healer} tried {cure} for {symptom}{sep}{outcome}',
+    '{title} {healer} used {cure} against {symptom}{sep}{outcome}',
+    '{title} {healer} applied {cure} for {symptom}{sep}{outcome}',
+    '{title} {healer} administered {cure} for {symptom}{sep}{outcome}',
+    '{title} {healer} gave {cure} to patients with {symptom}{sep}{outcome}',
+    '{title} {healer} used a poultice of {cure} for {symptom}{sep}{outcome}',
+]
+SEPARATORS = [', ', ' — ', '; ', ' - ', ', but ', ' and ']
+OUTCOMES = {
+    'positive': ['it worked well.', 'patients improved after two days.', 'patients healed quickly.',
+                 'the fever broke.', 'it helped a bit.', 'some improvement noted.', 'everyone recovered.'],
+    'negative': ["it didn't help.", 'results were poor.', 'no improvement observed.', 'the condition worsened.',
+                 'it failed.', 'nothing changed.', 'patients got worse.'],
+    'neutral': ['we will see tomorrow.', 'the patients rested.', 'more notes to follow.'],
+    'mixed': ['it worked at first but results were poor.', 'some improvement, then it got worse.'],
+}
+OUTCOME_WEIGHTS = [('positive', 0.45), ('negative', 0.35), ('neutral', 0.12), ('mixed', 0.08)]
+FILLER = [
+    'The weather was cold and the village gathered by the fire.',
+    'Supplies of herbs ran low this week.',
+    'note: copy of ledger page {n}',
+    '--- page {n} ---',
+    'Market day; traded wool for salt.',
+    'illegible entry',
+    '{n} {n} {n}',
+]
+
+_SIZE_RE = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*([KMG]?I?B?)\s*$', re.IGNORECASE)
+_UNITS = {'': 1, 'B': 1, 'K': 1024, 'KB': 1024, 'KIB': 1024, 'M': 1024 ** 2, 'MB': 1024 ** 2, 'MIB': 1024 ** 2,
+          'G': 1024 ** 3, 'GB': 1024 ** 3, 'GIB': 1024 ** 3}
+
+
+def parse_size(value: str) -> int:
+    """Parse sizes such as ``512``, ``64KB``, ``10MB`` or ``2GB`` into bytes."""
+    m = _SIZE_RE.match(value or '')
+    if not m or m.group(2).upper() not in _UNITS:
+        raise ValueError(f'invalid size: {value!r}')
+    return int(float(m.group(1)) * _UNITS[m.group(2).upper()])
+
+
+def _expand(base: List[str], size: int, suffix: str) -> List[str]:
+    """Grow a vocabulary deterministically to ``size`` entries."""
+    out = list(base[:size])
+    i = 0
+    while len(out) < size:
+        out.append(f'{base[i % len(base)]} {suffix}{i // len(base) + 1}')
+        i += 1
+    return out
+
+
+class CorpusGenerator:
+    """Seeded generator of healer notes.
+
+    ``noise`` is the share of parseable lines given formatting noise (case changes,
+    doubled spaces, stray punctuation); ``unparseable`` is the share of filler lines
+    that carry no cure/symptom.
+    """
+
+    def __init__(self, seed: int = 42, healers: int = 16, cures: int = 14, symptoms: int = 12,
+                 noise: float = 0.1, unparseable: float = 0.1):
+        self.seed = seed
+        self.healers = _expand(BASE_HEALERS, healers, 'the ')
+        self.cures = _expand(BASE_CURES, cures, 'blend ')
+        self.symptoms = _expand(BASE_SYMPTOMS, symptoms, 'type ')
+        self.noise = noise
+        self.unparseable = unparseable
+
+    def lines(self, n: Optional[int] = None) -> Iterator[str]:
+        """Yield ``n`` lines (forever when ``n`` is None)."""
+        rng = random.Random(self.seed)
+        kinds = [k for k, _ in OUTCOME_WEIGHTS]
+        weights = [w for _, w in OUTCOME_WEIGHTS]
+        i = 0
+        while n is None or i < n:
+            i += 1
+            if rng.random() < self.unparseable:
+                yield rng.choice(FILLER).format(n=i)
+                continue
+            kind = rng.choices(kinds, weights)[0]
+            line = rng.choice(PHRASINGS).format(
+                title=rng.choice(TITLES), healer=rng.choice(self.healers), cure=rng.choice(self.cures),
+                symptom=rng.choice(self.symptoms), sep=rng.choice(SEPARATORS), outcome=rng.choice(OUTCOMES[kind]))
+            if rng.random() < self.noise:
+                line = self._add_noise(rng, line)
+            yield line
+
+    @staticmethod
+    def _add_noise(rng: random.Random, line: str) -> str:
+        choice = rng.randrange(4)
+        if choice == 0:
+            return line.lower()
+        if choice == 1:
+            return line.replace(' ', '  ', 2)
+        if choice == 2:
+            return '  ' + line + ' !!'
+        return line.rstrip('.') + '...'
+
+    def text(self, n: int) -> str:
+        return '\n'.join(self.lines(n))
+
+    def lines_for_size(self, size_bytes: int) -> Iterator[str]:
+        """Yield lines until their UTF-8 size (with newlines) reaches ``size_bytes``."""
+        written = 0
+        for line in self.lines():
+            if written >= size_bytes:
+                return
+            written += len(line.encode('utf-8')) + 1
+            yield line
+
+
+def write_txt(out: TextIO, lines: Iterator[str]) -> int:
+    count = 0
+    for line in lines:
+        out.write(line)
+        out.write('\n')
+        count += 1
+    return count
+
+
+def write_json(out: TextIO, lines: Iterator[str]) -> int:
+    """Stream a JSON array of strings (the shape /app accepts for .json uploads)."""
+    out.write('[')
+    count = 0
+    for line in lines:
+        out.write(',\n' if count else '\n')
+        out.write(json.dumps(line, ensure_ascii=False))
+        count += 1
+    out.write('\n]\n')
+    return count
+
+
+def write_pdf(path: str, lines: Iterator[str]) -> int:
+    """Write lines to a PDF with fpdf. fpdf builds the document in memory, so keep PDFs modest."""
+    from fpdf import FPDF
+    pdf = FPDF()
+    pdf.set_auto_page_break(auto=True, margin=12)
+    pdf.add_page()
+    pdf.set_font('Times', '', 10)
+    count = 0
+    for line in lines:
+        # core PDF fonts are latin-1 only
+        pdf.multi_cell(0, 5, line.replace('—', '-').encode('latin-1', 'replace').decode('latin-1'))
+        count += 1
+    pdf.output(path)
+    return count
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--lines', type=int, help='number of lines to generate')
+    target.add_argument('--size', help='approximate output size, e.g. 64KB, 10MB, 2GB')
+    parser.add_argument('--format', choices=['txt', 'json', 'pdf'], default='txt')
+    parser.add_argument('-o', '--output', default='-', help='output path (default: stdout; required for pdf)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--healers', type=int, default=16, help='healer vocabulary size')
+    parser.add_argument('--cures', type=int, default=14, help='cure vocabulary size')
+    parser.add_argument('--symptoms', type=int, default=12, help='symptom vocabulary size')
+    parser.add_argument('--noise', type=float, default=0.1, help='share of lines with formatting noise')
+    parser.add_argument('--unparseable', type=float, default=0.1, help='share of filler lines')
+    args = parser.parse_args(argv)
+
+    gen = CorpusGenerator(seed=args.seed, healers=args.healers, cures=args.cures, symptoms=args.symptoms,
+                          noise=args.noise, unparseable=args.unparseable)
+    lines = gen.lines(args.lines) if args.lines is not None else gen.lines_for_size(parse_size(args.size))
+
+    if args.format == 'pdf':
+        if args.output == '-':
+            parser.error('--format pdf needs --output')
+        count = write_pdf(args.output, lines)
+    else:
+        writer = write_json if args.format == 'json' else write_txt
+        if args.output == '-':
+            count = writer(sys.stdout, lines)
+        else:
+            with io.open(args.output, 'w', encoding='utf-8', newline='\n', buffering=1 << 20) as f:
+                count = writer(f, lines)
+    print(f'{count} lines written', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
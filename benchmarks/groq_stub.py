@@ -0,0 +1,90 @@
+# benchmarks/groq_stub.py
+"""
+Local stand-in for the Groq chat-completions API, for load tests.
+
+Answers POST /v1/chat/completions with an OpenAI-compatible body after a fixed
+delay, and streams ``data:`` frames when the request sets ``"stream": true``.
+
+Usage:
+    python -m benchmarks.groq_stub --port 8799 --latency-ms 300
+    GROQ_API_URL=http://127.0.0.1:8799/v1/chat/completions GROQ_API_KEY=stub flask run
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ANSWER = 'Based on the notes, willow bark and garlic were reported as the most effective cures.'
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    latency = 0.2
+    tokens = 20
+
+    def log_message(self, *args):  # keep load-test output clean
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            payload = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            payload = {}
+        if payload.get('stream'):
+            self._stream()
+        else:
+            time.sleep(self.latency)
+            body = json.dumps({'choices': [{'message': {'role': 'assistant', 'content': ANSWER}}]}).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    def _stream(self):
+        words = ANSWER.split(' ')
+        per_token = self.latency / max(1, len(words))
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        try:
+            for i, word in enumerate(words):
+                time.sleep(per_token)
+                chunk = {'choices': [{'delta': {'content': word if i == 0 else ' ' + word}}]}
+                self.wfile.write(f'data: {json.dumps(chunk)}\n\n'.encode('utf-8'))
+                self.wfile.flush()
+            self.wfile.write(b'data: [DONE]\n\n')
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        self.close_connection = True
+
+
+def start_stub(port: int = 0, latency_ms: float = 200.0) -> ThreadingHTTPServer:
+    """Start the stub on a background thread; ``server.server_address`` has the bound port."""
+    handler = type('GroqStubHandler', (_Handler,), {'latency': latency_ms / 1000.0})
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=8799)
+    parser.add_argument('--latency-ms', type=float, default=200.0, help='time to produce a full answer')
+    args = parser.parse_args(argv)
+    server = start_stub(args.port, args.latency_ms)
+    print(f'Groq stub listening on http://127.0.0.1:{server.server_address[1]}/v1/chat/completions')
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
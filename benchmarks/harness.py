@@ -0,0 +1,145 @@
+# benchmarks/harness.py
+"""
+Measurement helpers shared by the benchmark scripts.
+- percentile(): nearest-rank percentiles
+- measure(): time a callable, report ops/sec, p50/p99 latency and peak memory
+- compare(): check results against a saved JSON baseline
+"""
+import gc
+import json
+import math
+import os
+import platform
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+
+def percentile(samples: Sequence[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, int(math.ceil(pct / 100.0 * len(ordered))))
+    return ordered[rank - 1]
+
+
+def measure(fn: Callable[[], Any], ops_per_call: int, repeat: int = 5, warmup: int = 1,
+            trace_memory: bool = True) -> Dict[str, float]:
+    """Run ``fn`` ``repeat`` times after ``warmup`` runs.
+
+    ``ops_per_call`` is how many logical operations (lines, records, queries) one
+    call covers; ops/sec is derived from it. Latency percentiles are per call.
+    Peak memory comes from one extra run under tracemalloc, which is slow, so it
+    can be disabled for very large corpora.
+    """
+    for _ in range(warmup):
+        fn()
+    gc.collect()
+    samples: List[float] = []
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    total = sum(samples)
+    result = {
+        'ops': ops_per_call * len(samples),
+        'ops_per_sec': (ops_per_call * len(samples) / total) if total > 0 else float('inf'),
+        'p50_ms': percentile(samples, 50) * 1000,
+        'p99_ms': percentile(samples, 99) * 1000,
+        'peak_mem_kb': None,
+    }
+    if trace_memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        result['peak_mem_kb'] = peak / 1024
+    return result
+
+
+def measure_each(fn: Callable[[Any], Any], items: Sequence[Any], trace_memory: bool = True) -> Dict[str, float]:
+    """Time ``fn(item)`` for every item; percentiles are per item."""
+    for item in items[:100]:
+        fn(item)
+    gc.collect()
+    samples: List[float] = []
+    clock = time.perf_counter
+    for item in items:
+        start = clock()
+        fn(item)
+        samples.append(clock() - start)
+    total = sum(samples)
+    result = {
+        'ops': len(samples),
+        'ops_per_sec': (len(samples) / total) if total > 0 else float('inf'),
+        'p50_ms': percentile(samples, 50) * 1000,
+        'p99_ms': percentile(samples, 99) * 1000,
+        'peak_mem_kb': None,
+    }
+    if trace_memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            for item in items:
+                fn(item)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        result['peak_mem_kb'] = peak / 1024
+    return result
+
+
+def environment() -> Dict[str, str]:
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'system': platform.system(),
+    }
+
+
+def save_baseline(path: str, results: Dict[str, Dict[str, float]]) -> None:
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'environment': environment(), 'created': time.time(), 'results': results}, f, indent=2, sort_keys=True)
+
+
+def load_baseline(path: str) -> Dict[str, Dict[str, float]]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f).get('results', {})
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            threshold: float = 0.2, memory_threshold: Optional[float] = None) -> List[str]:
+    """Return human-readable regressions beyond ``threshold`` (0.2 = 20%).
+
+    A case regresses when its ops/sec drops, or its p99 latency / peak memory grows,
+    by more than the threshold relative to the baseline. Cases missing from either
+    side are ignored.
+    """
+    memory_threshold = threshold if memory_threshold is None else memory_threshold
+    problems = []
+    for name, cur in sorted(results.items()):
+        base = baseline.get(name)
+        if not base:
+            continue
+        if base.get('ops_per_sec') and cur['ops_per_sec'] < base['ops_per_sec'] * (1 - threshold):
+            problems.append(f"{name}: throughput {cur['ops_per_sec']:.0f} ops/s vs baseline {base['ops_per_sec']:.0f} ops/s")
+        if base.get('p99_ms') and cur['p99_ms'] > base['p99_ms'] * (1 + threshold):
+            problems.append(f"{name}: p99 {cur['p99_ms']:.3f} ms vs baseline {base['p99_ms']:.3f} ms")
+        if base.get('peak_mem_kb') and cur.get('peak_mem_kb') and cur['peak_mem_kb'] > base['peak_mem_kb'] * (1 + memory_threshold):
+            problems.append(f"{name}: peak memory {cur['peak_mem_kb']:.0f} KiB vs baseline {base['peak_mem_kb']:.0f} KiB")
+    return problems
+
+
+def format_table(results: Dict[str, Dict[str, float]]) -> str:
+    header = f"{'case':<36} {'ops/sec':>14} {'p50 ms':>10} {'p99 ms':>10} {'peak KiB':>12}"
+    lines = [header, '-' * len(header)]
+    for name, r in sorted(results.items()):
+        mem = f"{r['peak_mem_kb']:.0f}" if r.get('peak_mem_kb') is not None else '-'
+        lines.append(f"{name:<36} {r['ops_per_sec']:>14,.0f} {r['p50_ms']:>10.3f} {r['p99_ms']:>10.3f} {mem:>12}")
+    return '\n'.join(lines)
@@ -0,0 +1,294 @@
+# benchmarks/loadtest.py
+"""
+HTTP load generator for the Flask endpoints.
+
+Starts the app under a WSGI server (or targets --url), replaces the Groq backend
+with the local stub, drives a weighted request mix from N concurrent clients and
+reports throughput, p50/p95/p99 latency, error rate and server RSS over time.
+
+Usage:
+    python -m benchmarks.loadtest --server gunicorn --workers 4 --concurrency 16 --duration 60
+    python -m benchmarks.loadtest --server waitress --mix process=6,app=2,similar=2,ask=1 --lines 500
+    python -m benchmarks.loadtest --url http://127.0.0.1:5000 --duration 30 --json report.json
+"""
+import argparse
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from benchmarks.corpus import CorpusGenerator
+from benchmarks.groq_stub import start_stub
+from benchmarks.harness import percentile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_MIX = 'process=5,app=2,similar=2,download=1,ask=1'
+QUESTIONS = ['Which cures worked for fever?', 'Top cures for infections', 'Which cures failed?']
+SIMILAR_QUERIES = ['garlic for infection', 'fever treatment', 'honey cough']
+DOWNLOAD_ROUTES = ['/download', '/download/json', '/download/txt']
+
+
+def _req_app(session, base, text, rng):
+    return session.post(base + '/app', data={'text': text})
+
+
+def _req_process(session, base, text, rng):
+    return session.post(base + '/api/process', json={'text': text})
+
+
+def _req_similar(session, base, text, rng):
+    return session.post(base + '/api/similar', json={'query': rng.choice(SIMILAR_QUERIES), 'text': text})
+
+
+def _req_download(session, base, text, rng):
+    return session.post(base + rng.choice(DOWNLOAD_ROUTES), data={'text': text})
+
+
+def _req_ask(session, base, text, rng):
+    # the RAG guardrail caps context at 8000 chars
+    return session.post(base + '/ask-rag', json={'question': rng.choice(QUESTIONS), 'text': text[:7500]})
+
+
+REQUESTS: Dict[str, Callable] = {
+    'app': _req_app,
+    'process': _req_process,
+    'similar': _req_similar,
+    'download': _req_download,
+    'ask': _req_ask,
+}
+
+
+def parse_mix(spec: str) -> List[Tuple[str, float]]:
+    mix = []
+    for part in spec.split(','):
+        if not part.strip():
+            continue
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in REQUESTS:
+            raise ValueError(f'unknown request type {name!r}; choose from {", ".join(REQUESTS)}')
+        mix.append((name, float(weight or 1)))
+    if not mix:
+        raise ValueError('empty request mix')
+    return mix
+
+
+def process_tree_rss(pid: int) -> float:
+    """Resident set size in MiB of ``pid`` plus its children (psutil, else /proc)."""
+    try:
+        import psutil
+        proc = psutil.Process(pid)
+        procs = [proc] + proc.children(recursive=True)
+        return sum(p.memory_info().rss for p in procs if p.is_running()) / 2 ** 20
+    except ImportError:
+        pass
+    except Exception:
+        return 0.0
+    pids, children = {pid}, defaultdict(list)
+    for entry in os.listdir('/proc') if os.path.isdir('/proc') else []:
+        if entry.isdigit():
+            try:
+                with open(f'/proc/{entry}/stat') as f:
+                    ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+                children[ppid].append(int(entry))
+            except (OSError, ValueError, IndexError):
+                continue
+    stack = [pid]
+    while stack:
+        for c in children.get(stack.pop(), []):
+            if c not in pids:
+                pids.add(c)
+                stack.append(c)
+    total = 0
+    for p in pids:
+        try:
+            with open(f'/proc/{p}/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total += int(line.split()[1]) * 1024
+        except OSError:
+            continue
+    return total / 2 ** 20
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def server_command(server: str, port: int, workers: int, threads: int) -> List[str]:
+    if server == 'gunicorn':
+        return [sys.executable, '-m', 'gunicorn', '-w', str(workers), '--threads', str(threads),
+                '-b', f'127.0.0.1:{port}', 'app:app']
+    if server == 'waitress':
+        return [sys.executable, '-m', 'waitress', f'--listen=127.0.0.1:{port}', f'--threads={threads}', 'app:app']
+    if server == 'werkzeug':
+        return [sys.executable, '-c',
+                f'from app import app; app.run(host="127.0.0.1", port={port}, threaded=True, debug=False)']
+    raise ValueError(f'unknown server {server!r}')
+
+
+def start_server(server: str, workers: int, threads: int, stub_url: str, timeout: float = 60.0):
+    import requests
+    port = _free_port()
+    env = dict(os.environ, GROQ_API_URL=stub_url, GROQ_API_KEY='load-test-stub',
+               RAG_RATE_PER_MIN='0', PROCESS_RATE_PER_MIN='0')
+    proc = subprocess.Popen(server_command(server, port, workers, threads), cwd=ROOT, env=env)
+    base = f'http://127.0.0.1:{port}'
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f'{server} exited with status {proc.returncode}')
+        try:
+            if requests.get(base + '/health', timeout=1).ok:
+                return proc, base
+        except requests.RequestException:
+            pass
+        time.sleep(0.25)
+    proc.terminate()
+    raise RuntimeError(f'{server} did not become healthy within {timeout:.0f}s')
+
+
+def run_load(base: str, mix: List[Tuple[str, float]], concurrency: int, duration: float, text: str,
+             seed: int = 0, rss_pid: Optional[int] = None, sample_interval: float = 1.0,
+             timeout: float = 60.0) -> Dict:
+    import requests
+    names = [n for n, _ in mix]
+    weights = [w for _, w in mix]
+    samples: Dict[str, List[Tuple[float, bool]]] = defaultdict(list)
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+    rss: List[Tuple[float, float]] = []
+    started = time.perf_counter()
+
+    def client(idx: int):
+        rng = random.Random(seed + idx)
+        session = requests.Session()
+        local: Dict[str, List[Tuple[float, bool]]] = defaultdict(list)
+        while time.perf_counter() < stop_at:
+            name = rng.choices(names, weights)[0]
+            t0 = time.perf_counter()
+            try:
+                resp = REQUESTS[name](session, base, text, rng)
+                resp.content  # read the full body
+                ok = resp.status_code < 400
+            except requests.RequestException:
+                ok = False
+            local[name].append((time.perf_counter() - t0, ok))
+        with lock:
+            for k, v in local.items():
+                samples[k].extend(v)
+
+    def sampler():
+        while time.perf_counter() < stop_at:
+            rss.append((round(time.perf_counter() - started, 2), round(process_tree_rss(rss_pid), 1)))
+            time.sleep(sample_interval)
+
+    threads = [threading.Thread(target=client, args=(i,), daemon=True) for i in range(concurrency)]
+    if rss_pid:
+        threads.append(threading.Thread(target=sampler, daemon=True))
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(duration + timeout)
+    elapsed = time.perf_counter() - started
+    return summarize(samples, elapsed, rss)
+
+
+def _stats(rows: List[Tuple[float, bool]], elapsed: float) -> Dict[str, float]:
+    lat = [r[0] for r in rows]
+    errors = sum(1 for r in rows if not r[1])
+    return {
+        'requests': len(rows),
+        'rps': len(rows) / elapsed if elapsed > 0 else 0.0,
+        'p50_ms': percentile(lat, 50) * 1000,
+        'p95_ms': percentile(lat, 95) * 1000,
+        'p99_ms': percentile(lat, 99) * 1000,
+        'error_rate': errors / len(rows) if rows else 0.0,
+    }
+
+
+def summarize(samples: Dict[str, List[Tuple[float, bool]]], elapsed: float, rss: List[Tuple[float, float]]) -> Dict:
+    everything = [r for rows in samples.values() for r in rows]
+    report = {
+        'elapsed_s': elapsed,
+        'overall': _stats(everything, elapsed),
+        'endpoints': {name: _stats(rows, elapsed) for name, rows in sorted(samples.items())},
+        'rss_mb': rss,
+    }
+    if rss:
+        values = [v for _, v in rss]
+        report['rss_summary'] = {'start': values[0], 'peak': max(values), 'end': values[-1]}
+    return report
+
+
+def format_report(report: Dict) -> str:
+    header = f"{'endpoint':<12} {'requests':>9} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>8}"
+    lines = [header, '-' * len(header)]
+    rows = list(report['endpoints'].items()) + [('overall', report['overall'])]
+    for name, s in rows:
+        lines.append(f"{name:<12} {s['requests']:>9} {s['rps']:>9.1f} {s['p50_ms']:>9.1f} "
+                     f"{s['p95_ms']:>9.1f} {s['p99_ms']:>9.1f} {s['error_rate']:>8.2%}")
+    if report.get('rss_summary'):
+        r = report['rss_summary']
+        lines.append(f"\nserver RSS MiB: start {r['start']:.1f}, peak {r['peak']:.1f}, end {r['end']:.1f}")
+    return '\n'.join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--server', choices=['gunicorn', 'waitress', 'werkzeug'], default='gunicorn')
+    parser.add_argument('--url', help='target an already running server instead of starting one')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn worker processes')
+    parser.add_argument('--threads', type=int, default=4, help='threads per worker')
+    parser.add_argument('--concurrency', type=int, default=8, help='concurrent clients')
+    parser.add_argument('--duration', type=float, default=30.0, help='seconds of load')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='weighted request mix (default: %(default)s)')
+    parser.add_argument('--lines', type=int, default=200, help='lines of healer notes per request body')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--stub-latency-ms', type=float, default=300.0, help='simulated Groq answer time')
+    parser.add_argument('--sample-interval', type=float, default=1.0, help='seconds between RSS samples')
+    parser.add_argument('--json', metavar='PATH', help='write the full report (with RSS timeline) as JSON')
+    args = parser.parse_args(argv)
+
+    mix = parse_mix(args.mix)
+    text = CorpusGenerator(seed=args.seed).text(args.lines)
+    stub = start_stub(0, args.stub_latency_ms)
+    stub_url = f'http://127.0.0.1:{stub.server_address[1]}/v1/chat/completions'
+    proc = None
+    try:
+        if args.url:
+            base, pid = args.url.rstrip('/'), None
+            print(f'targeting {base} (start it with GROQ_API_URL={stub_url} to use the stub)')
+        else:
+            proc, base = start_server(args.server, args.workers, args.threads, stub_url)
+            pid = proc.pid
+            print(f'{args.server} up at {base} (pid {pid})')
+        report = run_load(base, mix, args.concurrency, args.duration, text, seed=args.seed,
+                          rss_pid=pid, sample_interval=args.sample_interval)
+    finally:
+        if proc is not None:
+            proc.terminate()
+            try:
+                proc.wait(10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        stub.shutdown()
+
+    report['config'] = {k: v for k, v in vars(args).items() if k != 'json'}
+    print(format_report(report))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
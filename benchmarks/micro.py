@@ -0,0 +1,132 @@
+# benchmarks/micro.py
+"""
+Microbenchmarks for the parser, pipeline and similarity hot paths.
+
+Usage:
+    python -m benchmarks.micro                              # 100 and 10k line corpora
+    python -m benchmarks.micro --sizes 100,10000,1000000    # include the 1M corpus
+    python -m benchmarks.micro --save benchmarks/baseline.json
+    python -m benchmarks.micro --compare benchmarks/baseline.json --threshold 0.25
+
+Exits with status 1 when --compare finds a case that regressed beyond the threshold.
+"""
+import argparse
+import sys
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.corpus import CorpusGenerator
+from benchmarks.harness import compare, format_table, load_baseline, measure, measure_each, save_baseline
+
+DEFAULT_SIZES = (100, 10_000)
+CORPUS_SEED = 1234
+
+_QUERIES = ['garlic for infection', 'fever treatment', 'honey cough', 'mint stomach ache', 'poultice wound']
+
+
+def fixed_corpus(n_lines: int) -> List[str]:
+    """Deterministic corpus of ``n_lines`` healer notes (fixed seed, default vocabulary)."""
+    return list(CorpusGenerator(seed=CORPUS_SEED).lines(n_lines))
+
+
+def _optional(import_fn: Callable[[], Callable]) -> Optional[Callable]:
+    try:
+        return import_fn()
+    except Exception as e:  # heavy optional deps (numpy, sklearn, spaCy) may be missing
+        print(f"  skipped: {e}", file=sys.stderr)
+        return None
+
+
+def run_cases(sizes, repeat: int = 3, trace_memory: bool = True, only: Optional[List[str]] = None) -> Dict[str, Dict[str, float]]:
+    from src.nlp.rule_based import LINE_MEMO, classify_sentiment, parse_text
+
+    pipeline = _optional(lambda: __import__('src.core.nlp_pipeline', fromlist=['process_scrolls']))
+    process_scrolls = pipeline.process_scrolls if pipeline else None
+    table_cls = _optional(lambda: __import__('src.nlp.table', fromlist=['RecordTable']).RecordTable)
+
+    results = {}
+
+    def want(name):
+        return not only or name in only
+
+    for n in sizes:
+        lines = fixed_corpus(n)
+        text = '\n'.join(lines)
+        # big corpora are dominated by the run itself; keep repeats low
+        reps = repeat if n <= 10_000 else 1
+        if want('parse_text'):
+            def parse_cold():
+                # every run parses from scratch; parse_text_memo measures the warm memo
+                LINE_MEMO.clear()
+                return parse_text(text)
+            results[f'parse_text@{n}'] = measure(parse_cold, n, repeat=reps, trace_memory=trace_memory)
+        if want('parse_text_memo'):
+            parse_text(text)
+            results[f'parse_text_memo@{n}'] = measure(lambda: parse_text(text), n, repeat=reps, trace_memory=trace_memory)
+        if want('parse_text_parallel'):
+            from src.nlp.parallel import parse_text_parallel
+
+            def parse_parallel_cold():
+                LINE_MEMO.clear()
+                return parse_text_parallel(text, min_bytes=0)
+            results[f'parse_text_parallel@{n}'] = measure(parse_parallel_cold, n, repeat=reps, trace_memory=trace_memory)
+        if want('classify_sentiment'):
+            results[f'classify_sentiment@{n}'] = measure_each(classify_sentiment, lines, trace_memory=trace_memory)
+        if want('process_scrolls') and process_scrolls:
+            results[f'process_scrolls@{n}'] = measure(lambda: process_scrolls(text), n, repeat=reps, trace_memory=trace_memory)
+        if want('process_counts') and process_scrolls:
+            results[f'process_counts@{n}'] = measure(
+                lambda: process_scrolls(text, ('records', 'cures_pos_counts', 'cures_neg_counts')), n,
+                repeat=reps, trace_memory=trace_memory)
+        if want('serialize_result') and process_scrolls:
+            from src.utils.serialization import dumps
+            result = process_scrolls(text, ('records', 'cures_pos_counts', 'cures_neg_counts'))
+            results[f'serialize_result@{n}'] = measure(lambda: dumps(result), n, repeat=reps, trace_memory=trace_memory)
+        if want('table_cure_counts') and table_cls:
+            records = parse_text(text)
+            table = table_cls.from_records(records)
+            results[f'table_cure_counts@{n}'] = measure(table.cure_counts, n, repeat=reps, trace_memory=trace_memory)
+        if pipeline is not None:
+            if want('extract_keywords'):
+                results[f'extract_keywords@{n}'] = measure(lambda: pipeline.extract_keywords(lines, top_n=12), n,
+                                                           repeat=reps, trace_memory=trace_memory)
+            if want('find_similar_cases'):
+                records = parse_text(text)
+                results[f'find_similar_cases@{n}'] = measure(
+                    lambda: [pipeline.find_similar_cases(q, records, top_n=3) for q in _QUERIES],
+                    len(_QUERIES), repeat=reps, trace_memory=trace_memory)
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default=','.join(str(s) for s in DEFAULT_SIZES),
+                        help='comma separated corpus sizes in lines (default: %(default)s)')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per case for corpora up to 10k lines')
+    parser.add_argument('--only', default='', help='comma separated case names to run')
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc peak-memory pass')
+    parser.add_argument('--save', metavar='PATH', help='write results as a JSON baseline')
+    parser.add_argument('--compare', metavar='PATH', help='compare against a JSON baseline')
+    parser.add_argument('--threshold', type=float, default=0.2, help='allowed regression ratio (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(',') if s.strip()]
+    only = [s.strip() for s in args.only.split(',') if s.strip()] or None
+    results = run_cases(sizes, repeat=args.repeat, trace_memory=not args.no_memory, only=only)
+    print(format_table(results))
+
+    if args.save:
+        save_baseline(args.save, results)
+        print(f"\nbaseline written to {args.save}")
+    if args.compare:
+        problems = compare(results, load_baseline(args.compare), threshold=args.threshold)
+        if problems:
+            print('\nREGRESSIONS:')
+            for p in problems:
+                print('  ' + p)
+            return 1
+        print(f"\nno regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,124 @@
+# benchmarks/startup.py
+"""
+Worker cold-start benchmark.
+
+Each run starts a fresh interpreter that imports the app, as a new WSGI worker does,
+and serves one first request through the test client. The child times both phases.
+Heavy optional libraries are imported on first use, so the child also reports which
+of them the import alone pulled in.
+
+Usage:
+    python -m benchmarks.startup                        # 5 runs against the default target
+    python -m benchmarks.startup --runs 10 --target-ms 400
+    python -m benchmarks.startup --importtime 15        # the 15 slowest modules of one import
+
+Exits with status 1 when the p50 cold start (import + first request) exceeds
+--target-ms, or when the import loaded one of the HEAVY modules.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from benchmarks.corpus import CorpusGenerator
+from benchmarks.harness import percentile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# p50 import + first request of a worker, in ms
+DEFAULT_TARGET_MS = 500.0
+# Must stay off the import path (loaded by the stage or handler that uses them)
+HEAVY = ('pandas', 'plotly', 'spacy', 'nltk', 'sklearn', 'transformers', 'torch', 'pyarrow', 'requests', 'PyPDF2')
+
+_CHILD = r'''
+import json, sys, time
+heavy, text, mode = json.loads(sys.argv[1])
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+loaded = sorted(m for m in heavy if m in sys.modules)
+res = app.app.test_client().post('/api/process?mode=' + mode, json={'text': text})
+done = time.perf_counter()
+print(json.dumps({'import_ms': (imported - start) * 1000, 'first_request_ms': (done - imported) * 1000,
+                  'status': res.status_code, 'heavy': loaded}))
+'''
+
+
+def cold_start(text: str, mode: str = 'fast', heavy: Sequence[str] = HEAVY) -> Dict:
+    """One fresh-interpreter run: import_ms, first_request_ms, cold_start_ms and the heavy modules imported."""
+    proc = subprocess.run([sys.executable, '-c', _CHILD, json.dumps([list(heavy), text, mode])],
+                          cwd=ROOT, capture_output=True, text=True, timeout=300)
+    if proc.returncode != 0:
+        raise RuntimeError(f"cold start failed:\n{proc.stderr.strip()}")
+    run = json.loads(proc.stdout.strip().splitlines()[-1])
+    run['cold_start_ms'] = run['import_ms'] + run['first_request_ms']
+    return run
+
+
+def summarize(runs: List[Dict]) -> Dict:
+    out = {}
+    for phase in ('import_ms', 'first_request_ms', 'cold_start_ms'):
+        samples = [r[phase] for r in runs]
+        out[phase] = {'p50': percentile(samples, 50), 'max': max(samples)}
+    out['heavy'] = sorted({m for r in runs for m in r['heavy']})
+    return out
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """``(module, self_us, cumulative_us)`` per line of ``python -X importtime`` output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = [p.strip() for p in line[len('import time:'):].split('|')]
+        if len(parts) == 3 and parts[0].isdigit():
+            rows.append((parts[2].strip(), int(parts[0]), int(parts[1])))
+    return rows
+
+
+def slowest_imports(top: int = 15) -> List[Tuple[str, int, int]]:
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app'],
+                          cwd=ROOT, capture_output=True, text=True, timeout=300)
+    return sorted(parse_importtime(proc.stderr), key=lambda row: -row[2])[:top]
+
+
+def format_report(summary: Dict, target_ms: float) -> str:
+    lines = [f"{'phase':<18} {'p50 ms':>9} {'max ms':>9}"]
+    for phase in ('import_ms', 'first_request_ms', 'cold_start_ms'):
+        lines.append(f"{phase[:-3]:<18} {summary[phase]['p50']:>9.1f} {summary[phase]['max']:>9.1f}")
+    verdict = 'ok' if summary['cold_start_ms']['p50'] <= target_ms else 'OVER TARGET'
+    lines.append(f"target {target_ms:.0f} ms: {verdict}")
+    if summary['heavy']:
+        lines.append(f"heavy modules imported at startup: {', '.join(summary['heavy'])}")
+    return '\n'.join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--target-ms', type=float, default=DEFAULT_TARGET_MS,
+                        help='p50 budget for import + first request (default %(default)s)')
+    parser.add_argument('--lines', type=int, default=200, help='lines in the first request')
+    parser.add_argument('--mode', default='fast', help='pipeline mode of the first request')
+    parser.add_argument('--importtime', type=int, metavar='N', help='also list the N slowest imports')
+    parser.add_argument('--json', help='write the summary to this file')
+    args = parser.parse_args(argv)
+
+    text = '\n'.join(CorpusGenerator(seed=1234).lines(args.lines))
+    runs = [cold_start(text, mode=args.mode) for _ in range(max(1, args.runs))]
+    summary = summarize(runs)
+    print(format_report(summary, args.target_ms))
+    if args.importtime:
+        print(f"\n{'module':<48} {'self ms':>9} {'cum ms':>9}")
+        for name, self_us, cum_us in slowest_imports(args.importtime):
+            print(f"{name:<48} {self_us / 1000:>9.1f} {cum_us / 1000:>9.1f}")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'target_ms': args.target_ms, **summary}, f, indent=2)
+    return 1 if summary['cold_start_ms']['p50'] > args.target_ms or summary['heavy'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
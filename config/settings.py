@@ -9,6 +9,75 @@ load_dotenv()
 
 class Settings:
     GROQ_API_KEY = os.getenv('GROQ_API_KEY', '')
+    # Chat-completions endpoint; point at a local stub for load tests
+    GROQ_API_URL = os.getenv('GROQ_API_URL', 'https://api.groq.com/v1/chat/completions')
+    # /ask-rag answer cache: entries live RAG_CACHE_TTL seconds, at most RAG_CACHE_SIZE kept
+    RAG_CACHE_TTL = float(os.getenv('RAG_CACHE_TTL', '600'))
+    RAG_CACHE_SIZE = int(os.getenv('RAG_CACHE_SIZE', '512'))
+    # Token-bucket rate limits (requests/minute per client IP; 0 disables).
+    # RATE_LIMIT_BACKEND=sqlite shares buckets between gunicorn workers via RATE_LIMIT_DB.
+    RAG_RATE_PER_MIN = float(os.getenv('RAG_RATE_PER_MIN', '10'))
+    PROCESS_RATE_PER_MIN = float(os.getenv('PROCESS_RATE_PER_MIN', '0'))
+    RATE_LIMIT_BACKEND = os.getenv('RATE_LIMIT_BACKEND', 'memory')
+    RATE_LIMIT_DB = os.getenv('RATE_LIMIT_DB', 'instance/ratelimit.sqlite3')
+    # Request profiling: send X-Profile-Token (or ?profile=<token>) matching PROFILE_TOKEN,
+    # or let PROFILE_SAMPLE_RATE (0..1) pick requests at random. Profiles land in PROFILE_DIR,
+    # which keeps the newest PROFILE_MAX_FILES, none older than PROFILE_MAX_AGE s (0 = no limit).
+    PROFILE_TOKEN = os.getenv('PROFILE_TOKEN', '')
+    PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', '0'))
+    PROFILE_DIR = os.getenv('PROFILE_DIR', 'instance/profiles')
+    PROFILE_MAX_FILES = int(os.getenv('PROFILE_MAX_FILES', '200'))
+    PROFILE_MAX_AGE = float(os.getenv('PROFILE_MAX_AGE', '604800'))
+    # Pipeline latency: default mode (fast | balanced | full) and per-request budget in ms (0 = none).
+    # Callers may override both per request; stages that would overrun fall back to rule-based versions.
+    PIPELINE_MODE = os.getenv('PIPELINE_MODE', 'full')
+    PIPELINE_DEADLINE_MS = float(os.getenv('PIPELINE_DEADLINE_MS', '0'))
+    # Parallel parsing: texts of at least PARSE_PARALLEL_MIN_BYTES are parsed on a pool of
+    # PARSE_WORKERS processes (0 = one per CPU, 1 = always serial).
+    PARSE_WORKERS = int(os.getenv('PARSE_WORKERS', '0'))
+    PARSE_PARALLEL_MIN_BYTES = int(os.getenv('PARSE_PARALLEL_MIN_BYTES', str(2 * 2 ** 20)))
+    # Parsed lines are memoized across requests (LRU of LINE_MEMO_SIZE distinct lines; 0 = off).
+    LINE_MEMO_SIZE = int(os.getenv('LINE_MEMO_SIZE', '20000'))
+    # Identical concurrent process requests share one pipeline run. COALESCE_BACKEND: memory (threads
+    # of one worker), file (plus other workers via lock files in COALESCE_PATH), sqlite (plus other
+    # workers via a lease table in COALESCE_PATH) or off. Shared results are kept COALESCE_RESULT_TTL s.
+    COALESCE_BACKEND = os.getenv('COALESCE_BACKEND', 'memory')
+    COALESCE_PATH = os.getenv('COALESCE_PATH', '')
+    COALESCE_RESULT_TTL = float(os.getenv('COALESCE_RESULT_TTL', '10'))
+    # Healer comparison (/analyze, /api/compare): both sides are analyzed in parallel on
+    # COMPARE_WORKERS threads; each side's result is cached COMPARE_CACHE_TTL s (COMPARE_CACHE_SIZE kept).
+    COMPARE_WORKERS = int(os.getenv('COMPARE_WORKERS', '2'))
+    COMPARE_CACHE_SIZE = int(os.getenv('COMPARE_CACHE_SIZE', '64'))
+    COMPARE_CACHE_TTL = float(os.getenv('COMPARE_CACHE_TTL', '600'))
+    # JSON encoder for API responses: auto (orjson when installed), orjson or stdlib
+    JSON_BACKEND = os.getenv('JSON_BACKEND', 'auto')
+    # Response compression: content-codings to offer (br needs the brotli package; empty = off),
+    # for HTML and JSON bodies of at least COMPRESS_MIN_BYTES
+    COMPRESSION = [e.strip() for e in os.getenv('COMPRESSION', 'br,gzip').split(',') if e.strip()]
+    COMPRESS_MIN_BYTES = int(os.getenv('COMPRESS_MIN_BYTES', '1024'))
+    COMPRESS_LEVEL = int(os.getenv('COMPRESS_LEVEL', '6'))
+    # Stored analyses (for /api/records/query): at most ANALYSIS_STORE_SIZE per worker (and shared), kept
+    # ANALYSIS_STORE_TTL seconds. Record pages default to RECORDS_PAGE_SIZE, capped at RECORDS_MAX_PAGE_SIZE.
+    ANALYSIS_STORE_SIZE = int(os.getenv('ANALYSIS_STORE_SIZE', '32'))
+    ANALYSIS_STORE_TTL = float(os.getenv('ANALYSIS_STORE_TTL', '3600'))
+    RECORDS_PAGE_SIZE = int(os.getenv('RECORDS_PAGE_SIZE', '50'))
+    RECORDS_MAX_PAGE_SIZE = int(os.getenv('RECORDS_MAX_PAGE_SIZE', '500'))
+    # Where other workers find a stored analysis (result page scrolling, /api/records/query):
+    # ANALYSIS_STORE_BACKEND file (pickles in ANALYSIS_STORE_PATH), sqlite (a table in
+    # ANALYSIS_STORE_PATH), memory (this worker only: fine for a single-process server) or
+    # auto (file when WEB_CONCURRENCY / GUNICORN_CMD_ARGS ask for several workers, else memory).
+    # file and sqlite pickle the whole table inside each /app and /analyze request (about
+    # 5 ms and 2 MB for 15k records).
+    ANALYSIS_STORE_BACKEND = os.getenv('ANALYSIS_STORE_BACKEND', 'auto')
+    ANALYSIS_STORE_PATH = os.getenv('ANALYSIS_STORE_PATH', '')
+    # Result page: records rendered per page (more load on scroll), initial sort key
+    # (index, healer, cure, symptom, outcome, sentiment, ...; prefix '-' for descending),
+    # the number of healer-cure edges drawn in the network and of healers offered
+    # in the healer filter (the most frequent ones).
+    RESULT_PAGE_SIZE = int(os.getenv('RESULT_PAGE_SIZE', '100'))
+    RESULT_SORT = os.getenv('RESULT_SORT', 'index')
+    RESULT_NETWORK_EDGES = int(os.getenv('RESULT_NETWORK_EDGES', '300'))
+    RESULT_FILTER_OPTIONS = int(os.getenv('RESULT_FILTER_OPTIONS', '200'))
     # Add more config as needed
 
 settings = Settings()
@@ -0,0 +1,148 @@
+# src/core/engine.py
+"""
+Minimal dependency-driven pipeline engine.
+- Stage: a named step declaring the context keys it reads and writes
+- PipelineEngine: runs only the stages needed for the requested output fields,
+  swapping in a stage's cheap fallback when asked to or when a deadline would be missed
+- Incremental runs against a previous context reuse stages whose inputs did not change
+  and patch the outputs of stages that know how to (``Stage.incremental``)
+"""
+import time
+from typing import Any, Callable, Collection, Dict, Iterable, List, Optional, Sequence
+
+from src.utils.metrics import timed_stage
+
+
+StageFn = Callable[[Dict[str, Any]], Dict[str, Any]]
+IncrementalFn = Callable[[Dict[str, Any], Dict[str, Any]], Dict[str, Any]]
+
+
+class Stage:
+    """One pipeline step: ``fn(ctx)`` reads ``inputs`` and returns a dict with ``outputs``.
+
+    ``fallback`` is an optional cheaper function producing the same outputs, and
+    ``cost`` a prior estimate of ``fn``'s seconds per record used until real
+    timings have been observed. ``incremental(ctx, previous)`` optionally produces
+    ``fn``'s outputs by patching those of a previous run; it must return the previous
+    output object itself for an output that did not change, and must not mutate
+    ``previous``.
+    """
+
+    __slots__ = ('name', 'inputs', 'outputs', 'fn', 'fallback', 'cost', 'incremental')
+
+    def __init__(self, name: str, inputs: Sequence[str], outputs: Sequence[str], fn: StageFn,
+                 fallback: Optional[StageFn] = None, cost: float = 0.0, incremental: Optional[IncrementalFn] = None):
+        self.name = name
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self.fn = fn
+        self.fallback = fallback
+        self.cost = cost
+        self.incremental = incremental
+
+    def __repr__(self) -> str:
+        return f"Stage({self.name!r}, inputs={self.inputs}, outputs={self.outputs})"
+
+
+class PipelineEngine:
+    """Run a set of stages, computing only what the requested fields depend on.
+
+    Stages must be declared in a valid execution order (each stage after the
+    producers of its inputs). Every output key has exactly one producer.
+    """
+
+    #: weight of the newest observation in the per-stage cost average
+    SMOOTHING = 0.3
+
+    def __init__(self, stages: Iterable[Stage], public_fields: Optional[Sequence[str]] = None):
+        self.stages: List[Stage] = list(stages)
+        # seconds per record: the stage's prior until its first run, then a moving average
+        self._cost: Dict[str, float] = {st.name: st.cost for st in self.stages}
+        self._observed = set()
+        self._producer: Dict[str, Stage] = {}
+        for st in self.stages:
+            for key in st.inputs:
+                if key not in self._producer and key not in ('text',):
+                    raise ValueError(f"stage {st.name!r} reads {key!r} before any stage produces it")
+            for key in st.outputs:
+                if key in self._producer:
+                    raise ValueError(f"{key!r} is produced by both {self._producer[key].name!r} and {st.name!r}")
+                self._producer[key] = st
+        self.fields = tuple(public_fields) if public_fields else tuple(self._producer)
+
+    def plan(self, fields: Optional[Iterable[str]] = None) -> List[Stage]:
+        """Return the stages needed for ``fields`` (all public fields when None), in run order."""
+        wanted = set(self.fields if fields is None else fields)
+        unknown = wanted - set(self._producer)
+        if unknown:
+            raise KeyError(', '.join(sorted(unknown)))
+        needed = set(wanted)
+        selected = []
+        for st in reversed(self.stages):
+            if needed.intersection(st.outputs):
+                selected.append(st)
+                needed.update(st.inputs)
+        selected.reverse()
+        return selected
+
+    def estimate(self, stage: Stage, records: int) -> float:
+        """Expected seconds for ``stage.fn`` over ``records`` records (from past runs)."""
+        return self._cost.get(stage.name, 0.0) * max(1, records)
+
+    def run(self, ctx: Dict[str, Any], fields: Optional[Iterable[str]] = None,
+            degrade: Collection[str] = (), deadline: Optional[float] = None,
+            previous: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Run the planned stages over ``ctx`` (mutated in place) and return it.
+
+        Stages named in ``degrade`` run their fallback. With a ``deadline``
+        (a ``time.perf_counter()`` value) a stage also falls back when its
+        estimated cost would overrun it. Names of degraded stages are appended
+        to ``ctx['degraded']``.
+
+        With ``previous`` (the context of an earlier run, not modified), a stage
+        whose inputs are the very objects of that run and that ran the same way
+        (fallback or not) there is skipped and its outputs are taken over; a stage
+        with an ``incremental`` function patches the previous outputs when none of
+        its inputs was recomputed from scratch. Their names are appended to
+        ``ctx['reused']`` / ``ctx['patched']``.
+        """
+        nbytes = len(ctx.get('text') or '')
+        degraded = ctx.setdefault('degraded', [])
+        if previous is not None:
+            reused, patched = ctx.setdefault('reused', []), ctx.setdefault('patched', [])
+            prev_degraded = set(previous.get('degraded', ()))
+        rebuilt = set()  # keys computed from scratch in this run
+        for st in self.plan(fields):
+            parsed = ctx.get('parsed')
+            records = len(parsed) if parsed is not None else None
+            same = (previous is not None and all(k in previous for k in st.outputs)
+                    and (st.name in degrade) == (st.name in prev_degraded))
+            if same and all(ctx.get(k) is previous.get(k) for k in st.inputs):
+                ctx.update((k, previous[k]) for k in st.outputs)
+                reused.append(st.name)
+                if st.name in prev_degraded:
+                    degraded.append(st.name)
+                continue
+            cheap = st.fallback is not None and (
+                st.name in degrade
+                or (deadline is not None and time.perf_counter() + self.estimate(st, records or 0) > deadline))
+            if (same and not cheap and st.incremental is not None and st.name not in prev_degraded
+                    and not rebuilt.intersection(st.inputs)):
+                with timed_stage(st.name + '_incremental', records=records, nbytes=nbytes):
+                    ctx.update(st.incremental(ctx, previous))
+                patched.append(st.name)
+                continue
+            rebuilt.update(st.outputs)
+            started = time.perf_counter()
+            with timed_stage(st.name + '_fallback' if cheap else st.name, records=records, nbytes=nbytes):
+                ctx.update((st.fallback if cheap else st.fn)(ctx))
+            if cheap:
+                degraded.append(st.name)
+            else:
+                per_record = (time.perf_counter() - started) / max(1, records or 0)
+                if st.name in self._observed:
+                    prev = self._cost[st.name]
+                    per_record = prev + self.SMOOTHING * (per_record - prev)
+                self._cost[st.name] = per_record
+                self._observed.add(st.name)
+        return ctx
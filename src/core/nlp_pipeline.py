@@ -1,2 +1,807 @@
-# Moved from models/nlp_pipeline.py
-# ...existing code to be copied here...
+# src/core/nlp_pipeline.py
+"""
+Unified NLP pipeline for The Healer's Scribe (moved from models/nlp_pipeline.py).
+
+``process_scrolls(text, fields=None)`` runs the analysis as a set of stages on a
+PipelineEngine: each stage declares the fields it reads and writes, so callers
+that ask for a subset of fields (e.g. only records and counts) skip keyword,
+VADER, summary, entity and topic work entirely. Heavier libraries (spaCy, nltk
+VADER, sklearn, transformers) are used when installed, with rule-based fallbacks;
+they are imported by the first stage that needs them, not at import time.
+
+``run_pipeline(..., previous=ctx)`` re-analyzes an edited text against the context
+of an earlier run: unchanged lines keep their records, per-record stages and the
+cure counts are patched, and document-level stages rerun only if their inputs changed.
+"""
+from typing import Any, Dict, Iterable, List, Optional
+import logging
+import re
+import time
+
+from src.core.engine import PipelineEngine, Stage
+from src.nlp.delta import reparse
+from src.nlp.parallel import parse_records_parallel
+from src.nlp.records import Record
+from src.utils.resources import (NLTK_RESOURCES, SPACY_MODEL, Lazy, module_available,
+                                 nltk_resource_available)
+
+logger = logging.getLogger(__name__)
+
+# Only availability is checked at import; the libraries themselves are imported by
+# the loaders below on first use, so they stay off worker startup.
+SPACY_AVAILABLE = module_available('spacy')
+VADER_AVAILABLE = module_available('nltk') and nltk_resource_available(NLTK_RESOURCES['vader_lexicon'])
+SKLEARN_AVAILABLE = module_available('sklearn')
+TRANSFORMERS_AVAILABLE = module_available('transformers')
+
+
+def _load_spacy():
+    import spacy
+    try:
+        return spacy.load(SPACY_MODEL)
+    except Exception:
+        # sometimes models are available under package name
+        return spacy.load("en")
+
+
+def _load_vader():
+    from nltk.sentiment.vader import SentimentIntensityAnalyzer
+    return SentimentIntensityAnalyzer()
+
+
+def _load_summarizer():
+    from transformers import pipeline
+    return pipeline("summarization", model="sshleifer/distilbart-cnn-12-6")
+
+
+def _tfidf(**options):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    return TfidfVectorizer(**options)
+
+
+# None when the library or model is missing
+_spacy_nlp = Lazy(_load_spacy if SPACY_AVAILABLE else lambda: None)
+_vader = Lazy(_load_vader if VADER_AVAILABLE else lambda: None)
+_summarizer = Lazy(_load_summarizer if TRANSFORMERS_AVAILABLE else lambda: None)
+
+
+def clean_text(text: str) -> str:
+    return re.sub(r"\s+", " ", text.replace('\r', ' ')).strip()
+
+
+def keywords_by_frequency(texts: List[str], top_n: int = 10) -> List[str]:
+    """Most frequent words of 3+ characters (the rule-based keyword fallback)."""
+    words = ' '.join(texts).lower().split()
+    freq = {}
+    for w in words:
+        if len(w) < 3:
+            continue
+        freq[w] = freq.get(w, 0) + 1
+    return [k for k, _ in sorted(freq.items(), key=lambda x: -x[1])][:top_n]
+
+
+def extract_keywords_tfidf(texts: List[str], top_n: int = 10) -> List[str]:
+    if not SKLEARN_AVAILABLE:
+        # fallback to simple frequency
+        return keywords_by_frequency(texts, top_n)
+
+    vectorizer = _tfidf(stop_words='english', max_features=2000)
+    X = vectorizer.fit_transform(texts)
+    scores = X.sum(axis=0).A1
+    indices = scores.argsort()[-top_n:][::-1]
+    return [vectorizer.get_feature_names_out()[i] for i in indices]
+
+
+def extract_keywords_spacy(texts: List[str], top_n: int = 10) -> List[str]:
+    """Extract candidate keywords using spaCy noun chunks & entities."""
+    nlp = _spacy_nlp()
+    if nlp is None:
+        # fallback to simple frequency
+        words = ' '.join(texts).lower().split()
+        freq = {}
+        for w in words:
+            if len(w) < 3:
+                continue
+            w = re.sub(r"[^a-z0-9'-]", '', w)
+            if not w:
+                continue
+            freq[w] = freq.get(w, 0) + 1
+        return [k for k, _ in sorted(freq.items(), key=lambda x: -x[1])][:top_n]
+
+    doc = nlp(' '.join(texts))
+    freq = {}
+    # nouns, noun_chunks, and entity text
+    for chunk in doc.noun_chunks:
+        key = chunk.lemma_.lower().strip()
+        if len(key) < 3:
+            continue
+        freq[key] = freq.get(key, 0) + 1
+    for ent in doc.ents:
+        key = ent.lemma_.lower().strip()
+        if len(key) < 3:
+            continue
+        freq[key] = freq.get(key, 0) + 2
+
+    # return top_n
+    return [k for k, _ in sorted(freq.items(), key=lambda x: -x[1])][:top_n]
+
+
+def extract_keywords(texts: List[str], top_n: int = 10) -> List[str]:
+    """Select keyword extraction strategy based on available libs."""
+    if SKLEARN_AVAILABLE:
+        return extract_keywords_tfidf(texts, top_n=top_n)
+    if SPACY_AVAILABLE:
+        return extract_keywords_spacy(texts, top_n=top_n)
+    # fallback
+    return extract_keywords_tfidf(texts, top_n=top_n)
+
+
+def extract_entities(text: str, use_spacy: bool = True) -> Dict[str, List[str]]:
+    """Extract simple entity lists: healers, treatments, symptoms, diseases.
+
+    Uses spaCy entities and noun chunks when available (and ``use_spacy``); falls
+    back to simple pattern and frequency-based extraction.
+    """
+    treatments = []
+    symptoms = []
+    healers = []
+    diseases = []
+
+    nlp = _spacy_nlp() if use_spacy else None
+    if nlp is not None:
+        try:
+            doc = nlp(text)
+            # Healers: PERSON or titles
+            for ent in doc.ents:
+                if ent.label_ in ('PERSON',):
+                    healers.append(ent.text)
+            # treatments/symptoms: noun chunks and entities not person
+            for chunk in doc.noun_chunks:
+                ch = chunk.text.strip()
+                # heuristics: if chunk contains words like 'tea', 'poultice', 'bark', treat as treatment
+                if re.search(r'\b(tea|poultice|bark|tincture|herb|honey|saltwater|ointment|pills|crushed)\b', ch, re.I):
+                    treatments.append(ch)
+                else:
+                    # otherwise could be symptom
+                    # symptoms often include words like fever, cough, infection
+                    if re.search(r'\b(fever|cough|infection|wound|stomach|ache|inflammation|sleeplessness|sleep)\b', ch, re.I):
+                        symptoms.append(ch)
+            # diseases: look for disease-like tokens
+            for ent in doc.ents:
+                if ent.label_ in ('DISEASE', 'CONDITION'):
+                    diseases.append(ent.text)
+        except Exception:
+            pass
+
+    # fallback heuristics from text
+    if not treatments or not symptoms:
+        words = text.lower()
+        # common treatment words
+        for tw in ['garlic', 'willow', 'honey', 'saltwater', 'mint', 'chamomile', 'poultice', 'herb', 'bark', 'tea']:
+            if tw in words and tw not in treatments:
+                treatments.append(tw)
+        for sw in ['fever', 'cough', 'infection', 'wound', 'stomach', 'ache', 'inflammation', 'sleeplessness']:
+            if sw in words and sw not in symptoms:
+                symptoms.append(sw)
+
+    # normalize lists
+    def norm(lst):
+        seen = []
+        for v in lst:
+            v2 = re.sub(r"[^a-z0-9\s'-]", '', v.lower()).strip()
+            if v2 and v2 not in seen:
+                seen.append(v2)
+        return seen
+
+    return {
+        'healers': norm(healers),
+        'treatments': norm(treatments),
+        'symptoms': norm(symptoms),
+        'diseases': norm(diseases),
+    }
+
+
+def classify_record(rec: Dict[str, Any]) -> str:
+    """Rule-based classification of a parsed record into labels:
+    'effective', 'failure', 'complaint', 'praise', 'neutral'.
+    """
+    outcome = (rec.get('outcome') or '').lower()
+    sentiment = rec.get('sentiment', 'neutral')
+    # explicit failure terms
+    if any(x in outcome for x in ['did not', "didn't", 'no improvement', 'failed', 'worse', 'ineffective', 'no help', 'nothing changed']):
+        return 'failure'
+    # explicit praise
+    if any(x in outcome for x in ['worked', 'healed', 'improved', 'patients improved', 'helped', 'recovered', 'broke']):
+        return 'effective'
+    # sentiment-based mapping
+    if sentiment == 'positive':
+        return 'effective'
+    if sentiment == 'negative':
+        return 'failure'
+    # complaints mention 'complain' or 'complaint'
+    if 'complain' in outcome or 'complaint' in outcome:
+        return 'complaint'
+    # praise generic
+    if 'praise' in outcome:
+        return 'praise'
+    return 'neutral'
+
+
+def topics_from_texts(texts: List[str], top_n: int = 5) -> List[str]:
+    """Return top topic keywords using TF-IDF when available, else frequency."""
+    if not texts:
+        return []
+    # prefer TF-IDF top words
+    if SKLEARN_AVAILABLE:
+        try:
+            vectorizer = _tfidf(stop_words='english', max_features=2000)
+            X = vectorizer.fit_transform(texts)
+            # sum scores and pick top features
+            scores = X.sum(axis=0).A1
+            indices = scores.argsort()[-top_n:][::-1]
+            return [vectorizer.get_feature_names_out()[i] for i in indices]
+        except Exception:
+            pass
+    return topics_by_frequency(texts, top_n)
+
+
+def topics_by_frequency(texts: List[str], top_n: int = 5) -> List[str]:
+    """Most common words longer than 3 letters (the rule-based topic fallback)."""
+    from collections import Counter
+    words = re.findall(r"[a-zA-Z]{4,}", ' '.join(texts).lower())
+    ctr = Counter(words)
+    return [w for w, _ in ctr.most_common(top_n)]
+
+
+def find_similar_cases(query_text: str, all_records: List[Dict[str, Any]], top_n: int = 3) -> List[Dict[str, Any]]:
+    """Find the top N most similar cases to the query text using cosine similarity.
+
+    Uses TF-IDF vectorization and cosine similarity when sklearn is available,
+    otherwise falls back to simple keyword overlap matching.
+    """
+    if not all_records or not query_text:
+        return []
+
+    if SKLEARN_AVAILABLE:
+        try:
+            from sklearn.metrics.pairwise import cosine_similarity
+            # Prepare texts: query + all record raw texts
+            texts = [query_text] + [r.get('raw', '') for r in all_records]
+            vectorizer = _tfidf(stop_words='english', max_features=1000)
+            vectors = vectorizer.fit_transform(texts)
+            # Compute similarity between query (first vector) and all records
+            similarities = cosine_similarity(vectors[0:1], vectors[1:]).flatten()
+            # Get top N indices
+            top_indices = similarities.argsort()[-top_n:][::-1]
+            results = []
+            for idx in top_indices:
+                rec_copy = all_records[idx].copy()
+                rec_copy['similarity_score'] = float(similarities[idx])
+                results.append(rec_copy)
+            return results
+        except Exception:
+            pass
+
+    # Fallback: simple keyword overlap
+    query_words = set(re.findall(r"[a-zA-Z]{3,}", query_text.lower()))
+    scores = []
+    for rec in all_records:
+        raw = rec.get('raw', '')
+        rec_words = set(re.findall(r"[a-zA-Z]{3,}", raw.lower()))
+        overlap = len(query_words & rec_words)
+        scores.append(overlap)
+
+    top_indices = sorted(range(len(scores)), key=lambda i: -scores[i])[:top_n]
+    results = []
+    for idx in top_indices:
+        rec_copy = all_records[idx].copy()
+        rec_copy['similarity_score'] = scores[idx] / max(len(query_words), 1)
+        results.append(rec_copy)
+    return results
+
+
+def answer_question(question: str, records: List[Dict[str, Any]]) -> str:
+    """Answer a question about cures using the extracted records.
+
+    Uses simple keyword matching and sentiment filtering to find relevant answers.
+    """
+    if not records or not question:
+        return "No data available to answer the question."
+
+    question_lower = question.lower()
+
+    # Extract symptom from question
+    symptom_keywords = ['fever', 'cough', 'infection', 'wound', 'stomach', 'ache', 'inflammation', 'sleeplessness', 'pain']
+    detected_symptom = None
+    for sym in symptom_keywords:
+        if sym in question_lower:
+            detected_symptom = sym
+            break
+
+    # Filter records by symptom if detected
+    relevant_records = records
+    if detected_symptom:
+        relevant_records = [r for r in records if detected_symptom in r.get('symptom', '').lower() or detected_symptom in r.get('raw', '').lower()]
+
+    # Check if asking for best/effective cures
+    if any(word in question_lower for word in ['best', 'effective', 'work', 'good', 'help']):
+        positive_records = [r for r in relevant_records if r.get('sentiment') == 'positive']
+        if positive_records:
+            # Count cures
+            cure_counts = {}
+            for r in positive_records:
+                cure = r.get('cure', '').strip()
+                if cure:
+                    cure_counts[cure] = cure_counts.get(cure, 0) + 1
+            if cure_counts:
+                top_cure = max(cure_counts.items(), key=lambda x: x[1])
+                if detected_symptom:
+                    return f"Best cure for {detected_symptom}: {top_cure[0]} (mentioned {top_cure[1]} time{'s' if top_cure[1] > 1 else ''} positively)"
+                else:
+                    return f"Most effective cure: {top_cure[0]} (mentioned {top_cure[1]} time{'s' if top_cure[1] > 1 else ''} positively)"
+
+    # Check if asking for worst/failed cures
+    if any(word in question_lower for word in ['worst', 'fail', 'ineffective', 'bad', 'not work']):
+        negative_records = [r for r in relevant_records if r.get('sentiment') == 'negative']
+        if negative_records:
+            cure_counts = {}
+            for r in negative_records:
+                cure = r.get('cure', '').strip()
+                if cure:
+                    cure_counts[cure] = cure_counts.get(cure, 0) + 1
+            if cure_counts:
+                worst_cure = max(cure_counts.items(), key=lambda x: x[1])
+                if detected_symptom:
+                    return f"Most failed cure for {detected_symptom}: {worst_cure[0]} (mentioned {worst_cure[1]} time{'s' if worst_cure[1] > 1 else ''} negatively)"
+                else:
+                    return f"Most failed cure: {worst_cure[0]} (mentioned {worst_cure[1]} time{'s' if worst_cure[1] > 1 else ''} negatively)"
+
+    # General question - return summary
+    if relevant_records and relevant_records != records:
+        pos_cures = [r.get('cure') for r in relevant_records if r.get('sentiment') == 'positive' and r.get('cure')]
+        neg_cures = [r.get('cure') for r in relevant_records if r.get('sentiment') == 'negative' and r.get('cure')]
+        parts = []
+        if pos_cures:
+            parts.append(f"Effective cures for {detected_symptom}: {', '.join(set(pos_cures))}")
+        if neg_cures:
+            parts.append(f"Ineffective: {', '.join(set(neg_cures))}")
+        if parts:
+            return '. '.join(parts)
+
+    return "No clear answer found. Try asking about specific symptoms (fever, cough, infection) or best/worst cures."
+
+
+def summarize_with_transformer(text: str) -> str:
+    summarizer = _summarizer()
+    if summarizer is None:
+        return ""  # caller will handle fallback
+    try:
+        res = summarizer(text, max_length=120, min_length=20, do_sample=False)
+        return res[0]['summary_text']
+    except Exception as e:
+        logger.warning("Transformer summarization failed: %s", e)
+        return ""
+
+
+def sentiment_scores_heuristic(outcomes: List[str]) -> List[float]:
+    """Keyword-based outcome scores in [-0.6, 0.6] (the VADER fallback)."""
+    scores = []
+    for o in outcomes:
+        s = o.lower()
+        if any(k in s for k in ['work', 'improv', 'heal', 'help']):
+            scores.append(0.6)
+        elif any(k in s for k in ['poor', 'fail', "didn't", 'did not', 'no help', 'worse']):
+            scores.append(-0.6)
+        else:
+            scores.append(0.0)
+    return scores
+
+
+def analyze_sentiments_vader(outcomes: List[str]) -> List[float]:
+    sid = _vader()
+    if sid is None:
+        # fallback: map 'positive'/'negative' strings if present
+        return sentiment_scores_heuristic(outcomes)
+
+    return [sid.polarity_scores(o)['compound'] for o in outcomes]
+
+
+def _rule_based_summary(cures_pos: Dict[str, int], cures_neg: Dict[str, int]) -> str:
+    pos_sorted = [k for k, _ in sorted(cures_pos.items(), key=lambda x: -x[1])]
+    neg_sorted = [k for k, _ in sorted(cures_neg.items(), key=lambda x: -x[1])]
+    parts = []
+    if pos_sorted:
+        parts.append(f"Frequent effective cures: {', '.join(pos_sorted[:5])}.")
+    if neg_sorted:
+        parts.append(f"Frequent ineffective cures: {', '.join(neg_sorted[:5])}.")
+    if not parts:
+        parts = ["No clear wisdom extracted — add more notes or enable transformer summarization."]
+    return ' '.join(parts)
+
+
+def count_cures(records: List[Dict[str, Any]]):
+    """Return (positive, negative) cure -> count dicts."""
+    cures_pos = {}
+    cures_neg = {}
+    _count_into(cures_pos, cures_neg, records)
+    return cures_pos, cures_neg
+
+
+def _count_into(cures_pos: Dict[str, int], cures_neg: Dict[str, int], records, step: int = 1) -> None:
+    """Add (``step=-1``: remove) the records' cure mentions to the count dicts."""
+    for r in records:
+        cure = (r.get('cure') or '').strip()
+        s = r.get('sentiment')
+        if not cure:
+            continue
+        counts = cures_pos if s == 'positive' else cures_neg if s == 'negative' else None
+        if counts is not None:
+            n = counts.get(cure, 0) + step
+            if n > 0:
+                counts[cure] = n
+            else:
+                counts.pop(cure, None)
+
+
+def _in_record_order(cures_pos: Dict[str, int], cures_neg: Dict[str, int], records):
+    """The count dicts keyed in the order count_cures(records) gives them (first mention).
+
+    Stops scanning once every cure has been seen.
+    """
+    pos, neg = {}, {}
+    remaining = len(cures_pos) + len(cures_neg)
+    for r in records:
+        if not remaining:
+            break
+        cure = (r.get('cure') or '').strip()
+        s = r.get('sentiment')
+        if not cure:
+            continue
+        src, dst = (cures_pos, pos) if s == 'positive' else (cures_neg, neg) if s == 'negative' else (None, None)
+        if dst is not None and cure not in dst:
+            dst[cure] = src[cure]
+            remaining -= 1
+    return pos, neg
+
+
+def _clean_val(v: str) -> str:
+    return re.sub(r"[^a-z0-9\s'-]", '', (v or '').strip()).lower()
+
+
+def refine_record_spacy(rec: Dict[str, Any]) -> Dict[str, str]:
+    """spaCy-lemma normalized cure/symptom for a record (only the values that changed; non-fatal)."""
+    raw = rec.get('raw', '')
+    changes = {}
+    try:
+        doc = _spacy_nlp()(raw)
+        # try to find direct object / noun chunk after a verb like 'use', 'apply', 'try'
+        cure_candidate = ''
+        symptom_candidate = ''
+        for token in doc:
+            if token.lemma_.lower() in ('use', 'apply', 'try', 'tried', 'used', 'applied') and token.i < len(doc) - 1:
+                # look for noun chunks that start after this token
+                for chunk in doc.noun_chunks:
+                    if chunk.start >= token.i:
+                        cure_candidate = chunk.lemma_.lower().strip()
+                        break
+                if cure_candidate:
+                    break
+
+        # also look for prepositional 'for' to capture symptom
+        for token in doc:
+            if token.text.lower() == 'for' and token.i < len(doc) - 1:
+                # take the noun chunk that contains the following token
+                for chunk in doc.noun_chunks:
+                    if chunk.start <= token.i + 1 <= chunk.end:
+                        symptom_candidate = chunk.lemma_.lower().strip()
+                        break
+                if symptom_candidate:
+                    break
+
+        # fallback: entities
+        if not cure_candidate:
+            ents = [ent.lemma_.lower().strip() for ent in doc.ents if len(ent.lemma_) > 2]
+            if ents:
+                cure_candidate = ents[0]
+
+        # apply normalized values if they look reasonable
+        if cure_candidate:
+            nv = _clean_val(cure_candidate)
+            if nv:
+                changes['cure'] = nv
+        if symptom_candidate:
+            nv2 = _clean_val(symptom_candidate)
+            if nv2:
+                changes['symptom'] = nv2
+    except Exception:
+        # non-fatal; keep original
+        pass
+    return changes
+
+
+# ---------------------------------------------------------------------------
+# Stages. Internal keys: text -> clean_text -> parsed -> classified -> records.
+# ---------------------------------------------------------------------------
+
+def _stage_clean(ctx):
+    return {'clean_text': clean_text(ctx['text'] or '')}
+
+
+def _clean_incremental(ctx, previous):
+    cleaned = clean_text(ctx['text'] or '')
+    # the previous object when equal, so everything downstream is reused
+    return {'clean_text': previous['clean_text'] if cleaned == previous['clean_text'] else cleaned}
+
+
+def _stage_parse(ctx):
+    # span-based Records over the cleaned text; large documents are parsed on a process pool
+    return {'parsed': parse_records_parallel(ctx['clean_text'])}
+
+
+def _parse_incremental(ctx, previous):
+    # parse_delta tells the per-record stages below which records are new
+    old = previous['parsed']
+    if not all(isinstance(rec, Record) for rec in old):
+        return _stage_parse(ctx)
+    parsed, delta = reparse(previous['clean_text'], old, ctx['clean_text'])
+    return {'parsed': parsed, 'parse_delta': delta}
+
+
+def _stage_classify(ctx):
+    # Records are classified in place: no per-record copies
+    parsed = ctx['parsed']
+    for rec in parsed:
+        rec['classification'] = classify_record(rec)
+    return {'classified': parsed}
+
+
+def _classify_incremental(ctx, previous):
+    # carried-over records keep their classification
+    delta = ctx.get('parse_delta')
+    if delta is None:
+        return _stage_classify(ctx)
+    parsed = ctx['parsed']
+    for i in delta.added:
+        parsed[i]['classification'] = classify_record(parsed[i])
+    return {'classified': parsed}
+
+
+def _stage_refine(ctx):
+    # If spaCy is available, refine and normalize records (lemmatize cures/symptoms).
+    # Changed records are new Records so 'parsed' keeps the original values.
+    records = ctx['classified']
+    if records and _spacy_nlp() is not None:
+        refined = []
+        for rec in records:
+            changes = refine_record_spacy(rec)
+            refined.append(rec.evolve(**changes) if changes else rec)
+        records = refined
+    return {'records': records}
+
+
+def _refine_incremental(ctx, previous):
+    delta = ctx.get('parse_delta')
+    if delta is None or _spacy_nlp() is None:
+        return _stage_refine(ctx)
+    classified, old_classified, old_records = ctx['classified'], previous['classified'], previous['records']
+    records = []
+    for rec, k in zip(classified, delta.origin):
+        if k is None:
+            changes = refine_record_spacy(rec)
+            records.append(rec.evolve(**changes) if changes else rec)
+        else:
+            old = old_records[k]
+            records.append(rec if old is old_classified[k] else old.rebase(rec._src, rec.start))
+    return {'records': records}
+
+
+def _stage_counts(ctx):
+    cures_pos, cures_neg = count_cures(ctx['records'])
+    return {'cures_pos_counts': cures_pos, 'cures_neg_counts': cures_neg}
+
+
+def _counts_incremental(ctx, previous):
+    delta = ctx.get('parse_delta')
+    if delta is None:
+        return _stage_counts(ctx)
+    old_pos, old_neg = previous['cures_pos_counts'], previous['cures_neg_counts']
+    cures_pos, cures_neg = dict(old_pos), dict(old_neg)
+    old_records, records = previous['records'], ctx['records']
+    _count_into(cures_pos, cures_neg, (old_records[k] for k in delta.removed), step=-1)
+    _count_into(cures_pos, cures_neg, (records[i] for i in delta.added))
+    # patching appends new cures at the end; restore a full count's key order (the
+    # summary breaks count ties by it, and clients see it)
+    cures_pos, cures_neg = _in_record_order(cures_pos, cures_neg, records)
+    return {'cures_pos_counts': old_pos if list(cures_pos.items()) == list(old_pos.items()) else cures_pos,
+            'cures_neg_counts': old_neg if list(cures_neg.items()) == list(old_neg.items()) else cures_neg}
+
+
+def _stage_refine_fallback(ctx):
+    return {'records': ctx['classified']}
+
+
+def _keyword_texts(ctx):
+    parsed = ctx['parsed']
+    # keywords from cures/symptoms/raw
+    if parsed:
+        return [f"{r.get('cure') or ''} {r.get('symptom') or ''} {r.get('raw') or ''}" for r in parsed]
+    return [ctx['clean_text']]
+
+
+def _stage_keywords(ctx):
+    return {'keywords': extract_keywords(_keyword_texts(ctx), top_n=12)}
+
+
+def _stage_keywords_fallback(ctx):
+    return {'keywords': keywords_by_frequency(_keyword_texts(ctx), top_n=12)}
+
+
+def _outcomes(ctx):
+    parsed = ctx['parsed']
+    # sentiment scores for outcomes
+    return [r.get('outcome') or '' for r in parsed] if parsed else [ctx['clean_text']]
+
+
+def _stage_vader(ctx):
+    return {'sentiment_scores': analyze_sentiments_vader(_outcomes(ctx))}
+
+
+def _vader_incremental(ctx, previous):
+    # scores are per parsed record unless there were none (then one for the whole text)
+    delta, parsed = ctx.get('parse_delta'), ctx['parsed']
+    old_scores = previous['sentiment_scores']
+    if delta is None or not parsed or not previous['parsed']:
+        return _stage_vader(ctx)
+    fresh = iter(analyze_sentiments_vader([parsed[i].get('outcome') or '' for i in delta.added]))
+    return {'sentiment_scores': [next(fresh) if k is None else old_scores[k] for k in delta.origin]}
+
+
+def _stage_vader_fallback(ctx):
+    return {'sentiment_scores': sentiment_scores_heuristic(_outcomes(ctx))}
+
+
+def _stage_summary(ctx):
+    # try transformer summarization, else list top positive and negative cures
+    summary = ''
+    if TRANSFORMERS_AVAILABLE:
+        summary = summarize_with_transformer(ctx['clean_text'])
+    if not summary:
+        summary = _rule_based_summary(ctx['cures_pos_counts'], ctx['cures_neg_counts'])
+    return {'summary': summary}
+
+
+def _stage_summary_fallback(ctx):
+    return {'summary': _rule_based_summary(ctx['cures_pos_counts'], ctx['cures_neg_counts'])}
+
+
+def _stage_entities(ctx):
+    return {'entities': extract_entities(ctx['clean_text'])}
+
+
+def _stage_entities_fallback(ctx):
+    return {'entities': extract_entities(ctx['clean_text'], use_spacy=False)}
+
+
+def _stage_topics(ctx):
+    raw_texts = [r.get('raw', '') for r in ctx['parsed']]
+    return {'topics': topics_from_texts(raw_texts, top_n=5) if raw_texts else []}
+
+
+def _stage_topics_fallback(ctx):
+    return {'topics': topics_by_frequency([r.get('raw', '') for r in ctx['parsed']], top_n=5)}
+
+
+def _stage_table(ctx):
+    # numpy is only needed by callers that ask for the columnar form
+    from src.nlp.table import RecordTable
+    return {'table': RecordTable.from_records(ctx['records'])}
+
+
+FIELDS = ('records', 'cures_pos_counts', 'cures_neg_counts', 'keywords', 'summary',
+          'sentiment_scores', 'entities', 'topics')
+
+# Stages with a fallback can be degraded; cost priors (seconds per record) cover the
+# first runs of the model-backed stages, before real timings are known.
+ENGINE = PipelineEngine([
+    Stage('clean', ('text',), ('clean_text',), _stage_clean, incremental=_clean_incremental),
+    Stage('parse', ('clean_text',), ('parsed',), _stage_parse, incremental=_parse_incremental),
+    Stage('classify', ('parsed',), ('classified',), _stage_classify, incremental=_classify_incremental),
+    Stage('spacy_refine', ('classified',), ('records',), _stage_refine, _stage_refine_fallback, cost=0.005,
+          incremental=_refine_incremental),
+    Stage('counts', ('records',), ('cures_pos_counts', 'cures_neg_counts'), _stage_counts,
+          incremental=_counts_incremental),
+    Stage('keywords', ('parsed', 'clean_text'), ('keywords',), _stage_keywords, _stage_keywords_fallback),
+    Stage('vader', ('parsed', 'clean_text'), ('sentiment_scores',), _stage_vader, _stage_vader_fallback,
+          incremental=_vader_incremental),
+    Stage('summarizer', ('clean_text', 'cures_pos_counts', 'cures_neg_counts'), ('summary',), _stage_summary,
+          _stage_summary_fallback, cost=0.05 if TRANSFORMERS_AVAILABLE else 0.0),
+    Stage('entities', ('clean_text',), ('entities',), _stage_entities, _stage_entities_fallback),
+    Stage('topics', ('parsed',), ('topics',), _stage_topics, _stage_topics_fallback),
+    # columnar RecordTable (src/nlp/table.py) of the records; selectable, not a default field
+    Stage('table', ('records',), ('table',), _stage_table),
+], public_fields=FIELDS)
+
+# Bump when the pipeline's output for the same input changes (response ETags depend on it).
+PIPELINE_VERSION = '1'
+# ... as do the optional models that are installed
+PIPELINE_FINGERPRINT = 'v{}:spacy={:d}:vader={:d}:sklearn={:d}:transformers={:d}'.format(
+    PIPELINE_VERSION, SPACY_AVAILABLE, VADER_AVAILABLE, SKLEARN_AVAILABLE, TRANSFORMERS_AVAILABLE)
+
+# Named latency modes -> stages forced onto their rule-based fallback.
+MODES = {
+    'fast': frozenset(st.name for st in ENGINE.stages if st.fallback is not None),
+    'balanced': frozenset({'spacy_refine', 'summarizer'}),
+    'full': frozenset(),
+}
+
+
+def run_pipeline(text: str, fields: Optional[Iterable[str]] = None, mode: str = 'full',
+                 deadline_ms: Optional[float] = None, previous: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Run the stages for ``fields`` and return the whole context (see process_scrolls).
+
+    Besides the fields it holds the intermediate keys an incremental run needs:
+    pass it back as ``previous`` with an edited text (it is not modified) and
+    ``ctx['reused']`` / ``ctx['patched']`` list the stages that were skipped /
+    patched, ``ctx['delta']`` the line and record changes (when lines were diffed).
+    """
+    if mode not in MODES:
+        raise ValueError(f"unknown mode {mode!r}; choose from {', '.join(MODES)}")
+    wanted = FIELDS if fields is None else tuple(fields)
+    deadline = time.perf_counter() + deadline_ms / 1000.0 if deadline_ms else None
+    ctx = ENGINE.run({'text': text}, wanted, degrade=MODES[mode], deadline=deadline, previous=previous)
+    # the delta refers to the previous run's records; keep only its summary
+    delta = ctx.pop('parse_delta', None)
+    if delta is not None:
+        ctx['delta'] = delta.summary()
+    return ctx
+
+
+def process_scrolls(text: str, fields: Optional[Iterable[str]] = None, mode: str = 'full',
+                    deadline_ms: Optional[float] = None, previous: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Process raw healer scrolls and return structured insights.
+
+    Returns a dict with the requested ``fields`` (all of FIELDS by default):
+      - records: src.nlp.records.Record objects (healer, cure, symptom, outcome, sentiment,
+        raw, start, end, classification), read like dicts; ``start``/``end`` are offsets
+        into the cleaned text (field ``clean_text``, selectable but not a default)
+      - cures_pos_counts / cures_neg_counts: cure -> positive / negative count
+      - keywords: list of top keywords
+      - summary: text summary (transformer if available, else rule-based)
+      - sentiment_scores: VADER (or heuristic) score per record outcome
+      - entities: healers, treatments, symptoms, diseases
+      - topics: top topic keywords
+
+    ``mode`` is one of MODES: "fast" (rule-based only), "balanced" (no spaCy
+    refinement or transformer summary) or "full". With ``deadline_ms`` any
+    remaining expensive stage that would overrun the budget falls back to its
+    rule-based version. Degraded stage names are listed under ``degraded``
+    (present only when something was degraded).
+
+    ``previous`` is the context (``run_pipeline``) of an earlier run to re-analyze
+    against; the result then carries ``incremental`` (see ``select_fields``).
+
+    Unknown field names raise KeyError, unknown modes ValueError.
+    """
+    return select_fields(run_pipeline(text, fields, mode=mode, deadline_ms=deadline_ms, previous=previous), fields)
+
+
+def select_fields(ctx: Dict[str, Any], fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """The ``process_scrolls`` result of a ``run_pipeline`` context.
+
+    After an incremental run ``incremental`` holds the ``reused`` and ``patched``
+    stage names and, when lines were diffed, the ``delta`` counts.
+    """
+    wanted = FIELDS if fields is None else tuple(fields)
+    result = {k: ctx[k] for k in wanted}
+    if ctx['degraded']:
+        result['degraded'] = ctx['degraded']
+    if 'reused' in ctx:
+        result['incremental'] = {'reused': ctx['reused'], 'patched': ctx['patched']}
+        if 'delta' in ctx:
+            result['incremental']['delta'] = ctx['delta']
+    return result
+
+
+if __name__ == '__main__':
+    sample = "Healer Anna used garlic for infections — patients healed quickly. Healer John used saltwater for fever — it didn't help."
+    print(process_scrolls(sample))
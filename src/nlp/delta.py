@@ -0,0 +1,127 @@
+# src/nlp/delta.py
+"""
+Line-level re-parsing of an edited text.
+- reparse(): records of the new text from the previous text and records. Only the
+  window between the texts' common prefix and suffix is re-split into lines; lines
+  there that the previous window also had keep their records (re-anchored, not
+  re-parsed), the others are parsed. Records outside the window are shifted.
+- RecordDelta: which new records came from which previous ones, for patching
+  per-record results and aggregates
+Inside the window lines are matched by content, not position: everything derived
+from a record depends only on its line, so moved and repeated lines carry over too.
+"""
+from collections import defaultdict, deque
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
+
+from src.nlp.records import Record, line_spans, records_from_parsed
+from src.nlp.rule_based import parse_lines
+
+# Chars after a line end (or before a line start) that decide where split_lines cuts:
+# at most " ; " plus the lookahead char.
+_BOUNDARY = 4
+_BLOCK = 4096
+
+
+class RecordDelta:
+    """``origin[i]``: index of the previous record new record ``i`` was carried over
+    from (each at most once), or None if it was parsed from a new line."""
+
+    __slots__ = ('origin', 'added', 'removed', 'lines', 'lines_parsed')
+
+    def __init__(self, origin: List[Optional[int]], n_previous: int, lines: int, lines_parsed: int):
+        self.origin = origin
+        self.added = [i for i, k in enumerate(origin) if k is None]
+        kept = set(k for k in origin if k is not None)
+        self.removed = [k for k in range(n_previous) if k not in kept]
+        self.lines = lines
+        self.lines_parsed = lines_parsed
+
+    def summary(self) -> Dict[str, int]:
+        """``lines``: lines re-split (the edited window), ``lines_parsed``: of those, parsed again."""
+        return {'lines': self.lines, 'lines_parsed': self.lines_parsed, 'records_added': len(self.added),
+                'records_removed': len(self.removed), 'records_kept': len(self.origin) - len(self.added)}
+
+
+def common_prefix(a: str, b: str) -> int:
+    n = min(len(a), len(b))
+    i = 0
+    # block-wise first: slice comparison runs in C
+    while i + _BLOCK <= n and a[i:i + _BLOCK] == b[i:i + _BLOCK]:
+        i += _BLOCK
+    while i < n and a[i] == b[i]:
+        i += 1
+    return i
+
+
+def common_suffix(a: str, b: str, limit: int) -> int:
+    """Length of the common suffix, at most ``limit``."""
+    la, lb = len(a), len(b)
+    i = 0
+    while i + _BLOCK <= limit and a[la - i - _BLOCK:la - i] == b[lb - i - _BLOCK:lb - i]:
+        i += _BLOCK
+    while i < limit and a[la - 1 - i] == b[lb - 1 - i]:
+        i += 1
+    return i
+
+
+def _window(old_text: str, old_records: Sequence[Record], new_text: str) -> Tuple[int, int, int]:
+    """``(first, last, start)``: records[first:last] lie in the edited window, which
+    starts at ``start`` in both texts; records before it are unchanged, records
+    from ``last`` on are unchanged but shifted."""
+    prefix = common_prefix(old_text, new_text)
+    suffix = common_suffix(old_text, new_text, min(len(old_text), len(new_text)) - prefix)
+    # the last record well inside the common prefix opens the window: its start is a line start in both
+    first = start = 0
+    for k, rec in enumerate(old_records):
+        if rec.end + _BOUNDARY > prefix:
+            break
+        first, start = k, rec.start
+    # and the first record well inside the common suffix closes it
+    tail_from = len(old_text) - suffix + _BOUNDARY
+    last = len(old_records)
+    while last > first and old_records[last - 1].start >= tail_from:
+        last -= 1
+    return first, last, start
+
+
+def reparse(old_text: str, old_records: Sequence[Record], new_text: str) -> Tuple[List[Record], RecordDelta]:
+    """Records of ``new_text`` (whitespace-normalized) given those of ``old_text``.
+
+    Equal to ``parse_records(new_text)`` except that carried-over records keep their
+    ``classification`` (and callers may carry over any other per-record result).
+    """
+    first, last, start = _window(old_text, old_records, new_text)
+    shift = len(new_text) - len(old_text)
+    end = old_records[last].start + shift if last < len(old_records) else len(new_text)
+    window = new_text[start:end]
+    spans = [(start + s, start + e) for s, e in line_spans(window)]
+
+    available: Dict[str, Deque[int]] = defaultdict(deque)
+    for k in range(first, last):
+        available[old_records[k].raw].append(k)
+    carried: List[Optional[Record]] = []  # per window line
+    origin: Dict[int, int] = {}  # line start -> previous record index
+    to_parse = []
+    for s, e in spans:
+        free = available.get(new_text[s:e])
+        if free:
+            k = free.popleft()
+            carried.append(old_records[k].rebase(new_text, s))
+            origin[s] = k
+        else:
+            carried.append(None)
+            to_parse.append((s, e))
+    # the other lines (new ones, and old ones that gave no record) go through the line memo in one batch
+    parsed = {rec.start: rec for rec in
+              records_from_parsed(new_text, to_parse, parse_lines([new_text[s:e] for s, e in to_parse]))}
+
+    records = [rec.rebase(new_text, rec.start) for rec in old_records[:first]]
+    ks: List[Optional[int]] = list(range(first))
+    for (s, _), rec in zip(spans, carried):
+        rec = rec or parsed.get(s)
+        if rec is not None:
+            records.append(rec)
+            ks.append(origin.get(s))
+    records.extend(rec.rebase(new_text, rec.start + shift) for rec in old_records[last:])
+    ks.extend(range(last, len(old_records)))
+    return records, RecordDelta(ks, len(old_records), len(spans), len(to_parse))
@@ -0,0 +1,198 @@
+# src/nlp/facets.py
+"""
+Facet indexes over a RecordTable.
+- Per facet: record ids grouped by value (sorted-id postings, CSR layout)
+- Per queried value: a packed bitmap, cached, so AND/OR of filters is a few
+  vectorized byte operations even on millions of records
+- Pages are cut from the result bitmap without materializing every matching id
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from src.nlp.table import RecordTable
+
+FACETS = ('sentiment', 'classification', 'cure', 'healer', 'symptom')
+SORT_KEYS = ('index',) + FACETS + ('outcome', 'score')
+
+_popcount = getattr(np, 'bitwise_count', None)
+_POPCOUNT_TABLE = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def _byte_counts(bits: np.ndarray) -> np.ndarray:
+    return _popcount(bits) if _popcount is not None else _POPCOUNT_TABLE[bits]
+
+
+class FacetIndex:
+    """Filter, count, sort and page the records of one RecordTable.
+
+    Filters map a facet to one value or a list of values; values of one facet
+    are ORed, facets are combined with ``op`` ("and" or "or"). Safe to share
+    between request threads (the bitmap LRU is locked).
+    """
+
+    def __init__(self, table: RecordTable, facets: Sequence[str] = FACETS, max_bitmaps: int = 256):
+        self.table = table
+        self.n = len(table)
+        self.facets = tuple(facets)
+        self._postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._totals: Dict[str, np.ndarray] = {}
+        for facet in self.facets:
+            codes = table.codes[facet]
+            counts = np.bincount(codes, minlength=len(table.dictionaries[facet]))
+            order = np.argsort(codes, kind='stable').astype(np.int64)
+            self._postings[facet] = (order, np.concatenate(([0], np.cumsum(counts))))
+            self._totals[facet] = counts
+        self._bitmaps: "OrderedDict[Tuple[str, int], np.ndarray]" = OrderedDict()
+        self._max_bitmaps = max_bitmaps
+        self._bitmaps_lock = threading.Lock()
+        self._orders: Dict[Tuple[str, bool], np.ndarray] = {}
+
+    # -- filtering ------------------------------------------------------------
+
+    def ids(self, facet: str, value: str) -> np.ndarray:
+        """Ascending ids of records whose ``facet`` equals ``value``."""
+        code = self.table.dictionaries[facet].lookup(value)
+        if code < 0:
+            return np.empty(0, dtype=np.int64)
+        order, offsets = self._postings[facet]
+        return order[offsets[code]:offsets[code + 1]]
+
+    def bitmap(self, facet: str, value: str) -> np.ndarray:
+        """Packed bitmap (bit i = record i) of ``facet == value``."""
+        if facet not in self._postings:
+            raise KeyError(facet)
+        key = (facet, self.table.dictionaries[facet].lookup(value))
+        with self._bitmaps_lock:
+            bits = self._bitmaps.get(key)
+            if bits is not None:
+                self._bitmaps.move_to_end(key)
+                return bits
+        # built outside the lock; a concurrent miss for the same key builds an equal bitmap
+        mask = np.zeros(self.n, dtype=bool)
+        mask[self.ids(facet, value)] = True
+        bits = np.packbits(mask)
+        with self._bitmaps_lock:
+            self._bitmaps[key] = bits
+            while len(self._bitmaps) > self._max_bitmaps:
+                self._bitmaps.popitem(last=False)
+        return bits
+
+    def select(self, filters: Optional[Mapping[str, Union[str, Iterable[str]]]] = None,
+               op: str = 'and') -> Optional[np.ndarray]:
+        """Packed bitmap of the matching records, or None when there is no filter (all match)."""
+        if op not in ('and', 'or'):
+            raise ValueError(f"op must be 'and' or 'or', not {op!r}")
+        result = None
+        for facet, wanted in (filters or {}).items():
+            values = [wanted] if isinstance(wanted, str) else list(wanted)
+            if not values:
+                continue
+            term = self.bitmap(facet, values[0])
+            for value in values[1:]:
+                term = term | self.bitmap(facet, value)
+            if result is None:
+                result = term.copy() if len(values) == 1 else term
+            elif op == 'and':
+                result &= term
+            else:
+                result |= term
+        return result
+
+    def count(self, bits: Optional[np.ndarray]) -> int:
+        return self.n if bits is None else int(_byte_counts(bits).sum(dtype=np.int64))
+
+    # -- sorting and paging ---------------------------------------------------
+
+    def order(self, key: str, descending: bool = False) -> np.ndarray:
+        """All ids sorted by ``key`` (stable, so ties keep document order); cached."""
+        cached = self._orders.get((key, descending))
+        if cached is not None:
+            return cached
+        if key == 'index':
+            perm = np.arange(self.n, dtype=np.int64)
+            perm = perm[::-1] if descending else perm
+        else:
+            if key == 'score':
+                if self.table.scores is None:
+                    raise KeyError('score')
+                sort_vals = self.table.scores
+            elif key in self.table.dictionaries:
+                values = self.table.dictionaries[key].values
+                rank = np.empty(len(values), dtype=np.int64)
+                rank[np.argsort(np.array(values, dtype=object), kind='stable')] = np.arange(len(values))
+                sort_vals = rank[self.table.codes[key]]
+            elif key in self.table.offsets:
+                # free-text column: rank the decoded strings once (equal strings share a rank)
+                _, sort_vals = np.unique(np.array(self.table.column(key), dtype=object), return_inverse=True)
+                sort_vals = sort_vals.astype(np.int64)
+            else:
+                raise KeyError(key)
+            perm = np.argsort(-sort_vals if descending else sort_vals, kind='stable')
+        self._orders[(key, descending)] = perm
+        return perm
+
+    def page(self, bits: Optional[np.ndarray], offset: int, limit: int, sort: str = 'index',
+             descending: bool = False) -> np.ndarray:
+        """Ids of records ``offset`` .. ``offset+limit`` of the selection in ``sort`` order."""
+        if sort == 'index' and not descending:
+            if bits is None:
+                return np.arange(offset, min(offset + limit, self.n), dtype=np.int64)
+            return self._nth_set_bits(bits, offset, limit)
+        perm = self.order(sort, descending)
+        if bits is not None:
+            mask = np.unpackbits(bits, count=self.n).view(bool)
+            perm = perm[mask[perm]]
+        return perm[offset:offset + limit]
+
+    @staticmethod
+    def _nth_set_bits(bits: np.ndarray, offset: int, limit: int) -> np.ndarray:
+        # locate the bytes holding set bits offset .. offset+limit, unpack only those
+        cum = np.cumsum(_byte_counts(bits), dtype=np.int64)
+        if not len(cum) or offset >= cum[-1] or limit <= 0:
+            return np.empty(0, dtype=np.int64)
+        first = int(np.searchsorted(cum, offset, side='right'))
+        last = int(np.searchsorted(cum, offset + limit, side='left'))
+        ids = np.flatnonzero(np.unpackbits(bits[first:last + 1])) + first * 8
+        skip = offset - (int(cum[first - 1]) if first else 0)
+        return ids[skip:skip + limit]
+
+    # -- facet counts ---------------------------------------------------------
+
+    def facet_counts(self, bits: Optional[np.ndarray], limit: int = 50) -> Dict[str, Dict[str, int]]:
+        """Per facet, the ``limit`` most common values among the selection and their counts."""
+        mask = None if bits is None else np.unpackbits(bits, count=self.n).view(bool)
+        out = {}
+        for facet in self.facets:
+            values = self.table.dictionaries[facet].values
+            counts = self._totals[facet] if mask is None else np.bincount(
+                self.table.codes[facet][mask], minlength=len(values))
+            top = np.argsort(-counts, kind='stable')[:limit]
+            out[facet] = {values[i]: int(counts[i]) for i in top if counts[i]}
+        return out
+
+    def query(self, filters: Optional[Mapping[str, Union[str, Iterable[str]]]] = None, op: str = 'and',
+              sort: str = 'index', descending: bool = False, page: int = 1, page_size: int = 50,
+              facet_limit: int = 50) -> Dict[str, Any]:
+        """Filter + count + sort + page in one call; records carry their ``id``.
+
+        ``facet_limit=0`` skips the facet counts (e.g. when fetching further pages).
+        """
+        bits = self.select(filters, op)
+        total = self.count(bits)
+        ids = self.page(bits, (page - 1) * page_size, page_size, sort, descending)
+        records = []
+        for i in ids.tolist():
+            rec = self.table.record(i)
+            rec['id'] = i
+            records.append(rec)
+        return {
+            'total': total,
+            'page': page,
+            'page_size': page_size,
+            'pages': -(-total // page_size) if page_size else 0,
+            'records': records,
+            'facets': self.facet_counts(bits, facet_limit) if facet_limit else {},
+        }
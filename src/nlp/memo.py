@@ -0,0 +1,98 @@
+# src/nlp/memo.py
+"""
+Cross-request memo for per-line parsing.
+- LineMemo: size-bounded LRU of line -> immutable parse result
+- map(): collapses duplicate lines to one lookup (and at most one computation) each
+  and computes all misses in one batch (so callers can parallelize them)
+- Lines from split_lines are already whitespace-normalized, so whitespace-identical
+  lines share an entry
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Sequence
+
+from src.utils.metrics import REGISTRY
+
+# Enough for the distinct lines of a large archive; entries are small immutable tuples.
+DEFAULT_MEMO_SIZE = 20_000
+
+LINES = REGISTRY.counter(
+    'healerscribe_line_memo_lines_total',
+    'Parsed lines by memo result (hit, miss = computed, duplicate = repeat within one document).',
+    ('result',),
+)
+
+_MISSING = object()
+
+
+class LineMemo:
+    """Thread-safe LRU memo for a pure per-line function.
+
+    Cached values must be immutable (they are shared by every caller); ``None`` is
+    a valid value. ``maxsize=0`` disables the cross-request cache, but duplicate
+    lines within one call are still computed once.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_MEMO_SIZE):
+        self.maxsize = max(0, int(maxsize))
+        self._data: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.duplicates = 0
+
+    def resize(self, maxsize: int) -> None:
+        with self._lock:
+            self.maxsize = max(0, int(maxsize))
+            self._evict()
+
+    def _evict(self) -> None:
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def map(self, lines: Sequence[str], compute: Callable[[List[str]], List[Any]]) -> List[Any]:
+        """Results for ``lines`` in order; ``compute`` gets the distinct uncached lines once."""
+        multiplicity: Dict[str, int] = {}
+        for line in lines:
+            multiplicity[line] = multiplicity.get(line, 0) + 1
+        found: Dict[str, Any] = {}
+        missing = []
+        with self._lock:
+            for line in multiplicity:
+                value = self._data.get(line, _MISSING)
+                if value is _MISSING:
+                    missing.append(line)
+                else:
+                    self._data.move_to_end(line)
+                    found[line] = value
+        if missing:
+            computed = compute(missing)
+            found.update(zip(missing, computed))
+            if self.maxsize:
+                with self._lock:
+                    self._data.update(zip(missing, computed))
+                    self._evict()
+        hits, misses, duplicates = len(multiplicity) - len(missing), len(missing), len(lines) - len(multiplicity)
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+            self.duplicates += duplicates
+        LINES.inc(hits, result='hit')
+        LINES.inc(misses, result='miss')
+        LINES.inc(duplicates, result='duplicate')
+        return [found[line] for line in lines]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.duplicates = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        """Counts since the last clear; ``hit_rate`` is the share of lines not computed."""
+        total = self.hits + self.misses + self.duplicates
+        return {'size': len(self._data), 'maxsize': self.maxsize, 'hits': self.hits, 'misses': self.misses,
+                'duplicates': self.duplicates,
+                'hit_rate': round((self.hits + self.duplicates) / total, 4) if total else 0.0}
@@ -0,0 +1,133 @@
+# src/nlp/parallel.py
+"""
+Parallel rule-based parsing for large documents.
+- Splits text into record lines once (the same split parse_text uses)
+- Parses contiguous chunks of the distinct, not yet memoized lines on a shared process pool
+- Concatenates chunk results in order, so output equals parse_text(text)
+  (or parse_records(text) for the span-based Record form the pipeline uses)
+"""
+import atexit
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from src.nlp.records import Record, line_spans, parse_records, records_from_parsed
+from src.nlp.rule_based import ParsedLine, parse_line_fields, parse_lines, parse_text, split_lines
+
+logger = logging.getLogger(__name__)
+
+# Texts smaller than this are parsed serially; pool start-up and pickling cost more than they save.
+DEFAULT_MIN_BYTES = 2 * 2 ** 20
+# Chunks per worker: enough to balance uneven lines without drowning in task overhead.
+CHUNKS_PER_WORKER = 4
+
+_config = {'workers': 0, 'min_bytes': DEFAULT_MIN_BYTES}
+_lock = threading.Lock()
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_pid: Optional[int] = None
+_pool_workers = 0
+
+
+def configure(workers: Optional[int] = None, min_bytes: Optional[int] = None) -> None:
+    """Set the default worker count (0 = one per CPU, 1 = always serial) and size threshold."""
+    if workers is not None:
+        _config['workers'] = int(workers)
+    if min_bytes is not None:
+        _config['min_bytes'] = int(min_bytes)
+
+
+def _worker_count(workers: Optional[int]) -> int:
+    n = _config['workers'] if workers is None else workers
+    return n if n > 0 else (os.cpu_count() or 1)
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    global _pool, _pool_pid, _pool_workers
+    with _lock:
+        # a pool inherited through fork (e.g. gunicorn workers) is not usable in the child
+        if _pool is None or _pool_pid != os.getpid() or _pool_workers != workers:
+            if _pool is not None and _pool_pid == os.getpid():
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=workers)
+            _pool_pid = os.getpid()
+            _pool_workers = workers
+        return _pool
+
+
+def shutdown() -> None:
+    """Stop the shared pool (it is recreated on the next parallel parse)."""
+    global _pool
+    with _lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.shutdown(wait=True)
+        _pool = None
+
+
+atexit.register(shutdown)
+
+
+def _parse_lines(lines: List[str]) -> List[Optional[ParsedLine]]:
+    # one entry per line (None for skipped lines) so results can be paired with spans
+    return [parse_line_fields(line) for line in lines]
+
+
+def chunk_lines(lines: List[str], chunks: int) -> List[List[str]]:
+    """Split ``lines`` into at most ``chunks`` contiguous, near-equal slices."""
+    if not lines:
+        return []
+    size = -(-len(lines) // max(1, chunks))
+    return [lines[i:i + size] for i in range(0, len(lines), size)]
+
+
+def _use_pool(text: str, workers: Optional[int], min_bytes: Optional[int]) -> int:
+    """Worker count to use for ``text``, or 0 when it should be parsed serially."""
+    n_workers = _worker_count(workers)
+    threshold = _config['min_bytes'] if min_bytes is None else min_bytes
+    return n_workers if n_workers > 1 and len(text) >= threshold else 0
+
+
+def _parse_pooled(lines: List[str], n_workers: int) -> List[Optional[ParsedLine]]:
+    chunks = chunk_lines(lines, n_workers * CHUNKS_PER_WORKER)
+    if len(chunks) <= 1:
+        return _parse_lines(lines)
+    try:
+        pool = _get_pool(n_workers)
+        parsed = []
+        for part in pool.map(_parse_lines, chunks):
+            parsed.extend(part)
+        return parsed
+    except Exception as e:  # broken pool, no fork/spawn support, ...
+        logger.warning("parallel parse failed, parsing serially: %s", e)
+        shutdown()
+        return _parse_lines(lines)
+
+
+def _parse_aligned(lines: List[str], n_workers: int) -> List[Optional[ParsedLine]]:
+    # memo hits and repeated lines never reach the pool
+    return parse_lines(lines, lambda missing: _parse_pooled(missing, n_workers))
+
+
+def parse_text_parallel(text: str, workers: Optional[int] = None, min_bytes: Optional[int] = None) -> List[Dict]:
+    """Same records as ``parse_text(text)``, parsed on a process pool when ``text`` is large.
+
+    Chunks are cut at record-line boundaries, so no line is ever split. Falls back to
+    serial parsing below ``min_bytes``, with a single worker, or if the pool fails.
+    """
+    text = text or ''
+    n_workers = _use_pool(text, workers, min_bytes)
+    if not n_workers:
+        return parse_text(text)
+    lines = split_lines(text)
+    return [p.to_dict(line) for line, p in zip(lines, _parse_aligned(lines, n_workers)) if p is not None]
+
+
+def parse_records_parallel(text: str, workers: Optional[int] = None, min_bytes: Optional[int] = None) -> List[Record]:
+    """Span-based variant of ``parse_text_parallel`` (``text`` must be whitespace-normalized)."""
+    text = text or ''
+    n_workers = _use_pool(text, workers, min_bytes)
+    if not n_workers:
+        return parse_records(text)
+    spans = line_spans(text)
+    return records_from_parsed(text, spans, _parse_aligned([text[s:e] for s, e in spans], n_workers))
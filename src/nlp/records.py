@@ -0,0 +1,154 @@
+# src/nlp/records.py
+"""
+Compact parsed-record representation.
+- Record: __slots__ record whose raw line and outcome are offsets into one shared text
+- line_spans / parse_records: span-aware counterparts of split_lines / parse_text
+- Strings are materialized on access; to_dict() is the serialization form
+"""
+import sys
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.nlp.rule_based import ParsedLine, parse_lines, split_lines
+
+_intern = sys.intern
+
+
+class Record(Mapping):
+    """One parsed record, read like the dict ``parse_line`` returns.
+
+    ``raw`` is ``text[start:end]`` of the shared (cleaned) source text and
+    ``outcome`` a sub-span of it, so neither is stored separately. Healer, cure,
+    symptom and sentiment values repeat heavily across a corpus and are interned.
+    ``classification`` is filled in by the pipeline, ``side`` by a comparison (the
+    compared text a record came from). Keys ``start``/``end`` expose the span for
+    source highlighting.
+    """
+
+    __slots__ = ('_src', 'start', 'end', 'healer', 'cure', 'symptom', '_out', 'sentiment', 'classification', 'side')
+
+    _KEYS = ('healer', 'cure', 'symptom', 'outcome', 'sentiment', 'raw', 'start', 'end')
+    _OPTIONAL = ('classification', 'side')
+    _SETTABLE = frozenset({'healer', 'cure', 'symptom', 'sentiment', 'classification', 'side'})
+
+    def __init__(self, src: str, start: int, end: int, healer: str, cure: str, symptom: str,
+                 outcome: str, sentiment: str, classification: Optional[str] = None, side: Optional[str] = None):
+        self._src = src
+        self.start = start
+        self.end = end
+        self.healer = _intern(healer)
+        self.cure = _intern(cure)
+        self.symptom = _intern(symptom)
+        # outcome: (offset, length) inside the raw span when it is a substring, else the string itself
+        pos = src.find(outcome, start, end) if outcome else -1
+        self._out = (pos - start, len(outcome)) if pos >= 0 else outcome
+        self.sentiment = _intern(sentiment)
+        self.classification = classification
+        self.side = side
+
+    @classmethod
+    def from_parsed(cls, src: str, start: int, end: int, rec: Dict[str, Any]) -> 'Record':
+        """Wrap a ``parse_line`` dict whose line is ``src[start:end]``."""
+        return cls(src, start, end, rec['healer'], rec['cure'], rec['symptom'], rec['outcome'], rec['sentiment'],
+                   rec.get('classification'), rec.get('side'))
+
+    @property
+    def raw(self) -> str:
+        return self._src[self.start:self.end]
+
+    @property
+    def outcome(self) -> str:
+        out = self._out
+        if isinstance(out, str):
+            return out
+        begin = self.start + out[0]
+        return self._src[begin:begin + out[1]]
+
+    def evolve(self, **changes: str) -> 'Record':
+        """Copy with some fields replaced; the source text is shared, not copied."""
+        new = object.__new__(Record)
+        for name in self.__slots__:
+            object.__setattr__(new, name, getattr(self, name))
+        for key, value in changes.items():
+            new[key] = value
+        return new
+
+    def rebase(self, src: str, start: int, side: Optional[str] = None) -> 'Record':
+        """Copy anchored at ``start`` in ``src``, another text containing the same line there
+        (tagged with ``side`` when given)."""
+        new = object.__new__(Record)
+        new._src, new.start, new.end = src, start, start + (self.end - self.start)
+        new.healer, new.cure, new.symptom, new._out = self.healer, self.cure, self.symptom, self._out
+        new.sentiment, new.classification = self.sentiment, self.classification
+        new.side = self.side if side is None else side
+        return new
+
+    # -- Mapping protocol ----------------------------------------------------
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._KEYS or (key in self._OPTIONAL and getattr(self, key) is not None):
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: str) -> None:
+        if key not in self._SETTABLE:
+            raise KeyError(key)
+        setattr(self, key, _intern(value) if key not in self._OPTIONAL else value)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._KEYS
+        for key in self._OPTIONAL:
+            if getattr(self, key) is not None:
+                yield key
+
+    def __len__(self) -> int:
+        return len(self._KEYS) + sum(getattr(self, key) is not None for key in self._OPTIONAL)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {k: self[k] for k in self}
+
+    def copy(self) -> Dict[str, Any]:
+        """A plain dict, as ``dict.copy`` gave callers that add their own keys."""
+        return self.to_dict()
+
+    def __repr__(self) -> str:
+        return f"Record({self.to_dict()!r})"
+
+    def __reduce__(self):
+        # pickle (caches, process pools) as a plain dict
+        return (dict, (self.to_dict(),))
+
+
+def line_spans(text: str) -> List[Tuple[int, int]]:
+    """(start, end) of each ``split_lines`` line in ``text``.
+
+    ``text`` must already be whitespace-normalized (e.g. by ``clean_text``) so the
+    lines are verbatim substrings.
+    """
+    spans = []
+    pos = 0
+    for line in split_lines(text):
+        start = text.find(line, pos)
+        if start < 0:
+            raise ValueError('text is not whitespace-normalized; clean it first')
+        pos = start + len(line)
+        spans.append((start, pos))
+    return spans
+
+
+def records_from_parsed(text: str, spans: List[Tuple[int, int]], parsed: Iterable[Optional[ParsedLine]]) -> List[Record]:
+    """Pair ``parse_lines`` results (None for skipped lines) with their spans."""
+    return [Record(text, s, e, *fields) for (s, e), fields in zip(spans, parsed) if fields is not None]
+
+
+def parse_records(text: str) -> List[Record]:
+    """Span-based ``parse_text`` over whitespace-normalized ``text``."""
+    spans = line_spans(text)
+    return records_from_parsed(text, spans, parse_lines([text[s:e] for s, e in spans]))
+
+
+def to_serializable(obj: Any) -> Any:
+    """``json.dumps(default=...)`` hook materializing Records."""
+    if isinstance(obj, Record):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
@@ -3,9 +3,12 @@
 Rule-based NLP utilities for The Healer's Scribe.
 - Sentiment classification
 - Healer/cure/symptom extraction
+- Line splitting and record parsing (memoized per line across requests)
 """
 import re
-from typing import List, Dict, Tuple
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from src.nlp.memo import DEFAULT_MEMO_SIZE, LineMemo
 
 POSITIVE_KEYWORDS = [
     "worked", "improved", "healed", "helped", "recovered", "good", "successful", "success", "well", "aided", "broke"
@@ -64,23 +67,102 @@ def extract_cure_and_symptom(text: str) -> Tuple[str, str, str]:
             symptom = m.group(2).strip()
             outcome = (m.group(3) or "").strip()
             return cure, symptom, outcome
+    # fallback: word(s) after a treatment verb, optional 'for' symptom, outcome after a comma/dash
+    m2 = re.search(r"(?:used|applied|administered|gave|tried)\s+([a-zA-Z0-9\s'-]+)", text, flags=re.IGNORECASE)
+    if m2:
+        cure = m2.group(1).split(" for ")[0].strip()
+        m3 = re.search(r"for\s+([a-zA-Z0-9\s'-]+)", text, flags=re.IGNORECASE)
+        symptom = m3.group(1).strip() if m3 else ""
+        parts = re.split(r",|-|—|;", text)
+        outcome = parts[1].strip() if len(parts) > 1 else ""
+        return cure, symptom, outcome
     return "", "", ""
 
-def parse_text(text: str) -> List[Dict]:
-    records = []
-    for line in (text or '').splitlines():
-        line = line.strip()
-        if not line:
+def split_lines(text: str) -> List[str]:
+    """Split healer text into candidate record lines.
+
+    Whitespace (newlines included) is normalized first; records are then split on
+    semicolons and on sentence ends followed by a capital or a title, so "Dr. Old"
+    stays together. Em-dashes are kept: they connect outcomes.
+    """
+    text = re.sub(r"\s+", " ", (text or '').replace('\r', ' ')).strip()
+    lines = []
+    for part in re.split(r"\n+|;", text):
+        part = part.strip()
+        if not part:
             continue
-        healer = extract_healer(line)
-        cure, symptom, outcome = extract_cure_and_symptom(line)
-        sentiment = classify_sentiment(line)
-        records.append({
-            "healer": healer,
-            "cure": cure,
-            "symptom": symptom,
-            "outcome": outcome,
-            "sentiment": sentiment,
-            "raw": line
-        })
-    return records
+        lines.extend(s.strip() for s in re.split(r"(?<=[.!?])\s+(?=[A-Z]|Healer|Dr|Doctor|Elder|Brother|Sister)", part) if s.strip())
+    return lines
+
+
+def parse_line(line: str) -> Optional[Dict]:
+    """Parse one line into a record, or None for fragments without healer or cure."""
+    healer = extract_healer(line)
+    cure, symptom, outcome = extract_cure_and_symptom(line)
+    # fragments without healer AND cure: short ones, or continuations starting lowercase
+    if healer == "Unknown" and not cure and len(line.split()) < 5:
+        return None
+    if healer == "Unknown" and not cure and line and line[0].islower():
+        return None
+    if not outcome:
+        # everything after the last comma, else the clause after an em-dash
+        parts = [p.strip() for p in line.split(",")]
+        outcome = parts[-1] if len(parts) > 1 else ""
+    if not outcome and '—' in line:
+        outcome = line.split('—')[-1].strip()
+    return {
+        "healer": healer,
+        "cure": cure or "",
+        "symptom": symptom or "",
+        "outcome": outcome or "",
+        "sentiment": classify_sentiment(outcome if outcome else line),
+        "raw": line
+    }
+
+
+class ParsedLine(NamedTuple):
+    """Immutable ``parse_line`` result without the line itself; what the line memo stores."""
+    healer: str
+    cure: str
+    symptom: str
+    outcome: str
+    sentiment: str
+
+    def to_dict(self, raw: str) -> Dict:
+        return {"healer": self.healer, "cure": self.cure, "symptom": self.symptom,
+                "outcome": self.outcome, "sentiment": self.sentiment, "raw": raw}
+
+
+def parse_line_fields(line: str) -> Optional[ParsedLine]:
+    rec = parse_line(line)
+    if rec is None:
+        return None
+    return ParsedLine(rec["healer"], rec["cure"], rec["symptom"], rec["outcome"], rec["sentiment"])
+
+
+def _parse_batch(lines: List[str]) -> List[Optional[ParsedLine]]:
+    return [parse_line_fields(line) for line in lines]
+
+
+LINE_MEMO = LineMemo(DEFAULT_MEMO_SIZE)
+
+
+def configure_memo(maxsize: int) -> None:
+    """Bound the cross-request line memo (0 = off; duplicates within a text are still parsed once)."""
+    LINE_MEMO.resize(maxsize)
+
+
+def parse_lines(lines: Sequence[str],
+                compute: Optional[Callable[[List[str]], List[Optional[ParsedLine]]]] = None) -> List[Optional[ParsedLine]]:
+    """``parse_line_fields`` of each line (None for skipped lines), through the line memo.
+
+    Each distinct line is parsed at most once; ``compute`` parses a batch of distinct
+    uncached lines (default: serially).
+    """
+    return LINE_MEMO.map(lines, compute or _parse_batch)
+
+
+def parse_text(text: str) -> List[Dict]:
+    """Parse multi-line unstructured healer text into structured records."""
+    lines = split_lines(text)
+    return [p.to_dict(line) for line, p in zip(lines, parse_lines(lines)) if p is not None]
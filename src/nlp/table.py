@@ -0,0 +1,273 @@
+# src/nlp/table.py
+"""
+Columnar in-memory record table.
+- Categorical fields (healer, cure, symptom, sentiment, classification, side) are
+  dictionary-encoded: one list of distinct values plus an int32 code per record
+- raw and outcome are (start, end) offsets into one string pool
+- Optional float32 scores (e.g. VADER sentiment_scores)
+- Vectorized counting, filtering and grouping; converts to and from list-of-dicts
+"""
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from src.nlp.records import Record
+
+CATEGORICAL = ('healer', 'cure', 'symptom', 'sentiment', 'classification', 'side')
+TEXT = ('raw', 'outcome')
+
+
+class Dictionary:
+    """Distinct values of one categorical column; code ``i`` is ``values[i]``."""
+
+    __slots__ = ('values', '_index')
+
+    def __init__(self, values: Iterable[str] = ()):
+        self.values: List[str] = []
+        self._index: Dict[str, int] = {}
+        for v in values:
+            self.code(v)
+
+    def code(self, value: str) -> int:
+        """Code for ``value``, adding it if new."""
+        idx = self._index.get(value)
+        if idx is None:
+            idx = self._index[value] = len(self.values)
+            self.values.append(value)
+        return idx
+
+    def lookup(self, value: str) -> int:
+        """Code for ``value``, or -1 if it never occurs."""
+        return self._index.get(value, -1)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+class RecordTable:
+    """Records stored column-wise.
+
+    Build with ``from_records`` (list of dicts or Records); ``to_records`` gives the
+    list-of-dicts form back. Filtering returns a new table sharing dictionaries and
+    the string pool.
+    """
+
+    def __init__(self, dictionaries: Dict[str, Dictionary], codes: Dict[str, np.ndarray], pool: str,
+                 offsets: Dict[str, np.ndarray], scores: Optional[np.ndarray] = None, source_len: int = 0):
+        self.dictionaries = dictionaries
+        self.codes = codes
+        self.pool = pool
+        self.offsets = offsets  # name -> int64 array of shape (n, 2)
+        self.scores = scores
+        # the pool starts with the records' source text; raw spans inside it are record offsets
+        self.source_len = source_len
+
+    # -- construction ---------------------------------------------------------
+
+    @classmethod
+    def from_records(cls, records: Sequence[Mapping[str, Any]], scores: Optional[Sequence[float]] = None) -> 'RecordTable':
+        """Encode ``records``; Records sharing one source text reuse it as the string pool."""
+        n = len(records)
+        dictionaries = {name: Dictionary() for name in CATEGORICAL}
+        codes = {}
+        for name in CATEGORICAL:
+            code = dictionaries[name].code
+            codes[name] = np.fromiter((code(r.get(name) or '') for r in records), dtype=np.int32, count=n)
+
+        src = records[0]._src if n and isinstance(records[0], Record) else None
+        parts: List[str] = [src] if src is not None else []
+        size = len(src) if src is not None else 0
+        offsets = {name: np.empty((n, 2), dtype=np.int64) for name in TEXT}
+        for i, r in enumerate(records):
+            if src is not None and isinstance(r, Record) and r._src is src:
+                start, end = r.start, r.end
+            else:
+                raw = r.get('raw') or ''
+                parts.append(raw)
+                start, end = size, size + len(raw)
+                size = end
+            offsets['raw'][i] = (start, end)
+            # outcome: inside the raw span when possible, else appended to the pool
+            outcome = r.get('outcome') or ''
+            pos = (r.get('raw') or '').find(outcome) if outcome else -1
+            if pos >= 0:
+                offsets['outcome'][i] = (start + pos, start + pos + len(outcome))
+            else:
+                parts.append(outcome)
+                offsets['outcome'][i] = (size, size + len(outcome))
+                size += len(outcome)
+        score_arr = np.asarray(scores, dtype=np.float32) if scores is not None else None
+        if score_arr is not None and len(score_arr) != n:
+            raise ValueError(f'{len(score_arr)} scores for {n} records')
+        return cls(dictionaries, codes, ''.join(parts), offsets, score_arr, source_len=len(src) if src else 0)
+
+    # -- access ---------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self.codes['sentiment'])
+
+    def column(self, name: str) -> List[Any]:
+        """Decoded values of one column."""
+        if name in self.dictionaries:
+            values = self.dictionaries[name].values
+            return [values[c] for c in self.codes[name]]
+        if name in self.offsets:
+            pool = self.pool
+            return [pool[s:e] for s, e in self.offsets[name].tolist()]
+        if name == 'score' and self.scores is not None:
+            return self.scores.tolist()
+        raise KeyError(name)
+
+    def record(self, i: int) -> Dict[str, Any]:
+        rec = {}
+        for name in ('healer', 'cure', 'symptom'):
+            rec[name] = self.dictionaries[name].values[self.codes[name][i]]
+        s, e = self.offsets['outcome'][i]
+        rec['outcome'] = self.pool[s:e]
+        rec['sentiment'] = self.dictionaries['sentiment'].values[self.codes['sentiment'][i]]
+        s, e = self.offsets['raw'][i]
+        rec['raw'] = self.pool[s:e]
+        if e <= self.source_len:
+            rec['start'], rec['end'] = int(s), int(e)
+        classification = self.dictionaries['classification'].values[self.codes['classification'][i]]
+        if classification:
+            rec['classification'] = classification
+        side = self.dictionaries['side'].values[self.codes['side'][i]]
+        if side:
+            rec['side'] = side
+        if self.scores is not None:
+            rec['score'] = float(self.scores[i])
+        return rec
+
+    @property
+    def has_sides(self) -> bool:
+        """Whether any record carries a ``side`` (the records of a comparison)."""
+        return any(self.dictionaries['side'].values)
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """The list-of-dicts form used by the rest of the API."""
+        return [self.record(i) for i in range(len(self))]
+
+    def to_columnar(self) -> Dict[str, Any]:
+        """JSON-ready parallel arrays: categorical columns as ``{"codes", "dictionary"}``.
+
+        ``start``/``end`` are null for records whose span is not in the source text;
+        ``score`` is present when the table has scores, ``side`` when it has sides.
+        """
+        columns: Dict[str, Any] = {}
+        for name in ('healer', 'cure', 'symptom'):
+            columns[name] = {'codes': self.codes[name].tolist(), 'dictionary': self.dictionaries[name].values}
+        columns['outcome'] = self.column('outcome')
+        columns['sentiment'] = {'codes': self.codes['sentiment'].tolist(),
+                                'dictionary': self.dictionaries['sentiment'].values}
+        columns['raw'] = self.column('raw')
+        spans = self.offsets['raw']
+        inside = spans[:, 1] <= self.source_len
+        columns['start'] = [int(s) if ok else None for s, ok in zip(spans[:, 0].tolist(), inside.tolist())]
+        columns['end'] = [int(e) if ok else None for e, ok in zip(spans[:, 1].tolist(), inside.tolist())]
+        columns['classification'] = {'codes': self.codes['classification'].tolist(),
+                                     'dictionary': self.dictionaries['classification'].values}
+        if self.has_sides:
+            columns['side'] = {'codes': self.codes['side'].tolist(), 'dictionary': self.dictionaries['side'].values}
+        if self.scores is not None:
+            columns['score'] = self.scores.tolist()
+        return {'format': 'columnar', 'length': len(self), 'columns': columns}
+
+    # -- vectorized operations -----------------------------------------------
+
+    def mask(self, **conditions: Union[str, Iterable[str]]) -> np.ndarray:
+        """Boolean mask of records matching every condition (a value or any of several)."""
+        result = np.ones(len(self), dtype=bool)
+        for name, wanted in conditions.items():
+            values = [wanted] if isinstance(wanted, str) else list(wanted)
+            lookup = self.dictionaries[name].lookup
+            wanted_codes = [c for c in (lookup(v) for v in values) if c >= 0]
+            result &= np.isin(self.codes[name], np.asarray(wanted_codes, dtype=np.int32))
+        return result
+
+    def take(self, selector: np.ndarray) -> 'RecordTable':
+        """Sub-table for a boolean mask or an index array."""
+        return RecordTable(self.dictionaries, {k: v[selector] for k, v in self.codes.items()}, self.pool,
+                           {k: v[selector] for k, v in self.offsets.items()},
+                           self.scores[selector] if self.scores is not None else None, self.source_len)
+
+    def filter(self, **conditions: Union[str, Iterable[str]]) -> 'RecordTable':
+        return self.take(self.mask(**conditions))
+
+    def value_counts(self, name: str, mask: Optional[np.ndarray] = None) -> Dict[str, int]:
+        """Occurrences of each value of ``name`` (optionally among ``mask``), most common first."""
+        codes = self.codes[name] if mask is None else self.codes[name][mask]
+        counts = np.bincount(codes, minlength=len(self.dictionaries[name]))
+        values = self.dictionaries[name].values
+        order = np.argsort(-counts, kind='stable')
+        return {values[i]: int(counts[i]) for i in order if counts[i]}
+
+    def crosstab(self, rows: str, cols: str) -> np.ndarray:
+        """Count matrix ``[row_code, col_code]`` of two categorical columns."""
+        n_rows, n_cols = len(self.dictionaries[rows]), len(self.dictionaries[cols])
+        combined = self.codes[rows].astype(np.int64) * n_cols + self.codes[cols]
+        return np.bincount(combined, minlength=n_rows * n_cols).reshape(n_rows, n_cols)
+
+    def pair_counts(self, a: str, b: str, limit: Optional[int] = None) -> List[Tuple[str, str, int]]:
+        """Co-occurring ``(a value, b value, count)`` pairs, most common first.
+
+        Unlike ``crosstab`` only pairs that occur are materialized, so it stays small
+        for high-cardinality columns such as healer x cure.
+        """
+        n_b = len(self.dictionaries[b])
+        pairs, counts = np.unique(self.codes[a].astype(np.int64) * n_b + self.codes[b], return_counts=True)
+        order = np.argsort(-counts, kind='stable')[:limit]
+        a_values, b_values = self.dictionaries[a].values, self.dictionaries[b].values
+        return [(a_values[pairs[i] // n_b], b_values[pairs[i] % n_b], int(counts[i])) for i in order]
+
+    def running_effectiveness(self, top: int = 5, max_points: int = 200) -> Dict[str, Dict[str, List[int]]]:
+        """Cumulative (positive - negative) mentions of the ``top`` most mentioned cures.
+
+        Per cure: ``x`` the record indexes of its mentions and ``y`` the running score,
+        thinned to at most ``max_points`` evenly spaced points (the last one always kept).
+        """
+        codes = self.codes['cure']
+        sentiment = self.dictionaries['sentiment']
+        delta = np.zeros(len(self), dtype=np.int64)
+        for value, step in (('positive', 1), ('negative', -1)):
+            code = sentiment.lookup(value)
+            if code >= 0:
+                delta[self.codes['sentiment'] == code] = step
+        counts = np.bincount(codes, minlength=len(self.dictionaries['cure']))
+        out = {}
+        for code in np.argsort(-counts, kind='stable')[:top]:
+            if not counts[code]:
+                break
+            idx = np.flatnonzero(codes == code)
+            score = np.cumsum(delta[idx])
+            if len(idx) > max_points:
+                keep = np.unique(np.linspace(0, len(idx) - 1, max_points).astype(np.int64))
+                idx, score = idx[keep], score[keep]
+            out[self.dictionaries['cure'].values[code] or 'unknown'] = {'x': idx.tolist(), 'y': score.tolist()}
+        return out
+
+    def cure_counts(self):
+        """(positive, negative) cure -> count dicts, as ``count_cures`` computes from dicts."""
+        matrix = self.crosstab('cure', 'sentiment')
+        cures = self.dictionaries['cure'].values
+        out = []
+        for sentiment in ('positive', 'negative'):
+            col = self.dictionaries['sentiment'].lookup(sentiment)
+            counts = {}
+            if col >= 0:
+                for code in np.flatnonzero(matrix[:, col]):
+                    cure = cures[code].strip()
+                    if cure:
+                        counts[cure] = counts.get(cure, 0) + int(matrix[code, col])
+            out.append(counts)
+        return out[0], out[1]
+
+    def mean_score(self, by: str) -> Dict[str, float]:
+        """Mean score per value of ``by`` (requires scores)."""
+        if self.scores is None:
+            raise ValueError('table has no scores')
+        n = len(self.dictionaries[by])
+        totals = np.bincount(self.codes[by], weights=self.scores, minlength=n)
+        counts = np.bincount(self.codes[by], minlength=n)
+        values = self.dictionaries[by].values
+        return {values[i]: float(totals[i] / counts[i]) for i in np.flatnonzero(counts)}
@@ -0,0 +1,213 @@
+# src/services/analysis_store.py
+"""
+Store of finished analyses, addressed by id.
+- Keeps each analysis as a columnar RecordTable plus its FacetIndex
+- Optionally keeps the pipeline context too, for incremental re-analysis of an edit
+- Size-bounded and expiring (TTLCache) in each worker; with a shared backend
+  (FileTables, SQLiteTables) the tables are also written where every worker on the
+  host can load them, so /api/records/query works whichever worker gets the request.
+  Pipeline contexts are never shared (they stay with the worker that ran the pipeline).
+"""
+import os
+import pickle
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, Optional, Sequence
+
+from src.nlp.facets import FacetIndex
+from src.nlp.table import RecordTable
+from src.utils.cache import TTLCache
+
+
+class StoredAnalysis:
+    __slots__ = ('id', 'table', 'index', 'created', 'meta', 'context')
+
+    def __init__(self, analysis_id: str, table: RecordTable, index: FacetIndex, meta: Optional[Dict[str, Any]] = None,
+                 context: Optional[Dict[str, Any]] = None):
+        self.id = analysis_id
+        self.table = table
+        self.index = index
+        self.created = time.time()
+        self.meta = meta or {}
+        self.context = context
+
+
+# Ids are uuid4 hex; anything else (e.g. a path) is never looked up in a shared backend
+_ID = re.compile(r'^[0-9a-f]{32}$')
+
+
+class FileTables:
+    """Pickled analyses in ``directory``, one file each.
+
+    Every ``purge_every`` saves, files older than ``ttl`` and all but the newest
+    ``maxsize`` are removed.
+    """
+
+    def __init__(self, directory: str, maxsize: int = 32, ttl: float = 3600.0, purge_every: int = 8):
+        self.directory = directory
+        self.maxsize = max(1, int(maxsize))
+        self.ttl = float(ttl)
+        self.purge_every = max(1, int(purge_every))
+        self._saves = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, analysis_id: str) -> str:
+        return os.path.join(self.directory, analysis_id + '.pickle')
+
+    def save(self, analysis_id: str, payload: bytes) -> None:
+        path = self._path(analysis_id)
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp, path)
+        self._saves += 1
+        if self._saves % self.purge_every == 0:
+            self._purge()
+
+    def load(self, analysis_id: str) -> Optional[bytes]:
+        try:
+            with open(self._path(analysis_id), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _purge(self) -> None:
+        files = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.pickle'):
+                path = os.path.join(self.directory, name)
+                try:
+                    files.append((os.path.getmtime(path), path))
+                except OSError:
+                    pass
+        files.sort(reverse=True)
+        cutoff = time.time() - self.ttl
+        for i, (mtime, path) in enumerate(files):
+            if i >= self.maxsize or mtime < cutoff:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+
+class SQLiteTables:
+    """Pickled analyses in a local SQLite file (newest ``maxsize`` kept, none older than ``ttl``)."""
+
+    def __init__(self, path: str, maxsize: int = 32, ttl: float = 3600.0):
+        self.path = path
+        self.maxsize = max(1, int(maxsize))
+        self.ttl = float(ttl)
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._connect().execute(
+            "CREATE TABLE IF NOT EXISTS analyses (id TEXT PRIMARY KEY, created REAL NOT NULL, payload BLOB NOT NULL)"
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def save(self, analysis_id: str, payload: bytes) -> None:
+        conn = self._connect()
+        now = time.time()
+        conn.execute('INSERT OR REPLACE INTO analyses (id, created, payload) VALUES (?, ?, ?)',
+                     (analysis_id, now, payload))
+        conn.execute('DELETE FROM analyses WHERE created < ? OR id NOT IN '
+                     '(SELECT id FROM analyses ORDER BY created DESC LIMIT ?)', (now - self.ttl, self.maxsize))
+
+    def load(self, analysis_id: str) -> Optional[bytes]:
+        row = self._connect().execute('SELECT payload FROM analyses WHERE id = ? AND created >= ?',
+                                      (analysis_id, time.time() - self.ttl)).fetchone()
+        return row[0] if row else None
+
+
+class AnalysisStore:
+    """Analyses kept for ``ttl`` seconds, at most ``maxsize`` of them (least recently used evicted).
+
+    With a ``shared`` backend (FileTables / SQLiteTables), an analysis this worker
+    doesn't hold is loaded from it and indexed again; its ``context`` is then None.
+    """
+
+    def __init__(self, maxsize: int = 32, ttl: float = 3600.0, shared=None):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.ttl = float(ttl)
+        self.shared = shared
+
+    def put(self, records: Sequence, scores: Optional[Sequence[float]] = None,
+            meta: Optional[Dict[str, Any]] = None, context: Optional[Dict[str, Any]] = None) -> StoredAnalysis:
+        """Index ``records`` (dicts or Records) and store them under a new id.
+
+        ``context`` is the pipeline context (``run_pipeline``) that produced them.
+        """
+        if scores is not None and len(scores) != len(records):
+            scores = None
+        table = RecordTable.from_records(records, scores=scores)
+        stored = StoredAnalysis(uuid.uuid4().hex, table, FacetIndex(table), meta, context)
+        self._cache.set(stored.id, stored)
+        if self.shared is not None:
+            payload = (stored.table, stored.meta, stored.created)
+            self.shared.save(stored.id, pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL))
+        return stored
+
+    def get(self, analysis_id: str) -> Optional[StoredAnalysis]:
+        """The stored analysis, or None (also for an id that is not a non-empty string)."""
+        if not analysis_id or not isinstance(analysis_id, str):
+            return None
+        stored = self._cache.get(analysis_id)
+        if stored is None and self.shared is not None and _ID.match(analysis_id):
+            stored = self._load(analysis_id)
+        return stored
+
+    def _load(self, analysis_id: str) -> Optional[StoredAnalysis]:
+        payload = self.shared.load(analysis_id)
+        if payload is None:
+            return None
+        try:
+            table, meta, created = pickle.loads(payload)
+        except Exception:  # written by an incompatible version
+            return None
+        if time.time() - created > self.ttl:
+            return None
+        stored = StoredAnalysis(analysis_id, table, FacetIndex(table), meta)
+        stored.created = created
+        self._cache.set(analysis_id, stored)
+        return stored
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+
+def server_workers() -> int:
+    """Worker processes the server was started with, as far as the environment tells
+    (gunicorn's WEB_CONCURRENCY or ``-w`` / ``--workers`` in GUNICORN_CMD_ARGS); 1 if unknown."""
+    match = re.search(r'(?:^|\s)(?:-w|--workers)(?:=|\s+)(\d+)', os.environ.get('GUNICORN_CMD_ARGS', ''))
+    for raw in (match.group(1) if match else None, os.environ.get('WEB_CONCURRENCY')):
+        try:
+            return max(1, int(raw))
+        except (TypeError, ValueError):
+            continue
+    return 1
+
+
+def make_store(backend: str = 'memory', path: Optional[str] = None, maxsize: int = 32,
+               ttl: float = 3600.0) -> AnalysisStore:
+    """AnalysisStore with the configured shared backend (``memory`` = this worker only, ``file``, ``sqlite``).
+
+    ``auto`` is ``file`` when the server runs more than one worker (see server_workers),
+    else ``memory``: a shared backend pickles every stored table within the request.
+    """
+    if backend == 'auto':
+        backend = 'file' if server_workers() > 1 else 'memory'
+    if backend == 'file':
+        return AnalysisStore(maxsize, ttl, FileTables(path or 'instance/analyses', maxsize=maxsize, ttl=ttl))
+    if backend == 'sqlite':
+        return AnalysisStore(maxsize, ttl, SQLiteTables(path or 'instance/analyses.sqlite3', maxsize=maxsize, ttl=ttl))
+    return AnalysisStore(maxsize, ttl)
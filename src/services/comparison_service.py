@@ -0,0 +1,137 @@
+# src/services/comparison_service.py
+"""
+Healer comparison (/analyze, /api/compare).
+- Each side is analyzed on its own, both in parallel, through a result cache keyed by
+  the side's text hash and options: a side that stays the same is not analyzed again
+- compare_results(): per-side aggregates plus the per-cure effectiveness diff
+- combine_results(): one page result over both sides, records re-anchored into one text
+  and tagged with their ``side`` ('A' / 'B')
+"""
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from config.settings import settings
+from src.core.nlp_pipeline import FIELDS
+from src.nlp.records import Record
+from src.services.processing_service import analyze_text, copy_result, result_key
+from src.utils.cache import TTLCache
+
+# What the results page and the comparison need of each side
+SIDE_FIELDS = FIELDS + ('clean_text',)
+# Between the sides in the combined text (the cleaned form of the old "\n\n----\n\n" join)
+SEPARATOR = ' ---- '
+
+_SIDES = TTLCache(maxsize=settings.COMPARE_CACHE_SIZE, ttl=settings.COMPARE_CACHE_TTL)
+_POOL = ThreadPoolExecutor(max_workers=max(1, settings.COMPARE_WORKERS), thread_name_prefix='compare')
+
+
+def cure_effectiveness(cures_pos: Dict[str, int], cures_neg: Dict[str, int]) -> Dict[str, Dict[str, int]]:
+    """cure -> positive / negative / total reports and ``pct`` effective (int percent)."""
+    effectiveness = {}
+    for cure in set(cures_pos) | set(cures_neg):
+        p = int(cures_pos.get(cure, 0))
+        n = int(cures_neg.get(cure, 0))
+        total = p + n
+        effectiveness[cure] = {'pos': p, 'neg': n, 'total': total, 'pct': int((p / total) * 100) if total > 0 else 0}
+    return effectiveness
+
+
+def analyze_side(text: str, fields: Sequence[str] = SIDE_FIELDS, mode: Optional[str] = None,
+                 deadline_ms: Optional[float] = None) -> Tuple[Dict[str, Any], bool]:
+    """``(result, cached)`` for one side; cached results are shared, so a ``copy_result`` is returned."""
+    mode = mode or settings.PIPELINE_MODE
+    deadline_ms = settings.PIPELINE_DEADLINE_MS if deadline_ms is None else deadline_ms
+    key = result_key(text, list(fields), mode, deadline_ms)
+    result = _SIDES.get(key)
+    if result is not None:
+        return copy_result(result), True
+    result = analyze_text(text, fields, mode=mode, deadline_ms=deadline_ms)
+    # a result degraded by the deadline depends on the load at the time; don't keep it
+    if not (deadline_ms and result.get('degraded')):
+        _SIDES.set(key, result)
+    return copy_result(result), False
+
+
+def analyze_sides(texts: Sequence[str], **options) -> List[Tuple[Dict[str, Any], bool]]:
+    """``analyze_side`` of each text, the uncached ones in parallel (the first in this thread)."""
+    out: List[Optional[Tuple[Dict[str, Any], bool]]] = [None] * len(texts)
+    futures = {}
+    for i, text in enumerate(texts):
+        if i == 0:
+            continue
+        # copy the context so timed stages still reach the request's collect_timings()
+        futures[i] = _POOL.submit(contextvars.copy_context().run, analyze_side, text, **options)
+    if texts:
+        out[0] = analyze_side(texts[0], **options)
+    for i, future in futures.items():
+        out[i] = future.result()
+    return out
+
+
+def _side_summary(result: Dict[str, Any], cached: bool) -> Dict[str, Any]:
+    pos, neg = result.get('cures_pos_counts', {}), result.get('cures_neg_counts', {})
+    return {
+        'records': len(result.get('records', [])),
+        'cures_pos_counts': pos,
+        'cures_neg_counts': neg,
+        'effectiveness': cure_effectiveness(pos, neg),
+        'keywords': result.get('keywords', []),
+        'summary': result.get('summary', ''),
+        'cached': cached,
+    }
+
+
+def compare_results(a: Tuple[Dict[str, Any], bool], b: Tuple[Dict[str, Any], bool]) -> Dict[str, Any]:
+    """Per-side aggregates and, per cure, both sides' effectiveness and ``diff_pct`` (B - A).
+
+    ``diff_pct`` is None for cures reported by one side only. Cures are ordered by
+    the size of the difference, then by total reports.
+    """
+    side_a, side_b = _side_summary(*a), _side_summary(*b)
+    eff_a, eff_b = side_a['effectiveness'], side_b['effectiveness']
+    cures = []
+    for cure in set(eff_a) | set(eff_b):
+        ea, eb = eff_a.get(cure), eff_b.get(cure)
+        cures.append({'cure': cure, 'a': ea, 'b': eb, 'diff_pct': eb['pct'] - ea['pct'] if ea and eb else None})
+    cures.sort(key=lambda c: (-abs(c['diff_pct'] or 0), -((c['a'] or {}).get('total', 0) + (c['b'] or {}).get('total', 0)),
+                              c['cure']))
+    return {'a': side_a, 'b': side_b, 'cures': cures}
+
+
+def _reanchor(rec, src: str, offset: int, side: str):
+    if isinstance(rec, Record):
+        return rec.rebase(src, rec.start + offset, side)
+    # a plain dict (results shared across workers are pickled that way)
+    return dict(rec, start=rec['start'] + offset, end=rec['end'] + offset, side=side)
+
+
+def combine_results(a: Dict[str, Any], b: Dict[str, Any]) -> Dict[str, Any]:
+    """One ``SIDE_FIELDS`` result over both sides, for the results page.
+
+    ``clean_text`` is A + SEPARATOR + B and the records are re-anchored into it, each
+    with ``side`` 'A' or 'B'; counts are summed and keywords merged.
+    """
+    clean_a, clean_b = a.get('clean_text', ''), b.get('clean_text', '')
+    clean = SEPARATOR.join(t for t in (clean_a, clean_b) if t)
+    offset_b = len(clean_a) + len(SEPARATOR) if clean_a else 0
+    records = ([_reanchor(r, clean, 0, 'A') for r in a.get('records', [])]
+               + [_reanchor(r, clean, offset_b, 'B') for r in b.get('records', [])])
+    counts = {}
+    for key in ('cures_pos_counts', 'cures_neg_counts'):
+        merged = dict(a.get(key, {}))
+        for cure, n in b.get(key, {}).items():
+            merged[cure] = merged.get(cure, 0) + n
+        counts[key] = merged
+    scores_a, scores_b = a.get('sentiment_scores', []), b.get('sentiment_scores', [])
+    result = {
+        'records': records,
+        **counts,
+        'keywords': list(dict.fromkeys(a.get('keywords', []) + b.get('keywords', [])))[:12],
+        'summary': ' '.join(f"Healer {side}: {r['summary']}" for side, r in (('A', a), ('B', b)) if r.get('summary')),
+        'clean_text': clean,
+    }
+    # per-record scores only line up when each side had records
+    if len(scores_a) + len(scores_b) == len(records):
+        result['sentiment_scores'] = list(scores_a) + list(scores_b)
+    return result
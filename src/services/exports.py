@@ -0,0 +1,198 @@
+# src/services/exports.py
+"""
+Streaming exports of an analysis result.
+- iter_csv / iter_json / iter_txt yield the export in chunks of ``batch`` records,
+  so no full copy of the output is ever built in memory
+- gzip_chunks compresses any chunk stream incrementally
+- iter_parquet / iter_arrow write a RecordTable (or its cure aggregates) as Parquet
+  or Arrow IPC, one row group / record batch at a time (optional: pyarrow, imported
+  on the first columnar export)
+"""
+import csv
+import io
+import zlib
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, List, Mapping, Optional, Sequence, Union
+
+from src.nlp.table import CATEGORICAL, RecordTable
+from src.utils.resources import module_available
+from src.utils.serialization import dumps
+
+PYARROW_AVAILABLE = module_available('pyarrow')
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+BATCH = 1000
+# Rows per Parquet row group / Arrow record batch
+ROW_GROUP = 64 * 1024
+
+
+def csv_columns(records: Iterable[Mapping[str, Any]]) -> List[str]:
+    """Union of the records' keys in first-seen order (the columns pandas would give)."""
+    columns = {}
+    for rec in records:
+        for key in rec:
+            if key not in columns:
+                columns[key] = None
+    return list(columns)
+
+
+def iter_csv(records: Sequence[Mapping[str, Any]], columns: Optional[List[str]] = None,
+             batch: int = BATCH) -> Iterator[str]:
+    """CSV with a header row; missing values are empty cells."""
+    columns = csv_columns(records) if columns is None else columns
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator='\n')
+    writer.writerow(columns)
+    for start in range(0, len(records), batch):
+        writer.writerows([rec.get(c, '') for c in columns] for rec in records[start:start + batch])
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue()
+
+
+def iter_json(result: Mapping[str, Any], batch: int = BATCH) -> Iterator[bytes]:
+    """Compact UTF-8 JSON of ``result``; list values (e.g. records) are streamed ``batch`` items at a time."""
+    yield b'{'
+    for n, (key, value) in enumerate(result.items()):
+        yield (b',' if n else b'') + dumps(key) + b':'
+        if not isinstance(value, list) or len(value) <= batch:
+            yield dumps(value)
+            continue
+        # one encoder call per batch: the slice as a JSON array, without its brackets
+        yield b'['
+        for start in range(0, len(value), batch):
+            yield (b',' if start else b'') + dumps(value[start:start + batch])[1:-1]
+        yield b']'
+    yield b'}'
+
+
+def iter_txt(result: Mapping[str, Any], batch: int = BATCH) -> Iterator[str]:
+    """The plain-text summary and one line per record."""
+    yield 'Summary:\n' + str(result.get('summary', '')) + '\n\nRecords:'
+    records = result.get('records', [])
+    for start in range(0, len(records), batch):
+        yield ''.join(
+            f"\nHealer: {r.get('healer')} | Cure: {r.get('cure')} | Symptom: {r.get('symptom')} | "
+            f"Outcome: {r.get('outcome')} | Sentiment: {r.get('sentiment')}"
+            for r in records[start:start + batch])
+
+
+def gzip_chunks(chunks: Iterable[Union[str, bytes]], level: int = 6) -> Iterator[bytes]:
+    """Gzip-compress a stream of text (UTF-8) or byte chunks as it is produced."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def encode_chunks(chunks: Iterable[Union[str, bytes]]) -> Iterator[bytes]:
+    for chunk in chunks:
+        yield chunk.encode('utf-8') if isinstance(chunk, str) else chunk
+
+
+# -- columnar (Parquet / Arrow IPC) -------------------------------------------
+
+def record_schema(table: RecordTable) -> 'pa.Schema':
+    """Categorical columns are dictionary-encoded, as they are in the RecordTable."""
+    import pyarrow as pa
+    category = pa.dictionary(pa.int32(), pa.string())
+    fields = [pa.field(name, category if name in CATEGORICAL else pa.string())
+              for name in ('healer', 'cure', 'symptom', 'outcome', 'sentiment', 'raw')]
+    fields += [pa.field('start', pa.int64()), pa.field('end', pa.int64()), pa.field('classification', category)]
+    if table.has_sides:
+        fields.append(pa.field('side', category))
+    if table.scores is not None:
+        fields.append(pa.field('score', pa.float32()))
+    return pa.schema(fields)
+
+
+def record_batches(table: RecordTable, rows: int = ROW_GROUP) -> Iterator['pa.RecordBatch']:
+    """The table as record batches of ``rows`` rows; dictionaries are shared, only codes are sliced."""
+    import pyarrow as pa
+    schema = record_schema(table)
+    dictionaries = {name: pa.array(table.dictionaries[name].values, pa.string()) for name in CATEGORICAL}
+    for start in range(0, len(table), rows):
+        stop = min(start + rows, len(table))
+        columns = {name: pa.DictionaryArray.from_arrays(pa.array(table.codes[name][start:stop]), dictionaries[name])
+                   for name in CATEGORICAL}
+        for name in ('raw', 'outcome'):
+            pool = table.pool
+            columns[name] = pa.array([pool[s:e] for s, e in table.offsets[name][start:stop].tolist()], pa.string())
+        # start/end only for records whose span lies in the source text
+        spans = table.offsets['raw'][start:stop]
+        outside = spans[:, 1] > table.source_len
+        columns['start'] = pa.array(spans[:, 0], pa.int64(), mask=outside)
+        columns['end'] = pa.array(spans[:, 1], pa.int64(), mask=outside)
+        if table.scores is not None:
+            columns['score'] = pa.array(table.scores[start:stop], pa.float32())
+        yield pa.record_batch([columns[f.name] for f in schema], schema=schema)
+
+
+def cure_batches(table: RecordTable) -> Iterator['pa.RecordBatch']:
+    """Positive and negative mentions per cure (``RecordTable.cure_counts``) as one batch."""
+    import pyarrow as pa
+    pos, neg = table.cure_counts()
+    cures = sorted(set(pos) | set(neg), key=lambda c: (-(pos.get(c, 0) + neg.get(c, 0)), c))
+    yield pa.record_batch([
+        pa.array(cures, pa.string()),
+        pa.array([pos.get(c, 0) for c in cures], pa.int64()),
+        pa.array([neg.get(c, 0) for c in cures], pa.int64()),
+    ], schema=cure_schema())
+
+
+def cure_schema() -> 'pa.Schema':
+    import pyarrow as pa
+    return pa.schema([('cure', pa.string()), ('positive', pa.int64()), ('negative', pa.int64())])
+
+
+class _Sink(io.RawIOBase):
+    """Write-only file collecting what a writer emits until it is drained."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._pos = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _iter_written(open_writer: Callable, schema: 'pa.Schema', batches: Iterable['pa.RecordBatch']) -> Iterator[bytes]:
+    import pyarrow as pa
+    sink = _Sink()
+    writer = open_writer(pa.PythonFile(sink, mode='w'), schema)
+    for batch in batches:
+        writer.write_batch(batch)
+        data = sink.drain()
+        if data:
+            yield data
+    writer.close()
+    yield sink.drain()
+
+
+def iter_parquet(schema: 'pa.Schema', batches: Iterable['pa.RecordBatch'], compression: str = 'snappy') -> Iterator[bytes]:
+    """Parquet file bytes, one row group per batch, emitted as each row group is written."""
+    import pyarrow.parquet as pq
+    return _iter_written(lambda f, sch: pq.ParquetWriter(f, sch, compression=compression), schema, batches)
+
+
+def iter_arrow(schema: 'pa.Schema', batches: Iterable['pa.RecordBatch']) -> Iterator[bytes]:
+    """Arrow IPC stream bytes, one message per batch."""
+    import pyarrow.ipc as pa_ipc
+    return _iter_written(pa_ipc.new_stream, schema, batches)
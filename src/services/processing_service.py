@@ -2,7 +2,92 @@
 """
 Service layer for NLP processing and business logic.
 """
-from src.nlp.pipeline import process_scrolls
+import hashlib
+from typing import Any, Dict, Optional, Tuple
 
-def analyze_text(text: str):
-    return process_scrolls(text)
+from config.settings import settings
+from src.core.nlp_pipeline import PIPELINE_FINGERPRINT, process_scrolls, run_pipeline, select_fields
+from src.utils.cache import SingleFlight
+from src.utils.flight import make_flight
+from src.utils.metrics import REGISTRY, timed_stage
+
+# Concurrent identical requests (same text and options) share one pipeline run.
+_FLIGHT = (make_flight(settings.COALESCE_BACKEND, settings.COALESCE_PATH or None,
+                       result_ttl=settings.COALESCE_RESULT_TTL)
+           if settings.COALESCE_BACKEND != 'off' else None)
+# Fresh runs that also return their context coalesce within the worker only: contexts
+# stay with the worker that ran the pipeline (and Records pickle as plain dicts).
+_CONTEXT_FLIGHT = SingleFlight() if settings.COALESCE_BACKEND != 'off' else None
+COALESCED = REGISTRY.counter(
+    'healerscribe_coalesced_requests_total', 'Processing requests served by a concurrent identical run.',
+)
+
+
+def result_key(text, fields, mode, deadline_ms) -> str:
+    """Identity of a pipeline result: pipeline fingerprint, text hash and options."""
+    digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+    return f"{PIPELINE_FINGERPRINT}|{digest}|{','.join(fields) if fields is not None else '*'}|{mode}|{deadline_ms}"
+
+
+def copy_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """A caller's own copy of a shared result: dicts and lists are copied at every level.
+
+    Records are not copied (that would cost as much as parsing); they stay shared
+    and must only be changed with ``evolve()``, which returns a new Record.
+    """
+    return _copy_containers(result)
+
+
+def _copy_containers(value):
+    if isinstance(value, dict):
+        return {k: _copy_containers(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_copy_containers(v) for v in value]
+    return value
+
+
+def analyze_text(text: str, fields=None, mode=None, deadline_ms=None):
+    """Run the pipeline; ``fields`` limits the result (and the work done) to those keys.
+
+    ``mode`` and ``deadline_ms`` default to PIPELINE_MODE / PIPELINE_DEADLINE_MS.
+    Identical concurrent calls are coalesced; each caller gets its own ``copy_result``
+    of the shared result.
+    """
+    mode = mode or settings.PIPELINE_MODE
+    deadline_ms = settings.PIPELINE_DEADLINE_MS if deadline_ms is None else deadline_ms
+    fields = list(fields) if fields is not None else None
+    if _FLIGHT is None:
+        return process_scrolls(text, fields, mode=mode, deadline_ms=deadline_ms)
+    with timed_stage('coalesce', nbytes=len(text)):
+        result, shared = _FLIGHT.do(result_key(text, fields, mode, deadline_ms),
+                                    lambda: process_scrolls(text, fields, mode=mode, deadline_ms=deadline_ms))
+    if shared:
+        COALESCED.inc()
+    return copy_result(result)
+
+
+def analyze_text_with_context(text: str, fields=None, mode=None, deadline_ms=None,
+                              previous: Optional[Dict[str, Any]] = None) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """``(result, context)``: like analyze_text, plus the pipeline context to keep for
+    incremental re-analysis of an edited text (pass it back as ``previous``).
+
+    Identical concurrent fresh runs (no ``previous``) are coalesced within the worker;
+    the callers then share the context, which is read-only (incremental runs don't
+    modify it), and each gets its own ``copy_result`` of the result. Incremental runs
+    are not coalesced.
+    """
+    mode = mode or settings.PIPELINE_MODE
+    deadline_ms = settings.PIPELINE_DEADLINE_MS if deadline_ms is None else deadline_ms
+    fields = list(fields) if fields is not None else None
+
+    def run():
+        return run_pipeline(text, fields, mode=mode, deadline_ms=deadline_ms, previous=previous)
+
+    if previous is not None or _CONTEXT_FLIGHT is None:
+        ctx = run()
+        return select_fields(ctx, fields), ctx
+    with timed_stage('coalesce', nbytes=len(text)):
+        ctx, shared = _CONTEXT_FLIGHT.do(result_key(text, fields, mode, deadline_ms), run)
+    if shared:
+        COALESCED.inc()
+    return copy_result(select_fields(ctx, fields)), ctx
@@ -0,0 +1,209 @@
+# src/utils/flight.py
+"""
+Coalescing of identical concurrent computations across threads and workers.
+- SharedFlight: SingleFlight within the worker, optionally extended to all workers
+  on the host through a lease
+- FileLease: flock()ed lock files (keys hashed onto a fixed set); the leader leaves
+  the pickled result for the workers that waited on the lock
+- SQLiteLease: lease rows with an expiry plus the pickled result in a local SQLite file
+Results are kept ``result_ttl`` seconds after completion so waiters that wake up late
+still find them; they are not a cache beyond that.
+"""
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+from src.utils.cache import SingleFlight
+
+try:
+    import fcntl
+except ImportError:  # not on Windows; FileLease is unavailable there
+    fcntl = None
+
+_MISSING = object()
+_LEADER = object()
+_WAIT = object()
+
+
+class FileLease:
+    """Cross-process coalescing with lock files in ``directory``.
+
+    The first process to lock a key's lock file computes; the others block on the
+    lock and then read the key's result file. If the leader failed (no fresh result),
+    the next process holding the lock computes instead. Keys map onto ``shards`` lock
+    files, so the directory stays bounded (rarely, two different keys share a lock and
+    run one after the other). Stale result files are purged every ``purge_every`` runs.
+    """
+
+    def __init__(self, directory: str, result_ttl: float = 10.0, shards: int = 256, purge_every: int = 64):
+        if fcntl is None:
+            raise RuntimeError('FileLease needs fcntl (POSIX)')
+        self.directory = directory
+        self.result_ttl = float(result_ttl)
+        self.shards = max(1, int(shards))
+        self.purge_every = max(1, int(purge_every))
+        self._runs = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _paths(self, key: str) -> Tuple[str, str]:
+        digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        shard = int(digest[:8], 16) % self.shards
+        return (os.path.join(self.directory, f'{shard:04x}.lock'),
+                os.path.join(self.directory, digest[:40] + '.result'))
+
+    def _purge(self) -> None:
+        cutoff = time.time() - self.result_ttl
+        for name in os.listdir(self.directory):
+            if name.endswith('.result'):
+                path = os.path.join(self.directory, name)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                except OSError:
+                    pass
+
+    def _read_fresh(self, path: str) -> Any:
+        try:
+            if time.time() - os.path.getmtime(path) > self.result_ttl:
+                return _MISSING
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return _MISSING
+
+    def run(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """``(result, shared)``: ``shared`` is True when another process computed it."""
+        lock_path, result_path = self._paths(key)
+        with open(lock_path, 'a+b') as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                waited = False
+            except BlockingIOError:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                waited = True
+            try:
+                if waited:
+                    result = self._read_fresh(result_path)
+                    if result is not _MISSING:
+                        return result, True
+                result = fn()
+                tmp = f'{result_path}.{os.getpid()}.tmp'
+                with open(tmp, 'wb') as f:
+                    pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp, result_path)
+                self._runs += 1
+                if self._runs % self.purge_every == 0:
+                    self._purge()
+                return result, False
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+class SQLiteLease:
+    """Cross-process coalescing through lease rows in a SQLite file.
+
+    A process takes the lease for ``lease_ttl`` seconds (in a ``BEGIN IMMEDIATE``
+    transaction), computes and stores the pickled result; others poll until it
+    appears. An expired lease (crashed leader) is taken over by the next caller.
+    """
+
+    def __init__(self, path: str, lease_ttl: float = 120.0, result_ttl: float = 10.0,
+                 poll_interval: float = 0.05):
+        self.path = path
+        self.lease_ttl = float(lease_ttl)
+        self.result_ttl = float(result_ttl)
+        self.poll_interval = float(poll_interval)
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._connect().execute(
+            "CREATE TABLE IF NOT EXISTS flights ("
+            "key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires REAL NOT NULL, result BLOB)"
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _acquire(self, key: str, owner: str) -> Any:
+        """_LEADER if ``owner`` now holds the lease, the stored result if one is fresh, else _WAIT."""
+        conn = self._connect()
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT expires, result FROM flights WHERE key = ?', (key,)).fetchone()
+            if row is not None and row[0] > now:
+                conn.execute('COMMIT')
+                return pickle.loads(row[1]) if row[1] is not None else _WAIT
+            conn.execute('INSERT OR REPLACE INTO flights (key, owner, expires, result) VALUES (?, ?, ?, NULL)',
+                         (key, owner, now + self.lease_ttl))
+            conn.execute('DELETE FROM flights WHERE expires < ?', (now,))
+            conn.execute('COMMIT')
+            return _LEADER
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def run(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """``(result, shared)``: ``shared`` is True when another process computed it."""
+        owner = uuid.uuid4().hex
+        conn = self._connect()
+        while True:
+            state = self._acquire(key, owner)
+            if state is _LEADER:
+                break
+            if state is not _WAIT:
+                return state, True
+            time.sleep(self.poll_interval)
+        try:
+            result = fn()
+        except BaseException:
+            conn.execute('DELETE FROM flights WHERE key = ? AND owner = ?', (key, owner))
+            raise
+        blob = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        conn.execute('UPDATE flights SET result = ?, expires = ? WHERE key = ? AND owner = ?',
+                     (blob, time.time() + self.result_ttl, key, owner))
+        return result, False
+
+
+class SharedFlight:
+    """At most one computation per key: per worker always, across workers with a lease.
+
+    ``do`` returns ``(result, shared)``. Every caller gets the same result object, so
+    callers must treat it as read-only (or copy it).
+    """
+
+    def __init__(self, lease=None):
+        self._local = SingleFlight()
+        self.lease = lease
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        compute = fn if self.lease is None else (lambda: self.lease.run(str(key), fn))
+        result, shared = self._local.do(key, compute)
+        if self.lease is not None:
+            # the leader thread's result is (value, shared_across_workers)
+            result, shared = result[0], shared or result[1]
+        return result, shared
+
+    def in_flight(self) -> int:
+        return self._local.in_flight()
+
+
+def make_flight(backend: str = 'memory', path: Optional[str] = None, lease_ttl: float = 120.0,
+                result_ttl: float = 10.0) -> SharedFlight:
+    """SharedFlight with the configured cross-worker lease (``memory`` = this worker only, ``file``, ``sqlite``)."""
+    if backend == 'file':
+        return SharedFlight(FileLease(path or 'instance/flights', result_ttl=result_ttl))
+    if backend == 'sqlite':
+        return SharedFlight(SQLiteLease(path or 'instance/flights.sqlite3', lease_ttl=lease_ttl,
+                                        result_ttl=result_ttl))
+    return SharedFlight()
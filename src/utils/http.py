@@ -0,0 +1,52 @@
+# src/utils/http.py
+"""
+HTTP response helpers.
+- choose_encoding: best supported content-coding (br, gzip) a client accepts
+- compress: encode a response body with that coding
+- content_etag: strong ETag from the inputs that determine a response
+"""
+import gzip
+import hashlib
+from typing import Callable, Iterable, Optional
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except Exception:
+    BROTLI_AVAILABLE = False
+
+# Preferred first when the client accepts both equally
+ENCODINGS = ('br', 'gzip')
+
+
+def supported_encodings(allowed: Iterable[str] = ENCODINGS) -> tuple:
+    return tuple(e for e in ENCODINGS if e in allowed and (e != 'br' or BROTLI_AVAILABLE))
+
+
+def choose_encoding(quality: Callable[[str], float], allowed: Iterable[str] = ENCODINGS) -> Optional[str]:
+    """Highest-quality coding in ``allowed`` for which ``quality(coding)`` > 0 (ties: br first)."""
+    best, best_q = None, 0.0
+    for encoding in supported_encodings(allowed):
+        q = quality(encoding)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(body: bytes, encoding: str, level: int = 6) -> bytes:
+    """``level`` is the gzip level (1-9); brotli uses a quality suited to on-the-fly compression."""
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=level, mtime=0)
+    if encoding == 'br':
+        return brotli.compress(body, quality=5)
+    raise ValueError(f"unsupported content-coding {encoding!r}")
+
+
+def content_etag(*parts) -> str:
+    """Strong ETag value (unquoted) over ``parts`` (str or bytes)."""
+    digest = hashlib.sha256()
+    for part in parts:
+        data = part.encode('utf-8') if isinstance(part, str) else bytes(part)
+        digest.update(len(data).to_bytes(8, 'big'))
+        digest.update(data)
+    return digest.hexdigest()[:32]
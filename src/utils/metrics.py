@@ -0,0 +1,195 @@
+# src/utils/metrics.py
+"""
+Lightweight in-process instrumentation.
+- Counter / Histogram metrics with labels, rendered in Prometheus text format
+- timed_stage(): context manager that records a stage duration into a histogram
+- collect_timings(): gathers the per-request stage breakdown
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# size classes used as label values, so record/byte counts don't explode cardinality
+_SIZE_CLASSES = ((0, '0'), (100, '<=100'), (1_000, '<=1k'), (10_000, '<=10k'),
+                 (100_000, '<=100k'), (1_000_000, '<=1M'), (10_000_000, '<=10M'))
+
+
+def size_class(n: Optional[int]) -> str:
+    if n is None:
+        return ''
+    for limit, label in _SIZE_CLASSES:
+        if n <= limit:
+            return label
+    return '>10M'
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+def _format_value(v: float) -> str:
+    if v == float('inf'):
+        return '+Inf'
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name: str, doc: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.doc = doc
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = tuple(str(labels.get(n, '')) for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        key = tuple(str(labels.get(n, '')) for n in self.labelnames)
+        return self._values.get(key, 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f'{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}' for k, v in items]
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name: str, doc: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.doc = doc
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts..., +Inf count], sum
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(str(labels.get(n, '')) for n in self.labelnames)
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[idx] += 1
+            total[0] += value
+
+    def count(self, **labels) -> int:
+        key = tuple(str(labels.get(n, '')) for n in self.labelnames)
+        item = self._values.get(key)
+        return sum(item[0]) if item else 0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, (list(c), s[0])) for k, (c, s) in self._values.items())
+        lines = []
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, c in zip(self.buckets + (float('inf'),), counts):
+                cumulative += c
+                le = 'le="%s"' % _format_value(bound)
+                lines.append(f'{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}')
+            lines.append(f'{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}')
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, doc: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, doc, labelnames))
+
+    def histogram(self, name: str, doc: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, doc, labelnames, buckets))
+
+    def render(self) -> str:
+        """Render every metric in Prometheus text exposition format (0.0.4)."""
+        out = []
+        for name in sorted(self._metrics):
+            m = self._metrics[name]
+            out.append(f'# HELP {name} {m.doc}')
+            out.append(f'# TYPE {name} {m.kind}')
+            out.extend(m.render())
+        return '\n'.join(out) + '\n'
+
+
+REGISTRY = Registry()
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+STAGE_SECONDS = REGISTRY.histogram(
+    'healerscribe_stage_seconds', 'Time spent in a pipeline or request stage.',
+    labelnames=('stage', 'records', 'bytes'),
+)
+STAGE_ERRORS = REGISTRY.counter(
+    'healerscribe_stage_errors_total', 'Stages that raised an exception.', labelnames=('stage',),
+)
+
+HTTP_REQUESTS = REGISTRY.counter(
+    'healerscribe_http_requests_total', 'HTTP requests handled.', labelnames=('endpoint', 'method', 'status'),
+)
+HTTP_SECONDS = REGISTRY.histogram(
+    'healerscribe_http_request_seconds', 'HTTP request latency.', labelnames=('endpoint',),
+)
+
+_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar('healerscribe_timings', default=None)
+
+
+@contextmanager
+def timed_stage(stage: str, records: Optional[int] = None, nbytes: Optional[int] = None) -> Iterator[Dict[str, int]]:
+    """Time a block as ``stage``.
+
+    Yields a dict where the block may set ``records`` / ``bytes`` once it knows them
+    (e.g. after parsing); they become size-class labels on the histogram.
+    """
+    info: Dict[str, int] = {}
+    if records is not None:
+        info['records'] = records
+    if nbytes is not None:
+        info['bytes'] = nbytes
+    start = time.perf_counter()
+    try:
+        yield info
+    except BaseException:
+        STAGE_ERRORS.inc(stage=stage)
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, stage=stage, records=size_class(info.get('records')),
+                              bytes=size_class(info.get('bytes')))
+        timings = _timings.get()
+        if timings is not None:
+            timings[stage] = timings.get(stage, 0.0) + elapsed
+
+
+@contextmanager
+def collect_timings() -> Iterator[Dict[str, float]]:
+    """Collect ``stage -> seconds`` for every timed_stage run inside the block."""
+    timings: Dict[str, float] = {}
+    token = _timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _timings.reset(token)
@@ -0,0 +1,108 @@
+# src/utils/profiling.py
+"""
+Opt-in request profiling.
+- Requests are profiled when an admin token is supplied or when randomly sampled
+- Each run stores <id>.prof (pstats) and <id>.json (request metadata + input hash)
+- Old profiles are pruned on save: at most ``max_files`` are kept, none older than ``max_age``
+"""
+import cProfile
+import hashlib
+import hmac
+import json
+import os
+import pstats
+import random
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class RequestProfiler:
+    """Decide whether to profile a request and persist the resulting profile.
+
+    ``token`` enables on-demand profiling for callers that present it; an empty
+    token disables that path. ``sample_rate`` (0..1) profiles a random fraction of
+    requests regardless of token, e.g. 0.01 in production. Each save keeps the
+    newest ``max_files`` profiles and drops those older than ``max_age`` seconds
+    (0 disables either limit).
+    """
+
+    def __init__(self, directory: str, token: str = '', sample_rate: float = 0.0,
+                 rng: Callable[[], float] = random.random, max_files: int = 200, max_age: float = 7 * 86400.0):
+        self.directory = directory
+        self.token = token or ''
+        self.sample_rate = max(0.0, min(1.0, float(sample_rate)))
+        self._rng = rng
+        self.max_files = max(0, int(max_files))
+        self.max_age = max(0.0, float(max_age))
+
+    def is_authorized(self, supplied: Optional[str]) -> bool:
+        if not self.token or not supplied:
+            return False
+        return hmac.compare_digest(self.token.encode('utf-8'), supplied.encode('utf-8'))
+
+    def should_profile(self, supplied: Optional[str]) -> Tuple[bool, str]:
+        """Return ``(profile, reason)``; reason is ``admin`` or ``sampled``."""
+        if self.is_authorized(supplied):
+            return True, 'admin'
+        if self.sample_rate > 0 and self._rng() < self.sample_rate:
+            return True, 'sampled'
+        return False, ''
+
+    def run(self, fn: Callable[[], Any], input_bytes: bytes, meta: Optional[Dict[str, Any]] = None) -> Tuple[Any, str]:
+        """Run ``fn`` under cProfile, store the profile and return ``(result, profile_id)``."""
+        profile_id = time.strftime('%Y%m%d-%H%M%S') + '-' + uuid.uuid4().hex[:8]
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        error = None
+        try:
+            result = profiler.runcall(fn)
+        except Exception as e:
+            error = repr(e)
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            info = dict(meta or {})
+            info.update({
+                'id': profile_id,
+                'input_sha256': hashlib.sha256(input_bytes or b'').hexdigest(),
+                'input_bytes': len(input_bytes or b''),
+                'duration_ms': round(elapsed * 1000, 3),
+                'created': time.time(),
+                'error': error,
+            })
+            self._save(profile_id, profiler, info)
+        return result, profile_id
+
+    def _save(self, profile_id: str, profiler: cProfile.Profile, info: Dict[str, Any]) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        base = os.path.join(self.directory, profile_id)
+        pstats.Stats(profiler).dump_stats(base + '.prof')
+        with open(base + '.json', 'w', encoding='utf-8') as f:
+            json.dump(info, f, indent=2)
+        self._prune()
+
+    def _prune(self) -> None:
+        """Remove the profiles (both files) beyond ``max_files`` or older than ``max_age``."""
+        if not (self.max_files or self.max_age):
+            return
+        newest: Dict[str, float] = {}
+        for name in os.listdir(self.directory):
+            profile_id, ext = os.path.splitext(name)
+            if ext not in ('.prof', '.json'):
+                continue
+            try:
+                mtime = os.path.getmtime(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            newest[profile_id] = max(mtime, newest.get(profile_id, 0.0))
+        # ids start with a timestamp, so they break mtime ties in creation order
+        ranked = sorted(newest.items(), key=lambda item: (item[1], item[0]), reverse=True)
+        cutoff = time.time() - self.max_age if self.max_age else None
+        for i, (profile_id, mtime) in enumerate(ranked):
+            if (self.max_files and i >= self.max_files) or (cutoff is not None and mtime < cutoff):
+                for ext in ('.prof', '.json'):
+                    try:
+                        os.remove(os.path.join(self.directory, profile_id + ext))
+                    except OSError:
+                        pass
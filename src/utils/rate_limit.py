@@ -0,0 +1,159 @@
+# src/utils/rate_limit.py
+"""
+Token-bucket rate limiting for heavy endpoints.
+- MemoryBucketStore: per-process buckets in an LRU dict, idle keys evicted
+- SQLiteBucketStore: buckets in a local SQLite file shared by all workers
+- RateLimiter: capacity/refill policy on top of either store
+"""
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+
+
+def _refill(tokens: float, updated: float, now: float, capacity: float, rate: float) -> float:
+    return min(capacity, tokens + max(0.0, now - updated) * rate)
+
+
+class MemoryBucketStore:
+    """In-process bucket store.
+
+    Buckets are kept in access order, so idle buckets collect at the front and are
+    evicted in amortized O(1). A bucket idle for ``idle_ttl`` seconds has refilled
+    completely, so dropping it does not change any decision.
+    """
+
+    def __init__(self, idle_ttl: float = 300.0, maxsize: int = 100_000):
+        self.idle_ttl = float(idle_ttl)
+        self.maxsize = max(1, int(maxsize))
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, cost: float, capacity: float, rate: float, now: float) -> float:
+        with self._lock:
+            self._evict(now)
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens = _refill(tokens, updated, now, capacity, rate)
+            if tokens >= cost:
+                tokens -= cost
+                wait = 0.0
+            else:
+                wait = (cost - tokens) / rate if rate > 0 else float('inf')
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            return wait
+
+    def _evict(self, now: float) -> None:
+        buckets = self._buckets
+        while buckets:
+            oldest = next(iter(buckets))
+            if len(buckets) <= self.maxsize and now - buckets[oldest][1] < self.idle_ttl:
+                break
+            buckets.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class SQLiteBucketStore:
+    """Bucket store in a local SQLite database, shared across worker processes.
+
+    Each check runs in a single ``BEGIN IMMEDIATE`` transaction on the primary key,
+    so concurrent workers see one consistent bucket. Idle rows are purged every
+    ``purge_every`` checks.
+    """
+
+    def __init__(self, path: str, idle_ttl: float = 300.0, purge_every: int = 1000):
+        self.path = path
+        self.idle_ttl = float(idle_ttl)
+        self.purge_every = max(1, int(purge_every))
+        self._local = threading.local()
+        self._calls = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_buckets ("
+                "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def take(self, key: str, cost: float, capacity: float, rate: float, now: float) -> float:
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT tokens, updated FROM rate_buckets WHERE key = ?', (key,)).fetchone()
+            tokens, updated = row if row else (capacity, now)
+            tokens = _refill(tokens, updated, now, capacity, rate)
+            if tokens >= cost:
+                tokens -= cost
+                wait = 0.0
+            else:
+                wait = (cost - tokens) / rate if rate > 0 else float('inf')
+            conn.execute(
+                'INSERT OR REPLACE INTO rate_buckets (key, tokens, updated) VALUES (?, ?, ?)',
+                (key, tokens, now),
+            )
+            self._calls += 1
+            if self._calls % self.purge_every == 0:
+                conn.execute('DELETE FROM rate_buckets WHERE updated < ?', (now - self.idle_ttl,))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return wait
+
+    def __len__(self) -> int:
+        return self._connect().execute('SELECT COUNT(*) FROM rate_buckets').fetchone()[0]
+
+
+class RateLimiter:
+    """Token bucket: ``per_minute`` tokens refill per minute, up to ``burst`` stored.
+
+    ``check(key)`` returns ``(allowed, retry_after_seconds)``. A limiter with
+    ``per_minute <= 0`` is disabled and always allows.
+    """
+
+    def __init__(self, per_minute: float, burst: Optional[float] = None, store=None,
+                 name: str = 'default', clock: Callable[[], float] = time.time):
+        self.per_minute = float(per_minute)
+        self.capacity = float(burst if burst else per_minute)
+        self.rate = self.per_minute / 60.0
+        self.name = name
+        self._clock = clock
+        self.store = store
+        if self.store is None:
+            self.store = MemoryBucketStore(idle_ttl=self._full_refill_seconds())
+
+    def _full_refill_seconds(self) -> float:
+        return self.capacity / self.rate if self.rate > 0 else 60.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.per_minute > 0
+
+    def check(self, key: str, cost: float = 1.0) -> Tuple[bool, float]:
+        if not self.enabled:
+            return True, 0.0
+        wait = self.store.take(f"{self.name}:{key}", cost, self.capacity, self.rate, self._clock())
+        return wait == 0.0, wait
+
+
+def make_limiter(name: str, per_minute: float, burst: Optional[float] = None,
+                 backend: str = 'memory', path: Optional[str] = None) -> RateLimiter:
+    """Build a limiter with the configured store (``memory`` or ``sqlite``)."""
+    limiter = RateLimiter(per_minute, burst=burst, name=name)
+    if backend == 'sqlite' and limiter.enabled:
+        limiter.store = SQLiteBucketStore(path or 'instance/ratelimit.sqlite3',
+                                          idle_ttl=limiter._full_refill_seconds())
+    return limiter
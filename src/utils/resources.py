@@ -0,0 +1,206 @@
+# src/utils/resources.py
+"""
+Optional dependencies and the offline NLP resources they need.
+- module_available(): whether a package is installed, without importing it
+- Lazy: a loader that imports / builds on first use and then reuses the result, so
+  heavy libraries stay off the startup path until a stage actually needs them
+- nltk_resource_available() / spacy_model_available(): resource checks that import
+  neither nltk nor spaCy
+- bootstrap(): verify the NLTK data and spaCy model, installing the missing ones from a
+  local directory (never from the network)
+
+Usage:
+    python -m src.utils.resources                        # verify only
+    python -m src.utils.resources --source /opt/nlp-resources
+    python -m src.utils.resources --source DIR --target /srv/nltk_data
+
+Exits with status 1 when a resource is still missing.
+"""
+import argparse
+import glob
+import importlib.util
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import zipfile
+from typing import Any, Callable, List, NamedTuple, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# name -> path under an nltk_data directory (what nltk.data.find() looks up)
+NLTK_RESOURCES = {
+    'vader_lexicon': 'sentiment/vader_lexicon',
+    'punkt': 'tokenizers/punkt',
+    'stopwords': 'corpora/stopwords',
+    'wordnet': 'corpora/wordnet',
+}
+SPACY_MODEL = 'en_core_web_sm'
+
+
+def module_available(name: str) -> bool:
+    """True if ``name`` can be imported (looked up on sys.path, not executed)."""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):  # a missing parent package, or a broken __spec__
+        return False
+
+
+class Lazy:
+    """``factory()`` on the first call, then the same result for every caller.
+
+    Thread-safe: concurrent first calls build once. A factory that raises is logged
+    and yields ``default`` (also cached, so a missing model is not retried per request).
+    """
+
+    def __init__(self, factory: Callable[[], Any], default: Any = None):
+        self._factory = factory
+        self._default = default
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._value = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def __call__(self) -> Any:
+        if self._loaded:
+            return self._value
+        with self._lock:
+            if not self._loaded:
+                try:
+                    self._value = self._factory()
+                except Exception as e:
+                    logger.warning("Loading %s failed: %s", getattr(self._factory, '__name__', 'resource'), e)
+                    self._value = self._default
+                self._loaded = True
+        return self._value
+
+
+def nltk_data_dirs() -> List[str]:
+    """The directories nltk searches for data, in its order (NLTK_DATA first)."""
+    dirs = [d for d in os.environ.get('NLTK_DATA', '').split(os.pathsep) if d]
+    dirs.append(os.path.expanduser('~/nltk_data'))
+    dirs += [os.path.join(sys.prefix, sub) for sub in ('nltk_data', 'share/nltk_data', 'lib/nltk_data')]
+    dirs += ['/usr/share/nltk_data', '/usr/local/share/nltk_data', '/usr/lib/nltk_data', '/usr/local/lib/nltk_data']
+    return list(dict.fromkeys(dirs))
+
+
+def nltk_resource_path(resource: str, dirs: Optional[Sequence[str]] = None) -> Optional[str]:
+    """Where ``resource`` (e.g. ``'sentiment/vader_lexicon'``) is installed, unpacked or zipped."""
+    for base in nltk_data_dirs() if dirs is None else dirs:
+        for path in (os.path.join(base, resource), os.path.join(base, resource + '.zip')):
+            if os.path.exists(path):
+                return path
+    return None
+
+
+def nltk_resource_available(resource: str) -> bool:
+    return nltk_resource_path(resource) is not None
+
+
+def spacy_model_available(name: str = SPACY_MODEL) -> bool:
+    """A spaCy model installed as a package, or a model directory."""
+    return module_available(name) or os.path.isfile(os.path.join(name, 'meta.json'))
+
+
+class ResourceStatus(NamedTuple):
+    kind: str    # 'nltk' or 'spacy'
+    name: str
+    status: str  # 'present', 'installed' or 'missing'
+    detail: str = ''
+
+
+def _find_nltk_source(source: str, resource: str) -> Optional[str]:
+    # a copy of nltk_data (category/name[.zip]), a downloader mirror (packages/...) or a flat dir
+    name = resource.rsplit('/', 1)[-1]
+    candidates = (os.path.join(source, resource), os.path.join(source, 'packages', resource), os.path.join(source, name))
+    for path in candidates:
+        for found in (path + '.zip', path):
+            if os.path.exists(found):
+                return found
+    return None
+
+
+def install_nltk_resource(src: str, resource: str, target: str) -> None:
+    """Copy ``src`` (a package zip or directory) into ``target``; zips are also unpacked, as nltk's downloader does."""
+    category = os.path.join(target, os.path.dirname(resource))
+    os.makedirs(category, exist_ok=True)
+    if os.path.isdir(src):
+        shutil.copytree(src, os.path.join(target, resource), dirs_exist_ok=True)
+        return
+    shutil.copyfile(src, os.path.join(target, resource + '.zip'))
+    with zipfile.ZipFile(src) as zf:
+        zf.extractall(category)
+
+
+def _find_spacy_source(source: str, name: str) -> Optional[str]:
+    dists = sorted(glob.glob(os.path.join(source, f'{name}-*.whl')) + glob.glob(os.path.join(source, f'{name}-*.tar.gz')))
+    return dists[-1] if dists else None
+
+
+def install_spacy_model(source: str, name: str = SPACY_MODEL) -> subprocess.CompletedProcess:
+    """pip-install the model from the wheels / sdists in ``source`` only (no index)."""
+    return subprocess.run([sys.executable, '-m', 'pip', 'install', '--no-index', '--find-links', source, name],
+                          capture_output=True, text=True)
+
+
+def bootstrap(source: Optional[str] = None, target: Optional[str] = None, nltk: Sequence[str] = tuple(NLTK_RESOURCES),
+              spacy_models: Sequence[str] = (SPACY_MODEL,)) -> List[ResourceStatus]:
+    """Status of each resource, installing the missing ones from ``source`` when given.
+
+    NLTK data goes to ``target`` (default: the first NLTK_DATA directory, else
+    ~/nltk_data); spaCy models are pip-installed into the running interpreter.
+    """
+    target = target or nltk_data_dirs()[0]
+    report = []
+    for name in nltk:
+        resource = NLTK_RESOURCES.get(name, name)
+        found = nltk_resource_path(resource)
+        if found:
+            report.append(ResourceStatus('nltk', name, 'present', found))
+            continue
+        src = _find_nltk_source(source, resource) if source else None
+        if src is None:
+            report.append(ResourceStatus('nltk', name, 'missing', f'not in {source}' if source else ''))
+            continue
+        install_nltk_resource(src, resource, target)
+        report.append(ResourceStatus('nltk', name, 'installed', os.path.join(target, resource)))
+    for name in spacy_models:
+        if spacy_model_available(name):
+            report.append(ResourceStatus('spacy', name, 'present'))
+            continue
+        src = _find_spacy_source(source, name) if source else None
+        if src is None:
+            report.append(ResourceStatus('spacy', name, 'missing', f'not in {source}' if source else ''))
+            continue
+        proc = install_spacy_model(source, name)
+        importlib.invalidate_caches()
+        if proc.returncode == 0 and spacy_model_available(name):
+            report.append(ResourceStatus('spacy', name, 'installed', os.path.basename(src)))
+        else:
+            report.append(ResourceStatus('spacy', name, 'missing', (proc.stderr or proc.stdout).strip()[-500:]))
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--source', help='local directory with nltk_data packages and spaCy model wheels')
+    parser.add_argument('--target', help='nltk_data directory to install into (default: $NLTK_DATA or ~/nltk_data)')
+    parser.add_argument('--nltk', default=','.join(NLTK_RESOURCES), help='comma-separated NLTK resources')
+    parser.add_argument('--spacy', default=SPACY_MODEL, help='comma-separated spaCy models (empty: none)')
+    args = parser.parse_args(argv)
+
+    report = bootstrap(args.source, args.target,
+                       nltk=[n for n in args.nltk.split(',') if n],
+                       spacy_models=[m for m in args.spacy.split(',') if m])
+    for item in report:
+        print(f"{item.kind:6} {item.name:16} {item.status:10} {item.detail}".rstrip())
+    return 1 if any(item.status == 'missing' for item in report) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,64 @@
+# src/utils/serialization.py
+"""
+JSON encoding for API responses.
+- dumps(): orjson when installed, else the stdlib encoder (JSON_BACKEND=auto|orjson|stdlib)
+- Both backends handle pipeline Records, NumPy scalars/arrays, sets and tuples
+"""
+import json
+from typing import Any
+
+from src.nlp.records import Record
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except Exception:
+    ORJSON_AVAILABLE = False
+
+try:
+    import numpy as np
+except Exception:  # numpy values can then not occur either
+    np = None
+
+_ORJSON_OPTIONS = (orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS) if ORJSON_AVAILABLE else 0
+_backend = 'orjson' if ORJSON_AVAILABLE else 'stdlib'
+
+
+def configure(backend: str = 'auto') -> str:
+    """Select the encoder ('auto' = orjson when installed); returns the one in use."""
+    global _backend
+    if backend not in ('auto', 'orjson', 'stdlib'):
+        raise ValueError(f"unknown JSON backend {backend!r}")
+    if backend == 'orjson' and not ORJSON_AVAILABLE:
+        raise ValueError('JSON_BACKEND=orjson but orjson is not installed')
+    _backend = 'stdlib' if backend == 'stdlib' or not ORJSON_AVAILABLE else 'orjson'
+    return _backend
+
+
+def backend() -> str:
+    return _backend
+
+
+def default(obj: Any) -> Any:
+    """Fallback for values neither encoder handles natively."""
+    if isinstance(obj, Record):
+        return obj.to_dict()
+    if np is not None:
+        if isinstance(obj, np.generic):
+            return obj.item()
+        if isinstance(obj, np.ndarray):
+            return obj.tolist()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj: Any) -> bytes:
+    """Compact UTF-8 JSON."""
+    if _backend == 'orjson':
+        # orjson rejects some numpy layouts (non-contiguous, object dtype); retry via the stdlib
+        try:
+            return orjson.dumps(obj, default=default, option=_ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            pass
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'), default=default).encode('utf-8')
@@ -3,34 +3,22 @@ document.addEventListener('DOMContentLoaded', function () {
   const recEl = document.getElementById('result-data');
   const records = recEl ? JSON.parse(recEl.textContent || '[]') : [];
 
-  // Populate healer filter options
-  const healerSet = new Set(records.map(r => r.healer).filter(Boolean));
-  const healerSelect = document.getElementById('filter_healer');
-  if (healerSelect) {
-    healerSet.forEach(h => {
-      const opt = document.createElement('option'); opt.value = h; opt.textContent = h; healerSelect.appendChild(opt);
-    });
-  }
-
-  // Table filtering logic
+  // Record filters: the healer options (with counts) are rendered server-side; a change
+  // reloads the records table from page 1 with the filters applied server-side, so the
+  // pages loaded on scroll are filtered too (see loadRecordsPage in ui.js).
   const table = document.getElementById('recordsTable');
   const filterHealer = document.getElementById('filter_healer');
   const filterSentiment = document.getElementById('filter_sentiment');
 
   function applyFilters() {
-    const h = filterHealer ? filterHealer.value : '';
-    const s = filterSentiment ? filterSentiment.value : '';
     if (!table) return;
-    const rows = table.querySelectorAll('tbody tr');
-    rows.forEach(row => {
-      const cells = row.querySelectorAll('td');
-      const healer = (cells[0] && cells[0].textContent.trim()) || '';
-      const sentiment = (cells[4] && cells[4].textContent.trim()) || '';
-      let show = true;
-      if (h && healer !== h) show = false;
-      if (s && sentiment.toLowerCase() !== s.toLowerCase()) show = false;
-      row.style.display = show ? '' : 'none';
-    });
+    const filters = {};
+    if (filterHealer && filterHealer.value) filters.healer = [filterHealer.value];
+    if (filterSentiment && filterSentiment.value) filters.sentiment = [filterSentiment.value];
+    table.dataset.filters = JSON.stringify(filters);
+    const scroll = document.getElementById('recordsScroll');
+    if (scroll) scroll.scrollTop = 0;
+    loadRecordsPage(1);
   }
 
   if (filterHealer) filterHealer.addEventListener('change', applyFilters);
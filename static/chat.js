@@ -1,4 +1,4 @@
-// Lightweight frontend chatbot UI. Sends questions to /ask-rag and displays placeholder answers.
+// Lightweight frontend chatbot UI. Sends questions to /ask-rag and renders streamed answers as they arrive.
 document.addEventListener('DOMContentLoaded', function(){
   const chatToggle = document.getElementById('chatToggle');
   const chatPanel = document.getElementById('chatPanel');
@@ -30,6 +30,25 @@ document.addEventListener('DOMContentLoaded', function(){
     chatLog.scrollTop = chatLog.scrollHeight;
   }
 
+  // Parse "event:/data:" frames out of a server-sent-event text buffer.
+  // Returns the unconsumed tail so partial frames are completed by the next chunk.
+  function drainSseFrames(buffer, onFrame) {
+    let idx;
+    while ((idx = buffer.indexOf('\n\n')) !== -1) {
+      const raw = buffer.slice(0, idx);
+      buffer = buffer.slice(idx + 2);
+      let event = 'message';
+      const dataLines = [];
+      raw.split('\n').forEach(line => {
+        if (line.startsWith('event:')) event = line.slice(6).trim();
+        else if (line.startsWith('data:')) dataLines.push(line.slice(5).trim());
+      });
+      if (!dataLines.length) continue;
+      try { onFrame(event, JSON.parse(dataLines.join('\n'))); } catch (e) { /* ignore malformed frame */ }
+    }
+    return buffer;
+  }
+
   if (chatForm) {
     chatForm.addEventListener('submit', async function(e){
       e.preventDefault();
@@ -38,30 +57,57 @@ document.addEventListener('DOMContentLoaded', function(){
       appendMessage('user', q);
       chatInput.value = '';
       appendMessage('system', 'Thinking...');
+      const placeholders = chatLog.querySelectorAll('.chat-system');
+      const answerEl = placeholders[placeholders.length-1].querySelector('.chat-text');
 
       try {
-        // Get original text from hidden data attribute
-        const resultData = document.getElementById('result-data');
-        const originalText = resultData ? resultData.getAttribute('data-original-text') : '';
+        // the analyzed text: the result page's edit form holds it (defaultValue survives edits)
+        const source = document.getElementById('originalText');
+        const originalText = source ? source.defaultValue : '';
         
-        const res = await fetch('/ask-rag', {
+        const res = await fetch('/ask-rag?stream=1', {
           method: 'POST',
-          headers: { 'Content-Type': 'application/json' },
+          headers: { 'Content-Type': 'application/json', 'Accept': 'text/event-stream' },
           body: JSON.stringify({ 
             question: q,
             text: originalText || ''
           })
         });
-        const data = await res.json();
-        // remove the 'Thinking...' placeholder (last system message)
-        const placeholders = chatLog.querySelectorAll('.chat-system');
-        if (placeholders.length) placeholders[placeholders.length-1].remove();
-        if (data && data.answer) appendMessage('system', data.answer);
-        else appendMessage('system', data?.error || 'No answer returned (placeholder).');
+        const contentType = res.headers.get('Content-Type') || '';
+        if (!res.body || contentType.indexOf('text/event-stream') === -1) {
+          // non-streamed reply (rate limit, validation error or older server)
+          const data = await res.json();
+          answerEl.textContent = (data && data.answer) ? data.answer : (data?.error || 'No answer returned (placeholder).');
+          return;
+        }
+
+        // render tokens as they arrive instead of waiting for the full completion
+        const reader = res.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let answer = '';
+        let finished = false;
+        while (!finished) {
+          const { value, done } = await reader.read();
+          if (done) break;
+          buffer = drainSseFrames(buffer + decoder.decode(value, { stream: true }), (event, data) => {
+            if (event === 'error') {
+              answerEl.textContent = data.error || 'Error contacting RAG endpoint.';
+              finished = true;
+            } else if (event === 'done') {
+              answerEl.textContent = data.answer || answer || 'No answer returned (placeholder).';
+              finished = true;
+            } else if (data.delta) {
+              answer += data.delta;
+              answerEl.textContent = answer;
+            }
+            chatLog.scrollTop = chatLog.scrollHeight;
+          });
+        }
+        if (finished) reader.cancel().catch(() => {});
+        else if (!answer) answerEl.textContent = 'No answer returned (placeholder).';
       } catch (err) {
-        const placeholders = chatLog.querySelectorAll('.chat-system');
-        if (placeholders.length) placeholders[placeholders.length-1].remove();
-        appendMessage('system', 'Error contacting RAG endpoint. (placeholder)');
+        answerEl.textContent = 'Error contacting RAG endpoint. (placeholder)';
       }
     });
   }
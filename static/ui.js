@@ -29,46 +29,165 @@ document.addEventListener('DOMContentLoaded', function(){
   renderHealerNetwork();
 });
 
-// Sorting helper for records table
-function sortTable(colIndex) {
+// Records table: the server renders the first page; further pages come from
+// /api/records/query (sorted and filtered server-side) as the table is scrolled.
+const sentimentCell = {
+  positive: '<span class="sentiment-positive">✓ Positive</span>',
+  negative: '<span class="sentiment-negative">✗ Negative</span>'
+};
+
+function escapeHtml(s) {
+  return String(s == null ? '' : s).replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;').replace(/"/g, '&quot;');
+}
+
+function recordRow(r) {
+  const span = r.end !== undefined ? ` data-start="${r.start}" data-end="${r.end}"` : '';
+  return `<tr class="table-row-hover" data-id="${r.id}"${span}>
+    <td><span class="badge badge-healer">${escapeHtml(r.healer)}</span></td>
+    <td><strong>${escapeHtml(r.cure)}</strong></td>
+    <td><small class="text-muted">${escapeHtml(r.symptom)}</small></td>
+    <td>${escapeHtml(r.outcome)}</td>
+    <td>${sentimentCell[r.sentiment] || '<span class="sentiment-neutral">○ Neutral</span>'}</td>
+  </tr>`;
+}
+
+// Fetch page ``page`` in the table's current sort and filters (``data-filters``, a JSON
+// object of facet -> values); page 1 replaces the rows and supersedes a page still loading,
+// later pages append.
+function loadRecordsPage(page) {
+  const table = document.getElementById('recordsTable');
+  if (!table || (page > 1 && table.dataset.loading === '1')) return Promise.resolve();
+  const request = String(parseInt(table.dataset.request || '0', 10) + 1);
+  table.dataset.request = request;
+  table.dataset.loading = '1';
+  const body = {
+    analysis_id: table.dataset.analysisId, sort: table.dataset.sort, page: page,
+    page_size: parseInt(table.dataset.pageSize, 10), facets: 0, filters: JSON.parse(table.dataset.filters || '{}')
+  };
+  const sentinel = document.getElementById('recordsSentinel');
+  return fetch('/api/records/query', {
+    method: 'POST', headers: {'Content-Type': 'application/json'}, body: JSON.stringify(body)
+  })
+    .then(res => {
+      if (!res.ok) throw new Error(`Server error: ${res.status}`);
+      return res.json();
+    })
+    .then(data => {
+      if (table.dataset.request !== request) return;  // superseded by a new sort or filter
+      const tbody = table.tBodies[0];
+      const html = data.records.map(recordRow).join('');
+      if (page === 1) tbody.innerHTML = html; else tbody.insertAdjacentHTML('beforeend', html);
+      table.dataset.page = data.page;
+      table.dataset.pages = data.pages;
+      const shown = document.getElementById('recordsShown');
+      if (shown) shown.textContent = tbody.rows.length;
+      const total = document.getElementById('recordsTotal');
+      if (total) total.textContent = data.total;
+      if (sentinel) sentinel.hidden = data.page >= data.pages;
+    })
+    .catch(err => {
+      console.error('Records page error:', err);
+      if (sentinel) sentinel.textContent = 'Could not load more records (the analysis may have expired; re-run it).';
+    })
+    .finally(() => { if (table.dataset.request === request) table.dataset.loading = '0'; });
+}
+
+// Sort the records table by ``key`` (server-side); clicking the active column toggles the direction.
+function sortTable(key) {
   const table = document.getElementById('recordsTable');
   if (!table) return;
-  const tbody = table.tBodies[0];
-  const rows = Array.from(tbody.querySelectorAll('tr'));
-  const currentSort = table.getAttribute('data-sort-col');
-  const currentDir = table.getAttribute('data-sort-dir') || 'asc';
-  let dir = 'asc';
-  if (currentSort == colIndex.toString() && currentDir == 'asc') dir = 'desc';
-  rows.sort((a,b) => {
-    const A = (a.children[colIndex] && a.children[colIndex].textContent.trim()) || '';
-    const B = (b.children[colIndex] && b.children[colIndex].textContent.trim()) || '';
-    if (!isNaN(parseFloat(A)) && !isNaN(parseFloat(B))) {
-      return dir === 'asc' ? parseFloat(A)-parseFloat(B) : parseFloat(B)-parseFloat(A);
-    }
-    return dir === 'asc' ? A.localeCompare(B) : B.localeCompare(A);
-  });
-  // reattach
-  rows.forEach(r => tbody.appendChild(r));
-  table.setAttribute('data-sort-col', colIndex);
-  table.setAttribute('data-sort-dir', dir);
-  // update aria-sort on headers
-  const headers = table.querySelectorAll('th[role="button"]');
-  headers.forEach((h, i) => {
-    if (i === colIndex) h.setAttribute('aria-sort', dir === 'asc' ? 'ascending' : 'descending');
-    else h.setAttribute('aria-sort', 'none');
+  const dir = table.dataset.sort === key ? 'desc' : 'asc';
+  table.dataset.sort = (dir === 'desc' ? '-' : '') + key;
+  table.querySelectorAll('th[data-sort-key]').forEach(h => {
+    h.setAttribute('aria-sort', h.dataset.sortKey === key ? (dir === 'asc' ? 'ascending' : 'descending') : 'none');
   });
+  const scroll = document.getElementById('recordsScroll');
+  if (scroll) scroll.scrollTop = 0;
+  loadRecordsPage(1);
 }
 
-// attach keyboard handlers to sortable headers
 document.addEventListener('DOMContentLoaded', function(){
   const table = document.getElementById('recordsTable');
   if (!table) return;
-  const headers = table.querySelectorAll('th[role="button"]');
-  headers.forEach((h, idx) => {
+  table.querySelectorAll('th[data-sort-key]').forEach(h => {
     h.addEventListener('keydown', function(e){
-      if (e.key === 'Enter' || e.key === ' ') { e.preventDefault(); sortTable(idx); }
+      if (e.key === 'Enter' || e.key === ' ') { e.preventDefault(); sortTable(h.dataset.sortKey); }
     });
   });
+  // infinite scroll: load the next page when the sentinel below the rows comes into view
+  const sentinel = document.getElementById('recordsSentinel');
+  if (!sentinel || typeof IntersectionObserver === 'undefined') return;
+  const observer = new IntersectionObserver(entries => {
+    const page = parseInt(table.dataset.page, 10);
+    if (entries.some(e => e.isIntersecting) && page < parseInt(table.dataset.pages, 10)) loadRecordsPage(page + 1);
+  }, {root: document.getElementById('recordsScroll'), rootMargin: '200px'});
+  observer.observe(sentinel);
+});
+
+// The page embeds the input text once, in the edit form (#originalText); its defaultValue is
+// the analyzed text even after the user starts editing.
+function originalText() {
+  const source = document.getElementById('originalText');
+  return source ? source.defaultValue : '';
+}
+
+document.addEventListener('DOMContentLoaded', function(){
+  // download forms copy the text from their data-text-source field when submitted
+  document.querySelectorAll('input[data-text-source]').forEach(input => {
+    input.form.addEventListener('submit', function(){
+      const source = document.getElementById(input.dataset.textSource);
+      input.value = source ? source.defaultValue : '';
+    });
+  });
+  // the "original pasted text" panel is filled when it is first opened
+  const panel = document.getElementById('collapseRaw');
+  const view = document.getElementById('originalTextView');
+  if (panel && view) {
+    panel.addEventListener('show.bs.collapse', function(){
+      if (originalText()) view.textContent = originalText();
+    }, {once: true});
+  }
+});
+
+// Source highlighting: records carry start/end offsets into the cleaned text, which is
+// fetched once, on the first click, from /api/records/source
+function loadSourceText(el) {
+  if (el.dataset.text !== undefined) return Promise.resolve(el.dataset.text);
+  return fetch('/api/records/source?' + new URLSearchParams({analysis_id: el.dataset.analysisId}))
+    .then(res => {
+      if (!res.ok) throw new Error(`Server error: ${res.status}`);
+      return res.json();
+    })
+    .then(data => { el.dataset.text = data.clean_text; return data.clean_text; });
+}
+
+function highlightSource(start, end) {
+  const el = document.getElementById('sourceText');
+  if (!el) return;
+  loadSourceText(el)
+    .then(text => showSource(el, text, start, end))
+    .catch(err => {
+      console.error('Source text error:', err);
+      el.textContent = 'Could not load the source text (the analysis may have expired; re-run it).';
+    });
+}
+
+function showSource(el, text, start, end) {
+  const esc = s => s.replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;');
+  el.innerHTML = esc(text.slice(0, start)) + '<mark id="sourceMark">' + esc(text.slice(start, end)) + '</mark>' + esc(text.slice(end));
+  const panel = document.getElementById('collapseSource');
+  if (panel && typeof bootstrap !== 'undefined') bootstrap.Collapse.getOrCreateInstance(panel, {toggle: false}).show();
+  const mark = document.getElementById('sourceMark');
+  if (mark) mark.scrollIntoView({block: 'center', behavior: 'smooth'});
+}
+
+document.addEventListener('DOMContentLoaded', function(){
+  const table = document.getElementById('recordsTable');
+  if (!table || !document.getElementById('sourceText')) return;
+  table.addEventListener('click', function(e){
+    const row = e.target.closest('tr[data-start]');
+    if (row) highlightSource(parseInt(row.dataset.start, 10), parseInt(row.dataset.end, 10));
+  });
 });
 
 // WOW Feature: Find Similar Cases
@@ -83,14 +202,10 @@ function findSimilarCases() {
   
   resultsDiv.innerHTML = '<div class="text-muted">Searching...</div>';
   
-  // Get original text from hidden data
-  const resultData = document.getElementById('result-data');
-  const originalText = resultData ? resultData.getAttribute('data-original-text') : '';
-  
   fetch('/api/similar', {
     method: 'POST',
     headers: {'Content-Type': 'application/json'},
-    body: JSON.stringify({query: query, text: originalText || document.querySelector('textarea[name="text"]')?.value || ''})
+    body: JSON.stringify({query: query, text: originalText() || document.querySelector('textarea[name="text"]')?.value || ''})
   })
   .then(res => {
     if (!res.ok) throw new Error(`Server error: ${res.status}`);
@@ -148,63 +263,26 @@ function generateWisdomTimeline() {
   const timelineDiv = document.getElementById('timelineChart');
   if (!timelineDiv) return;
   
-  // Get records from table
-  const table = document.getElementById('recordsTable');
-  if (!table) return;
-  
-  const rows = Array.from(table.querySelectorAll('tbody tr'));
-  if (rows.length === 0) {
+  // Running effectiveness of the top cures, computed server-side over all records
+  let series = {};
+  const jsonEl = document.getElementById('timeline-data-json');
+  if (jsonEl) {
+    try { series = JSON.parse(jsonEl.textContent || '{}'); } catch(e) { series = {}; }
+  }
+  if (Object.keys(series).length === 0) {
     timelineDiv.innerHTML = '<div class="text-muted text-center py-4">No data available</div>';
     return;
   }
-  
-  // Extract data: simulate chronological order (index = time)
-  const cureData = {};
-  rows.forEach((row, idx) => {
-    const cure = row.children[1]?.textContent.trim() || 'unknown';
-    const sentiment = row.children[4]?.textContent.trim().toLowerCase() || 'neutral';
-    
-    if (!cureData[cure]) {
-      cureData[cure] = { positive: [], negative: [], neutral: [] };
-    }
-    
-    // Accumulate counts over time
-    if (sentiment === 'positive') cureData[cure].positive.push(idx);
-    else if (sentiment === 'negative') cureData[cure].negative.push(idx);
-    else cureData[cure].neutral.push(idx);
-  });
-  
-  // Build timeline traces (top 5 cures by total mentions)
-  const sortedCures = Object.keys(cureData).sort((a, b) => {
-    const totalA = cureData[a].positive.length + cureData[a].negative.length + cureData[a].neutral.length;
-    const totalB = cureData[b].positive.length + cureData[b].negative.length + cureData[b].neutral.length;
-    return totalB - totalA;
-  }).slice(0, 5);
-  
-  const traces = [];
-  sortedCures.forEach(cure => {
-    const data = cureData[cure];
-    const allIndices = [...data.positive, ...data.negative, ...data.neutral].sort((a,b) => a-b);
-    
-    // Calculate cumulative effectiveness (positive - negative)
-    const cumulativeScore = [];
-    let score = 0;
-    allIndices.forEach(idx => {
-      if (data.positive.includes(idx)) score++;
-      else if (data.negative.includes(idx)) score--;
-      cumulativeScore.push(score);
-    });
-    
-    traces.push({
-      x: allIndices.map(i => `Record ${i+1}`),
-      y: cumulativeScore,
-      type: 'scatter',
-      mode: 'lines+markers',
-      name: cure,
-      line: { width: 2 }
-    });
-  });
-  
+
+  const traces = Object.keys(series).map(cure => ({
+    x: series[cure].x.map(i => `Record ${i+1}`),
+    y: series[cure].y,
+    type: 'scatter',
+    mode: 'lines+markers',
+    name: cure,
+    line: { width: 2 }
+  }));
+
   const layout = {
     title: 'Cure Effectiveness Over Time',
     xaxis: { title: 'Chronological Records' },
@@ -223,20 +301,14 @@ function generateWisdomTimeline() {
     const container = document.getElementById('network');
     if (!container || typeof cytoscape === 'undefined') return;
 
-    // try to read structured JSON first (injected by template)
-    let records = [];
-    const jsonEl = document.getElementById('records-data-json');
+    // healer-cure co-occurrence counts, aggregated server-side (injected by template)
+    let pairs = [];
+    const jsonEl = document.getElementById('network-data-json');
     if (jsonEl) {
-      try { records = JSON.parse(jsonEl.textContent || jsonEl.innerText || '[]'); } catch(e) { records = []; }
-    }
-
-    // fallback: read table rows
-    if ((!records || records.length === 0) && document.getElementById('recordsTable')) {
-      const rows = Array.from(document.querySelectorAll('#recordsTable tbody tr'));
-      records = rows.map(r => ({ healer: r.children[0]?.textContent.trim(), cure: r.children[1]?.textContent.trim(), symptom: r.children[2]?.textContent.trim(), outcome: r.children[3]?.textContent.trim(), sentiment: r.children[4]?.textContent.trim() }));
+      try { pairs = JSON.parse(jsonEl.textContent || jsonEl.innerText || '[]'); } catch(e) { pairs = []; }
     }
 
-    if (!records || records.length === 0) {
+    if (!pairs || pairs.length === 0) {
       container.innerHTML = '<div class="text-muted text-center py-4">No network data available</div>';
       return;
     }
@@ -246,13 +318,13 @@ function generateWisdomTimeline() {
     const cureCounts = {};
     const edgeMap = {}; // key: healer|cure -> weight
 
-    records.forEach(rec => {
-      const h = (rec.healer || 'Unknown').trim() || 'Unknown';
-      const c = (rec.cure || 'Unknown').trim() || 'Unknown';
-      healerCounts[h] = (healerCounts[h] || 0) + 1;
-      cureCounts[c] = (cureCounts[c] || 0) + 1;
+    pairs.forEach(p => {
+      const h = (p.healer || 'Unknown').trim() || 'Unknown';
+      const c = (p.cure || 'Unknown').trim() || 'Unknown';
+      healerCounts[h] = (healerCounts[h] || 0) + p.count;
+      cureCounts[c] = (cureCounts[c] || 0) + p.count;
       const key = `${h}|||${c}`;
-      edgeMap[key] = (edgeMap[key] || 0) + 1;
+      edgeMap[key] = (edgeMap[key] || 0) + p.count;
     });
 
     const elements = [];
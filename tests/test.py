@@ -39,13 +39,8 @@ try:
 except:
     DOCX2TXT_AVAILABLE = False
 
-# Download necessary NLTK resources (run once)
-try:
-    nltk.download('punkt', quiet=True)
-    nltk.download('stopwords', quiet=True)
-    nltk.download('wordnet', quiet=True)
-except:
-    pass
+# NLTK resources (punkt, stopwords, wordnet) are not downloaded here: install them once,
+# offline, with `python -m src.utils.resources --source <dir>`
 
 # Load spaCy model for lemmatization and NER
 try:
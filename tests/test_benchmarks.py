@@ -0,0 +1,43 @@
+# tests/test_benchmarks.py
+"""
+Unit tests for the benchmark harness (not the benchmarks themselves).
+"""
+from benchmarks.harness import compare, measure, percentile
+from benchmarks.micro import fixed_corpus, main
+
+
+def test_percentile_nearest_rank():
+    samples = list(range(1, 101))
+    assert percentile(samples, 50) == 50
+    assert percentile(samples, 99) == 99
+    assert percentile([], 50) == 0.0
+
+
+def test_fixed_corpus_is_deterministic():
+    assert fixed_corpus(50) == fixed_corpus(50)
+    assert len(fixed_corpus(1234)) == 1234
+
+
+def test_measure_reports_throughput_and_memory():
+    res = measure(lambda: [0] * 10_000, ops_per_call=10, repeat=3)
+    assert res['ops'] == 30
+    assert res['ops_per_sec'] > 0
+    assert res['p99_ms'] >= res['p50_ms']
+    assert res['peak_mem_kb'] > 0
+
+
+def test_compare_flags_regressions_beyond_threshold():
+    base = {'parse_text@100': {'ops_per_sec': 1000.0, 'p50_ms': 1.0, 'p99_ms': 2.0, 'peak_mem_kb': 100.0}}
+    ok = {'parse_text@100': {'ops_per_sec': 900.0, 'p50_ms': 1.1, 'p99_ms': 2.2, 'peak_mem_kb': 110.0}}
+    slow = {'parse_text@100': {'ops_per_sec': 500.0, 'p50_ms': 2.0, 'p99_ms': 4.0, 'peak_mem_kb': 100.0}}
+    assert compare(ok, base, threshold=0.2) == []
+    problems = compare(slow, base, threshold=0.2)
+    assert len(problems) == 2
+    assert all(p.startswith('parse_text@100') for p in problems)
+
+
+def test_cli_saves_and_compares_baseline(tmp_path):
+    path = str(tmp_path / 'baseline.json')
+    assert main(['--sizes', '20', '--only', 'parse_text', '--repeat', '1', '--no-memory', '--save', path]) == 0
+    # a generous threshold can't fail on noise
+    assert main(['--sizes', '20', '--only', 'parse_text', '--repeat', '1', '--no-memory', '--compare', path, '--threshold', '100']) == 0
@@ -0,0 +1,80 @@
+# tests/test_cache.py
+"""
+Unit tests for the in-process cache helpers.
+"""
+import threading
+import time
+
+import pytest
+from src.utils.cache import TTLCache, SingleFlight
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_cache_expires_entries():
+    clock = FakeClock()
+    cache = TTLCache(maxsize=4, ttl=10, clock=clock)
+    cache.set('q', 'answer')
+    assert cache.get('q') == 'answer'
+    clock.now = 11
+    assert cache.get('q') is None
+    assert len(cache) == 0
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+
+
+def test_single_flight_coalesces_concurrent_calls():
+    sf = SingleFlight()
+    calls = []
+    started = threading.Event()
+
+    def slow():
+        calls.append(1)
+        started.set()
+        time.sleep(0.1)
+        return 'done'
+
+    results = []
+
+    def worker():
+        results.append(sf.do('key', slow))
+
+    first = threading.Thread(target=worker)
+    first.start()
+    started.wait()
+    others = [threading.Thread(target=worker) for _ in range(4)]
+    for t in others:
+        t.start()
+    for t in [first] + others:
+        t.join()
+
+    assert len(calls) == 1
+    assert [r[0] for r in results] == ['done'] * 5
+    assert sum(1 for _, shared in results if shared) == 4
+    assert sf.in_flight() == 0
+
+
+def test_single_flight_propagates_errors():
+    sf = SingleFlight()
+
+    def boom():
+        raise ValueError('upstream failed')
+
+    with pytest.raises(ValueError):
+        sf.do('key', boom)
+    assert sf.do('key', lambda: 42) == (42, False)
@@ -0,0 +1,86 @@
+# tests/test_comparison.py
+"""
+Unit tests for per-side healer comparison.
+"""
+from src.nlp.table import RecordTable
+from src.services import comparison_service
+from src.services.comparison_service import (analyze_sides, combine_results, compare_results,
+                                             cure_effectiveness)
+
+A = "Healer A used garlic for infection, it worked well. Healer A used garlic for fever - it did not help."
+B = "Healer B used garlic for infection, it worked well. Healer B used mint for cough - no improvement."
+
+
+def test_cure_effectiveness():
+    assert cure_effectiveness({'garlic': 3}, {'garlic': 1, 'mint': 2}) == {
+        'garlic': {'pos': 3, 'neg': 1, 'total': 4, 'pct': 75},
+        'mint': {'pos': 0, 'neg': 2, 'total': 2, 'pct': 0},
+    }
+
+
+def test_sides_cached_by_text(monkeypatch):
+    calls = []
+    real = comparison_service.analyze_text
+
+    def counting(text, *args, **kwargs):
+        calls.append(text)
+        return real(text, *args, **kwargs)
+
+    monkeypatch.setattr(comparison_service, 'analyze_text', counting)
+    comparison_service._SIDES.clear()
+    first = analyze_sides([A, B])
+    assert [cached for _, cached in first] == [False, False]
+    other = B + " Healer C used honey for cough, it helped."
+    second = analyze_sides([A, other])
+    assert [cached for _, cached in second] == [True, False]
+    assert sorted(calls) == sorted([A, B, other])
+    # callers get their own copies of the shared result
+    second[0][0].pop('records')
+    second[1][0]['cures_pos_counts'].clear()
+    second[1][0]['keywords'].append('changed')
+    third = analyze_sides([A, other])
+    assert 'records' in third[0][0] and third[1][0]['cures_pos_counts']
+    assert 'changed' not in third[1][0]['keywords']
+
+
+def test_compare_results_diff_per_cure():
+    comparison = compare_results(*analyze_sides([A, B]))
+    assert comparison['a']['records'] == 2 and comparison['b']['records'] == 2
+    cures = {c['cure']: c for c in comparison['cures']}
+    assert cures['garlic']['diff_pct'] == 50
+    assert cures['mint']['a'] is None and cures['mint']['diff_pct'] is None
+    assert comparison['cures'][0]['cure'] == 'garlic'
+
+
+def test_combined_records_point_into_combined_text():
+    (ra, _), (rb, _) = analyze_sides([A, B])
+    combined = combine_results(ra, rb)
+    text = combined['clean_text']
+    assert [text[r['start']:r['end']] for r in combined['records']] == [r['raw'] for r in combined['records']]
+    assert combined['cures_pos_counts']['garlic'] == 2
+    assert ra['records'][0]['start'] == 0  # the cached side is untouched
+
+
+def test_combined_records_are_tagged_with_their_side():
+    (ra, _), (rb, _) = analyze_sides([A, B])
+    combined = combine_results(ra, rb)
+    assert [r['side'] for r in combined['records']] == ['A', 'A', 'B', 'B']
+    assert 'side' not in ra['records'][0]  # the cached side is untouched
+    # sides pickled as plain dicts (shared across workers) are tagged too
+    plain = combine_results({**ra, 'records': [dict(r) for r in ra['records']]}, rb)
+    assert [r['side'] for r in plain['records']] == ['A', 'A', 'B', 'B']
+    table = RecordTable.from_records(combined['records'])
+    assert [r['side'] for r in table.to_records()] == ['A', 'A', 'B', 'B']
+    assert table.to_columnar()['columns']['side']['dictionary'] == ['A', 'B']
+    assert 'side' not in RecordTable.from_records(ra['records']).to_columnar()['columns']
+
+
+def test_api_compare():
+    from app import app
+
+    client = app.test_client()
+    res = client.post('/api/compare', json={'a': A, 'b': B})
+    assert res.status_code == 200 and set(res.get_json()) == {'a', 'b', 'cures'}
+    assert client.post('/api/compare', json={'a': A}).status_code == 400
+    page = client.post('/analyze', data={'compare_a': A, 'compare_b': B})
+    assert page.status_code == 200 and b'comparisonTable' in page.get_data()
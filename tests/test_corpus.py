@@ -0,0 +1,48 @@
+# tests/test_corpus.py
+"""
+Unit tests for the synthetic corpus generator.
+"""
+import io
+import json
+
+from benchmarks.corpus import CorpusGenerator, parse_size, write_json
+from src.nlp.rule_based import extract_cure_and_symptom
+
+
+def test_same_seed_same_corpus():
+    assert CorpusGenerator(seed=7).text(500) == CorpusGenerator(seed=7).text(500)
+    assert CorpusGenerator(seed=7).text(500) != CorpusGenerator(seed=8).text(500)
+
+
+def test_corpus_mixes_parseable_and_filler_lines():
+    lines = list(CorpusGenerator(seed=1, unparseable=0.2).lines(2000))
+    parsed = [extract_cure_and_symptom(line) for line in lines]
+    with_cure = sum(1 for cure, _, _ in parsed if cure)
+    assert 0.6 * len(lines) < with_cure < 0.95 * len(lines)
+    for verb in ('used', 'tried', 'against', 'applied', 'administered', 'to patients with', 'poultice of'):
+        assert any(verb in line for line in lines), verb
+
+
+def test_vocabulary_sizes_are_configurable():
+    gen = CorpusGenerator(seed=1, cures=100, healers=50)
+    assert len(gen.cures) == 100
+    assert len(set(gen.cures)) == 100
+    assert len(gen.healers) == 50
+
+
+def test_size_targeting_and_parse_size():
+    assert parse_size('64KB') == 64 * 1024
+    assert parse_size('2GB') == 2 * 1024 ** 3
+    assert parse_size('512') == 512
+    lines = list(CorpusGenerator(seed=3).lines_for_size(10_000))
+    size = sum(len(line.encode('utf-8')) + 1 for line in lines)
+    assert 10_000 <= size < 10_300
+
+
+def test_json_output_is_a_list_of_strings():
+    buf = io.StringIO()
+    count = write_json(buf, CorpusGenerator(seed=2).lines(25))
+    data = json.loads(buf.getvalue())
+    assert count == 25
+    assert len(data) == 25
+    assert all(isinstance(x, str) for x in data)
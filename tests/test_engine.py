@@ -0,0 +1,128 @@
+# tests/test_engine.py
+"""
+Unit tests for the stage-based pipeline engine and field selection.
+"""
+import time
+
+import pytest
+from src.core.engine import PipelineEngine, Stage
+from src.core.nlp_pipeline import ENGINE, FIELDS, MODES, process_scrolls
+
+TEXT = "Healer A used garlic for infection, it worked well. Healer B used saltwater for fever - it did not help."
+
+
+def _engine(calls):
+    def stage(name, inputs, outputs):
+        def fn(ctx):
+            calls.append(name)
+            return {k: name for k in outputs}
+        return Stage(name, inputs, outputs, fn)
+
+    return PipelineEngine([
+        stage('a', ('text',), ('x',)),
+        stage('b', ('x',), ('y', 'z')),
+        stage('c', ('x',), ('w',)),
+    ])
+
+
+def test_plan_selects_only_dependencies():
+    engine = _engine([])
+    assert [s.name for s in engine.plan(['y'])] == ['a', 'b']
+    assert [s.name for s in engine.plan(['w'])] == ['a', 'c']
+    assert [s.name for s in engine.plan(None)] == ['a', 'b', 'c']
+
+
+def test_run_skips_unneeded_stages():
+    calls = []
+    ctx = _engine(calls).run({'text': 'hi'}, ['z'])
+    assert calls == ['a', 'b']
+    assert ctx['z'] == 'b' and 'w' not in ctx
+
+
+def test_unknown_field_raises_key_error():
+    with pytest.raises(KeyError):
+        _engine([]).plan(['nope'])
+
+
+def test_duplicate_producer_rejected():
+    def noop(ctx):
+        return {}
+
+    with pytest.raises(ValueError):
+        PipelineEngine([Stage('a', ('text',), ('x',), noop), Stage('b', ('text',), ('x',), noop)])
+
+
+def test_missing_input_rejected():
+    with pytest.raises(ValueError):
+        PipelineEngine([Stage('a', ('later',), ('x',), lambda ctx: {})])
+
+
+def test_counts_only_plan_skips_heavy_stages():
+    names = [s.name for s in ENGINE.plan(['records', 'cures_pos_counts', 'cures_neg_counts'])]
+    for heavy in ('keywords', 'vader', 'summarizer', 'entities', 'topics'):
+        assert heavy not in names
+
+
+def test_process_scrolls_returns_requested_fields():
+    res = process_scrolls(TEXT, ['cures_pos_counts', 'cures_neg_counts'])
+    assert set(res) == {'cures_pos_counts', 'cures_neg_counts'}
+    assert res['cures_pos_counts'] == {'garlic': 1}
+    assert set(process_scrolls(TEXT)) == set(FIELDS)
+
+
+def test_process_endpoint_field_selection():
+    from app import app
+
+    client = app.test_client()
+    res = client.post('/api/process?mode=fast', json={'text': TEXT, 'fields': ['cures_pos_counts', ' ']})
+    assert res.status_code == 200 and res.get_json()['cures_pos_counts'] == {'garlic': 1} and 'records' not in res.get_json()
+    for bad, unknown in ((5, [5]), ({'records': 1}, [{'records': 1}]), (['records', 3], [3]), ('bogus', ['bogus'])):
+        res = client.post('/api/process?mode=fast', json={'text': TEXT, 'fields': bad})
+        assert res.status_code == 400
+        body = res.get_json()
+        assert body['error'] == 'unknown_fields' and body['unknown'] == unknown and 'records' in body['valid']
+
+
+def test_process_endpoint_rejects_unknown_modes():
+    from app import app
+
+    client = app.test_client()
+    for bad in ('turbo', ['fast'], {'fast': 1}, 5):
+        res = client.post('/api/process', json={'text': TEXT, 'mode': bad})
+        assert res.status_code == 400 and res.get_json() == {'error': 'unknown_mode', 'valid': list(MODES)}
+
+
+def _slow_engine():
+    return PipelineEngine([
+        Stage('cheap', ('text',), ('x',), lambda ctx: {'x': 1}),
+        Stage('slow', ('x',), ('y',), lambda ctx: {'y': 'full'}, fallback=lambda ctx: {'y': 'quick'}, cost=10.0),
+    ])
+
+
+def test_degrade_runs_fallback_and_reports_it():
+    ctx = _slow_engine().run({'text': ''}, degrade={'slow'})
+    assert ctx['y'] == 'quick'
+    assert ctx['degraded'] == ['slow']
+
+
+def test_deadline_falls_back_when_estimate_overruns():
+    engine = _slow_engine()
+    ctx = engine.run({'text': ''}, deadline=time.perf_counter() + 0.5)
+    assert ctx['y'] == 'quick' and ctx['degraded'] == ['slow']
+    ctx = engine.run({'text': ''}, deadline=time.perf_counter() + 60)
+    assert ctx['y'] == 'full' and ctx['degraded'] == []
+
+
+def test_observed_timings_replace_cost_prior():
+    engine = _slow_engine()
+    engine.run({'text': ''})
+    assert engine.estimate(engine.stages[1], 1) < 1.0
+
+
+def test_fast_mode_is_rule_based_only():
+    res = process_scrolls(TEXT, mode='fast')
+    assert set(res['degraded']) == MODES['fast']
+    assert res['cures_pos_counts'] == {'garlic': 1}
+    assert 'degraded' not in process_scrolls(TEXT, mode='full')
+    with pytest.raises(ValueError):
+        process_scrolls(TEXT, mode='turbo')
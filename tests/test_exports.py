@@ -0,0 +1,99 @@
+# tests/test_exports.py
+"""
+Unit tests for streaming CSV/JSON/TXT exports, gzip and Parquet/Arrow.
+"""
+import csv
+import gzip
+import io
+import json
+
+import pytest
+
+from benchmarks.corpus import CorpusGenerator
+from src.core.nlp_pipeline import process_scrolls
+from src.services.exports import csv_columns, gzip_chunks, iter_csv, iter_json, iter_txt
+
+RESULT = process_scrolls(CorpusGenerator(seed=41).text(300), ['records', 'cures_pos_counts', 'summary'])
+RECORDS = RESULT['records']
+
+
+def test_csv_streams_every_record_in_batches():
+    chunks = list(iter_csv(RECORDS, batch=64))
+    assert len(chunks) == -(-len(RECORDS) // 64)
+    rows = list(csv.DictReader(io.StringIO(''.join(chunks))))
+    assert len(rows) == len(RECORDS)
+    assert rows[0]['raw'] == RECORDS[0]['raw'] and rows[-1]['cure'] == RECORDS[-1]['cure']
+
+
+def test_csv_columns_are_first_seen_union():
+    assert csv_columns([{'a': 1}, {'b': 2, 'a': 3}]) == ['a', 'b']
+    assert ''.join(iter_csv([{'a': 1}, {'b': 2}])) == 'a,b\n1,\n,2\n'
+
+
+def test_json_stream_is_compact_and_complete():
+    data = b''.join(iter_json(RESULT, batch=50)).decode('utf-8')
+    assert '\n' not in data and ': ' not in data.split('"records"')[0]
+    assert json.loads(data) == json.loads(json.dumps(RESULT, default=dict))
+
+
+def test_txt_lists_summary_and_records():
+    lines = ''.join(iter_txt(RESULT, batch=7)).split('\n')
+    assert lines[:2] == ['Summary:', RESULT['summary']]
+    assert len(lines) == 4 + len(RECORDS)
+
+
+def test_gzip_round_trip():
+    chunks = list(iter_json(RESULT, batch=10))
+    assert gzip.decompress(b''.join(gzip_chunks(chunks))) == b''.join(chunks)
+
+
+def test_download_routes_gzip():
+    from app import app
+
+    client = app.test_client()
+    text = "Healer A used garlic for infection, it worked well."
+    res = client.post('/download/json', data={'text': text}, headers={'Accept-Encoding': 'gzip'})
+    assert res.headers['Content-Encoding'] == 'gzip'
+    assert json.loads(gzip.decompress(res.get_data()))['records'][0]['cure'] == 'garlic'
+
+    res = client.post('/download', data={'text': text, 'gzip': '1'})
+    assert res.headers['Content-Disposition'].endswith('.csv.gz') and 'Content-Encoding' not in res.headers
+    assert gzip.decompress(res.get_data()).decode().startswith('healer,cure')
+    assert client.post('/download/txt', data={'text': text}).get_data(as_text=True).startswith('Summary:')
+
+
+def test_parquet_and_arrow_round_trip():
+    pa = pytest.importorskip('pyarrow')
+    import pyarrow.parquet as pq
+    from src.nlp.table import RecordTable
+    from src.services.exports import cure_batches, cure_schema, iter_arrow, iter_parquet, record_batches, record_schema
+
+    table = RecordTable.from_records(RECORDS)
+    data = b''.join(iter_parquet(record_schema(table), record_batches(table, rows=100)))
+    parquet = pq.ParquetFile(io.BytesIO(data))
+    assert parquet.num_row_groups == -(-len(RECORDS) // 100)
+    read = parquet.read()
+    assert pa.types.is_dictionary(read.schema.field('cure').type)
+    assert read.column('raw').to_pylist() == [r['raw'] for r in RECORDS]
+    assert read.column('start').to_pylist() == [r['start'] for r in RECORDS]
+
+    stream = pa.ipc.open_stream(b''.join(iter_arrow(cure_schema(), cure_batches(table)))).read_all()
+    pos, neg = table.cure_counts()
+    assert dict(zip(stream.column('cure').to_pylist(), stream.column('positive').to_pylist())) == \
+        {c: pos.get(c, 0) for c in set(pos) | set(neg)}
+
+
+def test_columnar_download_routes():
+    pytest.importorskip('pyarrow')
+    import pyarrow.parquet as pq
+    from app import app
+
+    client = app.test_client()
+    text = "Healer A used garlic for infection, it worked well. Healer B used saltwater for fever - it did not help."
+    res = client.post('/download/parquet', data={'text': text}, headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in res.headers and 'parquet' in res.headers['X-Export-Formats']
+    assert pq.read_table(io.BytesIO(res.get_data())).column('cure').to_pylist() == ['garlic', 'saltwater']
+    res = client.post('/download/arrow?table=cures', data={'text': text})
+    assert res.headers['Content-Disposition'].endswith('healers_cures.arrow')
+    assert client.post('/download/arrow?table=nope', data={'text': text}).status_code == 400
+    assert 'arrow' in client.get('/download/formats').get_json()['formats']
@@ -0,0 +1,248 @@
+# tests/test_facets.py
+"""
+Unit tests for bitmap facet indexes, the analysis store and /api/records/query.
+"""
+import threading
+import time
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from benchmarks.corpus import CorpusGenerator  # noqa: E402
+from src.core.nlp_pipeline import clean_text  # noqa: E402
+from src.nlp.facets import FacetIndex  # noqa: E402
+from src.nlp.records import parse_records  # noqa: E402
+from src.nlp.table import RecordTable  # noqa: E402
+from src.services.analysis_store import AnalysisStore, FileTables, make_store, server_workers  # noqa: E402
+
+RECORDS = parse_records(clean_text(CorpusGenerator(seed=39).text(1500)))
+TABLE = RecordTable.from_records(RECORDS)
+INDEX = FacetIndex(TABLE)
+
+
+def _brute(filters, op='and'):
+    def hit(rec):
+        terms = [rec.get(f) in ([v] if isinstance(v, str) else v) for f, v in filters.items()]
+        return all(terms) if op == 'and' else any(terms)
+    return [i for i, rec in enumerate(RECORDS) if hit(rec)]
+
+
+def _ids(bits):
+    return np.flatnonzero(np.unpackbits(bits, count=INDEX.n)).tolist()
+
+
+def test_and_or_match_brute_force():
+    cures = list(TABLE.value_counts('cure'))[:2]
+    for filters in ({'sentiment': 'positive'},
+                    {'sentiment': 'positive', 'cure': cures},
+                    {'sentiment': 'negative', 'cure': cures[0], 'healer': 'nobody'}):
+        for op in ('and', 'or'):
+            bits = INDEX.select(filters, op)
+            assert _ids(bits) == _brute(filters, op)
+            assert INDEX.count(bits) == len(_brute(filters, op))
+    assert INDEX.select({}) is None and INDEX.count(None) == len(RECORDS)
+
+
+def test_pages_in_document_order():
+    filters = {'sentiment': 'positive'}
+    expected = _brute(filters)
+    bits = INDEX.select(filters)
+    pages = [INDEX.page(bits, off, 7).tolist() for off in range(0, len(expected), 7)]
+    assert sum(pages, []) == expected
+    assert INDEX.page(bits, len(expected), 7).size == 0
+
+
+def test_sorted_page_is_stable():
+    bits = INDEX.select({'sentiment': 'negative'})
+    ids = INDEX.page(bits, 0, 10 ** 6, sort='cure', descending=True).tolist()
+    expected = sorted(_brute({'sentiment': 'negative'}), key=lambda i: RECORDS[i]['cure'], reverse=True)
+    assert [RECORDS[i]['cure'] for i in ids] == [RECORDS[i]['cure'] for i in expected]
+    assert sorted(ids) == sorted(expected)
+
+
+def test_query_facet_counts_reflect_selection():
+    res = INDEX.query({'sentiment': 'positive'}, page=2, page_size=5)
+    assert res['total'] == len(_brute({'sentiment': 'positive'}))
+    assert res['pages'] == -(-res['total'] // 5)
+    assert res['facets']['sentiment'] == {'positive': res['total']}
+    assert [r['id'] for r in res['records']] == _brute({'sentiment': 'positive'})[5:10]
+    assert res['records'][0]['raw'] == RECORDS[res['records'][0]['id']]['raw']
+
+
+def test_bitmap_cache_is_thread_safe():
+    index = FacetIndex(TABLE, max_bitmaps=4)  # constant eviction
+    cures = list(TABLE.value_counts('cure'))[:12]
+    expected = {cure: _brute({'cure': cure}) for cure in cures}
+    errors = []
+
+    def worker(offset):
+        try:
+            for i in range(200):
+                cure = cures[(i + offset) % len(cures)]
+                assert np.flatnonzero(np.unpackbits(index.bitmap('cure', cure), count=index.n)).tolist() \
+                    == expected[cure]
+        except Exception as e:  # surfaced in the main thread
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(k,)) for k in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == [] and len(index._bitmaps) <= 4
+
+
+def test_store_round_trip():
+    store = AnalysisStore(maxsize=1)
+    first = store.put(RECORDS[:10])
+    assert store.get(first.id) is first and len(first.table) == 10
+    second = store.put(RECORDS[:5], scores=[0.0] * 4)  # mismatched scores are dropped
+    assert second.table.scores is None
+    assert store.get(first.id) is None and store.get(None) is None
+
+
+@pytest.mark.parametrize('backend', ['file', 'sqlite'])
+def test_shared_store_serves_other_workers(tmp_path, backend):
+    path = str(tmp_path / ('analyses' if backend == 'file' else 'analyses.sqlite3'))
+    worker_a, worker_b = (make_store(backend, path, maxsize=2) for _ in range(2))
+    stored = worker_a.put(RECORDS[:20], scores=[0.5] * 20, context={'clean_text': 'x'})
+    loaded = worker_b.get(stored.id)
+    assert loaded is not None and loaded.context is None and loaded.created == stored.created
+    assert loaded.index.query(filters={'sentiment': 'positive'}, page_size=20)['records'] == \
+        stored.index.query(filters={'sentiment': 'positive'}, page_size=20)['records']
+    assert worker_b.get(stored.id) is loaded  # cached after the first load
+    assert all(worker_b.get(bad) is None for bad in (5, ['x'], {stored.id: 1}, b'x' * 32))
+    assert worker_b.get('../' + stored.id) is None and worker_b.get('0' * 32) is None
+
+
+def test_shared_store_keeps_newest_maxsize(tmp_path):
+    store = make_store('file', str(tmp_path), maxsize=2)
+    store.shared.purge_every = 1
+    ids = []
+    for _ in range(4):
+        ids.append(store.put(RECORDS[:3]).id)
+        time.sleep(0.02)  # distinct mtimes (coarse on some filesystems)
+    other = make_store('file', str(tmp_path), maxsize=2)
+    assert [other.get(i) is not None for i in ids] == [False, False, True, True]
+
+
+def test_auto_store_is_shared_only_with_several_workers(tmp_path, monkeypatch):
+    monkeypatch.delenv('WEB_CONCURRENCY', raising=False)
+    monkeypatch.delenv('GUNICORN_CMD_ARGS', raising=False)
+    assert server_workers() == 1 and make_store('auto', str(tmp_path)).shared is None
+    monkeypatch.setenv('WEB_CONCURRENCY', '4')
+    assert server_workers() == 4 and isinstance(make_store('auto', str(tmp_path)).shared, FileTables)
+    monkeypatch.setenv('GUNICORN_CMD_ARGS', '--bind 0.0.0.0:8000 --workers=1')
+    assert server_workers() == 1 and make_store('auto', str(tmp_path)).shared is None
+    monkeypatch.setenv('GUNICORN_CMD_ARGS', '-w 3 --timeout 60')
+    assert server_workers() == 3
+
+
+def test_records_query_endpoint():
+    from app import app
+
+    client = app.test_client()
+    text = "Healer A used garlic for infection, it worked well. Healer B used saltwater for fever - it did not help."
+    res = client.post('/api/process?store=1&fields=cures_pos_counts', json={'text': text})
+    body = res.get_json()
+    assert 'records' not in body and body['analysis_id']
+
+    res = client.get(f"/api/records/query?analysis_id={body['analysis_id']}&cure=garlic,saltwater&sort=-cure")
+    data = res.get_json()
+    assert data['total'] == 2 and [r['cure'] for r in data['records']] == ['saltwater', 'garlic']
+
+    res = client.post('/api/records/query', json={'analysis_id': body['analysis_id'],
+                                                  'filters': {'sentiment': ['positive']}})
+    assert [r['healer'] for r in res.get_json()['records']] == ['A']
+    assert client.get('/api/records/query?analysis_id=nope').status_code == 404
+    for bad_id in (5, ['x'], {'id': 'x'}, None):
+        res = client.post('/api/records/query', json={'analysis_id': bad_id})
+        assert res.status_code == 404 and res.get_json() == {'error': 'unknown_analysis'}
+    assert client.get(f"/api/records/query?analysis_id={body['analysis_id']}&sort=bogus").status_code == 400
+    for bad in ({'cure': [['garlic']]}, {'cure': 5}, {'cure': ['garlic', None]}, ['cure']):
+        res = client.post('/api/records/query', json={'analysis_id': body['analysis_id'], 'filters': bad})
+        assert res.status_code == 400 and res.get_json()['error'] == 'invalid_filters'
+    res = client.post('/api/records/query', json={'analysis_id': body['analysis_id'], 'filters': {'cure': 'garlic'}})
+    assert res.get_json()['total'] == 1
+
+
+def test_result_page_renders_first_page_only(monkeypatch):
+    from app import app
+    from config.settings import settings
+
+    monkeypatch.setattr(settings, 'RESULT_PAGE_SIZE', 5)
+    text = CorpusGenerator(seed=40).text(30)
+    html = app.test_client().post('/app', data={'text': text}).get_data(as_text=True)
+    assert html.count('<tr class="table-row-hover"') == 5
+    assert 'records-data-json' not in html and 'network-data-json' in html
+    analysis_id = html.split('data-analysis-id="')[1].split('"')[0]
+
+    res = app.test_client().get(f'/api/records/query?analysis_id={analysis_id}&page=2&page_size=5&sort=-outcome&facets=0')
+    data = res.get_json()
+    assert data['facets'] == {} and len(data['records']) == 5
+    outcomes = [r['outcome'] for r in app.test_client().get(
+        f'/api/records/query?analysis_id={analysis_id}&page_size=500&sort=-outcome').get_json()['records']]
+    assert outcomes == sorted(outcomes, reverse=True)
+
+
+def test_result_page_embeds_the_text_once(monkeypatch):
+    from app import app
+    from config.settings import settings
+
+    monkeypatch.setattr(settings, 'RESULT_PAGE_SIZE', 5)
+    text = 'Notes from the Zephyr valley\n' + CorpusGenerator(seed=43).text(30)
+    client = app.test_client()
+    html = client.post('/app', data={'text': text}).get_data(as_text=True)
+    assert html.count('Zephyr valley') == 1
+    analysis_id = html.split('data-analysis-id="')[1].split('"')[0]
+
+    # the cleaned text behind the records' offsets is fetched on demand
+    source = client.get(f'/api/records/source?analysis_id={analysis_id}').get_json()
+    records = client.get(f'/api/records/query?analysis_id={analysis_id}&page_size=5').get_json()['records']
+    assert source['clean_text'] == clean_text(text)
+    assert all(r['raw'] == source['clean_text'][r['start']:r['end']] for r in records)
+    assert client.get('/api/records/source?analysis_id=nope').status_code == 404
+
+
+def test_result_page_filters_cover_every_page(monkeypatch):
+    from app import app
+    from config.settings import settings
+
+    monkeypatch.setattr(settings, 'RESULT_PAGE_SIZE', 5)
+    text = CorpusGenerator(seed=42).text(60)
+    records = parse_records(clean_text(text))
+    client = app.test_client()
+    html = client.post('/app', data={'text': text}).get_data(as_text=True)
+    analysis_id = html.split('data-analysis-id="')[1].split('"')[0]
+    # the healer options come from the facet counts of every record, not the first page
+    healers = sorted({r['healer'] for r in records})
+    for healer in healers:
+        count = sum(r['healer'] == healer for r in records)
+        assert f'<option value="{healer}">{healer} ({count})</option>' in html
+
+    # what the page sends once a filter is chosen: page 1, then the next pages on scroll
+    query = {'analysis_id': analysis_id, 'sort': 'index', 'page_size': 5, 'facets': 0,
+             'filters': {'sentiment': ['positive']}}
+    first = client.post('/api/records/query', json=dict(query, page=1)).get_json()
+    second = client.post('/api/records/query', json=dict(query, page=2)).get_json()
+    assert first['total'] == sum(r['sentiment'] == 'positive' for r in records) > 5
+    assert all(r['sentiment'] == 'positive' for r in first['records'] + second['records'])
+
+
+def test_result_page_scrolls_on_another_worker(monkeypatch, tmp_path):
+    import app as app_module
+    from config.settings import settings
+
+    monkeypatch.setattr(settings, 'RESULT_PAGE_SIZE', 5)
+    monkeypatch.setattr(app_module, '_ANALYSES', make_store('file', str(tmp_path)))
+    client = app_module.app.test_client()
+    html = client.post('/app', data={'text': CorpusGenerator(seed=41).text(30)}).get_data(as_text=True)
+    analysis_id = html.split('data-analysis-id="')[1].split('"')[0]
+    # a worker that did not render the page, sharing the store's files
+    monkeypatch.setattr(app_module, '_ANALYSES', make_store('file', str(tmp_path)))
+    res = client.get(f'/api/records/query?analysis_id={analysis_id}&page=2&page_size=5&facets=0')
+    assert res.status_code == 200 and len(res.get_json()['records']) == 5
+    # an edit sent there is analyzed in full (the pipeline context stayed with the first worker)
+    res = client.post(f'/api/process?previous={analysis_id}', json={'text': 'Healer A used garlic for fever, it helped.'})
+    assert res.status_code == 200 and 'incremental' not in res.get_json()
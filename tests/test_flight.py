@@ -0,0 +1,163 @@
+# tests/test_flight.py
+"""
+Unit tests for coalescing of identical concurrent computations.
+"""
+import threading
+import time
+
+import pytest
+
+from src.utils.flight import FileLease, SharedFlight, SQLiteLease, fcntl, make_flight
+
+
+def _concurrent(flight, key, fn, n=8):
+    results, start = [], threading.Barrier(n)
+
+    def call():
+        start.wait()
+        results.append(flight.do(key, fn))
+
+    threads = [threading.Thread(target=call) for _ in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def _slow(calls, value='done'):
+    def fn():
+        calls.append(1)
+        time.sleep(0.05)
+        return value
+    return fn
+
+
+def test_threads_share_one_computation():
+    calls = []
+    results = _concurrent(SharedFlight(), 'k', _slow(calls))
+    assert len(calls) == 1
+    assert all(r == 'done' for r, _ in results)
+    assert sum(not shared for _, shared in results) == 1
+
+
+@pytest.mark.skipif(fcntl is None, reason='FileLease needs fcntl')
+def test_file_lease_hands_result_to_waiters(tmp_path):
+    lease = FileLease(str(tmp_path), result_ttl=5)
+    calls = []
+    results = _concurrent(SharedFlight(lease), 'k', _slow(calls))
+    assert len(calls) == 1 and {r for r, _ in results} == {'done'}
+    # a second "worker" arriving while the result is fresh still computes: it did not wait
+    assert FileLease(str(tmp_path), result_ttl=5).run('k', lambda: 'again') == ('again', False)
+
+
+def test_sqlite_lease_shares_across_connections(tmp_path):
+    path = str(tmp_path / 'flights.sqlite3')
+    leader, follower = SQLiteLease(path, poll_interval=0.01), SQLiteLease(path, poll_interval=0.01)
+    calls, out = [], {}
+    thread = threading.Thread(target=lambda: out.setdefault('leader', leader.run('k', _slow(calls, 42))))
+    thread.start()
+    time.sleep(0.01)
+    out['follower'] = follower.run('k', _slow(calls, 43))
+    thread.join()
+    assert out['leader'] == (42, False) and out['follower'] == (42, True) and len(calls) == 1
+
+
+def test_sqlite_lease_released_on_error(tmp_path):
+    lease = SQLiteLease(str(tmp_path / 'flights.sqlite3'))
+
+    def boom():
+        raise RuntimeError('boom')
+
+    with pytest.raises(RuntimeError):
+        lease.run('k', boom)
+    assert lease.run('k', lambda: 'ok') == ('ok', False)
+
+
+def test_make_flight_backends(tmp_path):
+    assert make_flight().lease is None
+    assert isinstance(make_flight('sqlite', str(tmp_path / 'f.sqlite3')).lease, SQLiteLease)
+
+
+def test_analyze_text_returns_independent_copies():
+    from src.services.processing_service import analyze_text
+
+    text = "Healer A used garlic for infection, it worked well."
+    first = analyze_text(text, mode='fast')
+    first.pop('records')
+    assert 'records' in analyze_text(text, mode='fast')
+
+
+def test_coalesced_callers_get_independent_nested_containers(monkeypatch):
+    from src.services import processing_service
+    from src.nlp.records import parse_records
+
+    records = parse_records("Healer A used garlic for infection, it worked well.")
+    shared = {'records': records, 'cures_pos_counts': {'garlic': 1}, 'keywords': ['garlic'],
+              'entities': {'healers': ['A']}, 'plain': [{'cure': 'garlic'}]}
+    started = threading.Event()
+
+    def slow(*args, **kwargs):
+        started.set()
+        time.sleep(0.1)
+        return shared
+
+    monkeypatch.setattr(processing_service, 'process_scrolls', slow)
+    monkeypatch.setattr(processing_service, '_FLIGHT', SharedFlight())
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(processing_service.analyze_text('x', mode='fast')))
+               for _ in range(2)]
+    threads[0].start()
+    started.wait()
+    threads[1].start()
+    for t in threads:
+        t.join()
+
+    first, second = results
+    first['records'].clear()
+    first['cures_pos_counts']['garlic'] += 5
+    first['keywords'].append('honey')
+    first['entities']['healers'].append('B')
+    first['plain'][0]['cure'] = 'honey'
+    assert second == shared and len(second['records']) == 1
+    assert shared['cures_pos_counts'] == {'garlic': 1} and shared['plain'] == [{'cure': 'garlic'}]
+    # Records themselves are shared (read-only; changed only through evolve())
+    assert second['records'][0] is records[0]
+
+
+def test_fresh_runs_with_context_are_coalesced(monkeypatch):
+    from src.services import processing_service
+    from src.utils.cache import SingleFlight
+
+    calls = []
+    started = threading.Event()
+
+    def slow(text, fields, **kwargs):
+        calls.append(kwargs['previous'])
+        started.set()
+        time.sleep(0.1)
+        return {'text': text, 'keywords': ['garlic'], 'cures_pos_counts': {'garlic': 1}, 'degraded': []}
+
+    monkeypatch.setattr(processing_service, 'run_pipeline', slow)
+    monkeypatch.setattr(processing_service, '_CONTEXT_FLIGHT', SingleFlight())
+    results = []
+
+    def submit():
+        results.append(processing_service.analyze_text_with_context('x', ['keywords', 'cures_pos_counts']))
+
+    threads = [threading.Thread(target=submit) for _ in range(2)]
+    threads[0].start()
+    started.wait()
+    threads[1].start()
+    for t in threads:
+        t.join()
+
+    assert calls == [None]
+    (first, first_ctx), (second, second_ctx) = results
+    assert first_ctx is second_ctx
+    first['keywords'].append('honey')
+    assert second['keywords'] == ['garlic'] and first_ctx['keywords'] == ['garlic']
+
+    # an incremental run (with a previous context) runs on its own
+    processing_service.analyze_text_with_context('y', ['keywords'], previous=first_ctx)
+    assert calls == [None, first_ctx]
@@ -0,0 +1,71 @@
+# tests/test_http.py
+"""
+Unit tests for response compression and ETag/304 handling.
+"""
+import gzip
+import json
+
+import pytest
+
+from src.utils.http import BROTLI_AVAILABLE, choose_encoding, compress, content_etag
+
+TEXT = "Healer A used garlic for infection, it worked well. Healer B used saltwater for fever - it did not help.\n" * 20
+
+
+def _quality(header):
+    accepted = dict(part.split(';q=') if ';q=' in part else (part, '1') for part in header.split(', '))
+    return lambda coding: float(accepted.get(coding, 0))
+
+
+def test_choose_encoding_prefers_quality_then_brotli():
+    assert choose_encoding(_quality('gzip')) == 'gzip'
+    assert choose_encoding(_quality('identity')) is None
+    assert choose_encoding(_quality('gzip, br'), allowed=('gzip',)) == 'gzip'
+    if BROTLI_AVAILABLE:
+        assert choose_encoding(_quality('gzip, br')) == 'br'
+        assert choose_encoding(_quality('gzip, br;q=0.5')) == 'gzip'
+
+
+def test_compress_round_trip():
+    body = TEXT.encode('utf-8')
+    assert gzip.decompress(compress(body, 'gzip')) == body
+    with pytest.raises(ValueError):
+        compress(body, 'zstd')
+
+
+def test_content_etag_separates_parts():
+    assert content_etag('ab', 'c') != content_etag('a', 'bc')
+    assert content_etag('x') == content_etag(b'x')
+
+
+def test_process_etag_and_not_modified():
+    from app import app
+
+    client = app.test_client()
+    res = client.post('/api/process?mode=fast', json={'text': TEXT})
+    etag = res.headers['ETag']
+    assert res.status_code == 200 and not etag.startswith('W/')
+
+    again = client.post('/api/process?mode=fast', json={'text': TEXT}, headers={'If-None-Match': etag})
+    assert again.status_code == 304 and again.get_data() == b''
+    other = client.post('/api/process?mode=fast', json={'text': TEXT + 'x'}, headers={'If-None-Match': etag})
+    assert other.status_code == 200
+    assert 'ETag' not in client.post('/api/process?mode=fast&timings=1', json={'text': TEXT}).headers
+
+
+def test_json_and_html_compressed_above_threshold():
+    from app import app
+
+    client = app.test_client()
+    res = client.post('/api/process?mode=fast', json={'text': TEXT}, headers={'Accept-Encoding': 'gzip'})
+    assert res.headers['Content-Encoding'] == 'gzip' and 'Accept-Encoding' in res.headers['Vary']
+    assert json.loads(gzip.decompress(res.get_data()))['mode'] == 'fast'
+    assert res.headers['ETag'].endswith('-gzip"')
+    # the compressed variant's ETag still validates
+    again = client.post('/api/process?mode=fast', json={'text': TEXT},
+                        headers={'Accept-Encoding': 'gzip', 'If-None-Match': res.headers['ETag']})
+    assert again.status_code == 304
+
+    page = client.post('/app', data={'text': TEXT}, headers={'Accept-Encoding': 'gzip'})
+    assert page.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Encoding' not in client.get('/health', headers={'Accept-Encoding': 'gzip'}).headers
@@ -0,0 +1,128 @@
+# tests/test_incremental.py
+"""
+Unit tests for incremental re-analysis of edited text.
+"""
+import json
+import random
+
+from benchmarks.corpus import CorpusGenerator
+from src.core.engine import PipelineEngine, Stage
+from src.core.nlp_pipeline import clean_text, process_scrolls, run_pipeline, select_fields
+from src.nlp.delta import reparse
+from src.nlp.records import parse_records
+
+LINES = [
+    "Healer A used garlic for infection, it worked well.",
+    "Healer B used saltwater for fever - it did not help.",
+    "Supplies ran low this week.",
+    "Healer C applied honey for wounds; the wound healed.",
+    "Healer A used garlic for infection, it worked well.",
+    "Dr. Old tried mint for cough, no improvement.",
+] * 5
+TEXT = '\n'.join(LINES)
+
+
+def _dicts(records):
+    return [dict(r) for r in records]
+
+
+def _edit(text, rnd):
+    words = text.split(' ')
+    for _ in range(rnd.randint(1, 3)):
+        i = rnd.randrange(len(words))
+        op = rnd.random()
+        if op < 0.3:
+            del words[i]
+        elif op < 0.7:
+            words.insert(i, rnd.choice(['Healer', 'Zed', 'used', 'honey', 'for', 'cough,', 'it', 'worked.', ';', '-']))
+        else:
+            words[i] = rnd.choice(['A.', 'tried', 'well.', 'Brother'])
+    return clean_text(' '.join(words))
+
+
+def test_reparse_matches_full_parse_after_random_edits():
+    rnd = random.Random(7)
+    old = clean_text(TEXT)
+    old_records = parse_records(old)
+    for _ in range(100):
+        new = _edit(old, rnd)
+        records, delta = reparse(old, old_records, new)
+        assert _dicts(records) == _dicts(parse_records(new))
+        assert len(delta.origin) == len(records)
+
+
+def test_one_line_edit_reparses_only_that_window():
+    old = clean_text(TEXT)
+    new = old.replace('Supplies ran low this week.', 'Healer Zed used honey for cough, it worked well.', 1)
+    records, delta = reparse(old, parse_records(old), new)
+    summary = delta.summary()
+    assert summary['lines'] < 8 and summary['records_added'] == 1
+    assert summary['records_kept'] == len(records) - 1
+    assert records[delta.added[0]]['healer'] == 'Zed'
+
+
+def test_incremental_run_equals_full_run_and_leaves_previous_intact():
+    previous = run_pipeline(TEXT)
+    before = _dicts(previous['records'])
+    edited = TEXT.replace('Healer B used saltwater', 'Healer B used willow bark', 1) + '\nHealer Q gave mint to patients with fever, it helped.'
+    ctx = run_pipeline(edited, previous=previous)
+    incremental, full = select_fields(ctx), process_scrolls(edited)
+    assert _dicts(incremental.pop('records')) == _dicts(full.pop('records'))
+    info = incremental.pop('incremental')
+    assert incremental == full
+    assert {'parse', 'classify', 'counts', 'vader'} <= set(info['patched'])
+    assert info['delta']['records_added'] == 2 and info['delta']['records_removed'] == 1
+    assert _dicts(previous['records']) == before
+
+
+def _ordered(result):
+    """JSON of a result with its records as dicts: equal only if key order matches too."""
+    return json.dumps(dict(result, records=_dicts(result.get('records', []))))
+
+
+def test_incremental_matches_full_run_over_random_edit_chains():
+    # each edit is re-analyzed against the previous edit's context, as with previous_id
+    rnd = random.Random(48)
+    for seed in range(4):
+        text = clean_text(CorpusGenerator(seed=seed).text(150))
+        ctx = run_pipeline(text)
+        for _ in range(50):
+            text = _edit(text, rnd)
+            ctx = run_pipeline(text, previous=ctx)
+            incremental = select_fields(ctx)
+            incremental.pop('incremental')
+            assert _ordered(incremental) == _ordered(process_scrolls(text))
+
+
+def test_unchanged_text_reuses_every_stage():
+    previous = run_pipeline(TEXT)
+    result = process_scrolls(TEXT + '  ', previous=previous)
+    assert result['incremental']['patched'] == ['clean']
+    assert 'parse' in result['incremental']['reused'] and result['records'] is previous['records']
+
+
+def test_mode_change_recomputes_instead_of_reusing():
+    previous = run_pipeline(TEXT, mode='fast')
+    result = process_scrolls(TEXT, mode='full', previous=previous)
+    assert 'keywords' not in result['incremental']['reused']
+    assert 'degraded' not in result
+
+
+def test_engine_reuses_only_stages_with_unchanged_inputs():
+    calls = []
+
+    def stage(name, inputs, outputs):
+        def fn(ctx):
+            calls.append(name)
+            return {k: ctx[inputs[0]] + name for k in outputs}
+        return Stage(name, inputs, outputs, fn)
+
+    engine = PipelineEngine([stage('a', ('text',), ('x',)), stage('b', ('x',), ('y',)),
+                             stage('c', ('text',), ('z',))])
+    previous = engine.run({'text': 'hi'})
+    calls.clear()
+    # the very same input object: nothing runs; a new text reruns everything downstream of it
+    ctx = engine.run({'text': previous['text']}, previous=previous)
+    assert calls == [] and ctx['reused'] == ['a', 'b', 'c']
+    ctx = engine.run({'text': 'ho'}, previous=previous)
+    assert calls == ['a', 'b', 'c'] and ctx['y'] == 'hoab'
@@ -0,0 +1,56 @@
+# tests/test_loadtest.py
+"""
+Unit tests for the load-test harness helpers and the Groq stub.
+"""
+import json
+import os
+import urllib.request
+
+import pytest
+from benchmarks.groq_stub import ANSWER, start_stub
+from benchmarks.loadtest import format_report, parse_mix, process_tree_rss, summarize
+
+
+def _post(url, payload):
+    req = urllib.request.Request(url, data=json.dumps(payload).encode('utf-8'),
+                                 headers={'Content-Type': 'application/json'})
+    return urllib.request.urlopen(req, timeout=5)
+
+
+def test_parse_mix():
+    assert parse_mix('process=5,ask=1') == [('process', 5.0), ('ask', 1.0)]
+    assert parse_mix('app') == [('app', 1.0)]
+    with pytest.raises(ValueError):
+        parse_mix('nope=1')
+
+
+def test_groq_stub_plain_and_streamed():
+    server = start_stub(0, latency_ms=10)
+    url = f'http://127.0.0.1:{server.server_address[1]}/v1/chat/completions'
+    try:
+        with _post(url, {'messages': []}) as resp:
+            assert json.loads(resp.read())['choices'][0]['message']['content'] == ANSWER
+        with _post(url, {'messages': [], 'stream': True}) as resp:
+            frames = [line for line in resp.read().decode('utf-8').split('\n') if line.startswith('data:')]
+        assert frames[-1] == 'data: [DONE]'
+        text = ''.join(json.loads(f[5:])['choices'][0]['delta']['content'] for f in frames[:-1])
+        assert text == ANSWER
+    finally:
+        server.shutdown()
+
+
+def test_summarize_percentiles_and_errors():
+    samples = {'process': [(0.01 * i, i % 10 != 0) for i in range(1, 101)]}
+    report = summarize(samples, elapsed=10.0, rss=[(0.0, 100.0), (1.0, 140.0), (2.0, 120.0)])
+    s = report['endpoints']['process']
+    assert s['requests'] == 100
+    assert s['rps'] == pytest.approx(10.0)
+    assert s['p50_ms'] == pytest.approx(500.0)
+    assert s['p99_ms'] == pytest.approx(990.0)
+    assert s['error_rate'] == pytest.approx(0.1)
+    assert report['rss_summary'] == {'start': 100.0, 'peak': 140.0, 'end': 120.0}
+    assert 'overall' in format_report(report)
+
+
+def test_process_tree_rss_of_self():
+    assert process_tree_rss(os.getpid()) > 0
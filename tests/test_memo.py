@@ -0,0 +1,61 @@
+# tests/test_memo.py
+"""
+Unit tests for the cross-request line memo.
+"""
+import pytest
+
+from src.nlp.memo import LineMemo
+from src.nlp.records import parse_records
+from src.nlp.rule_based import LINE_MEMO, ParsedLine, parse_line, parse_text, split_lines
+
+LINE = "Healer A used garlic for infection, it worked well."
+TEXT = f"{LINE}\n{LINE}\nHealer B used saltwater for fever - it did not help.\n{LINE}"
+
+
+@pytest.fixture
+def memo():
+    LINE_MEMO.clear()
+    yield LINE_MEMO
+    LINE_MEMO.clear()
+
+
+def test_duplicates_computed_once_and_cached():
+    calls = []
+
+    def compute(lines):
+        calls.append(list(lines))
+        return [len(line) for line in lines]
+
+    m = LineMemo(maxsize=10)
+    assert m.map(['a', 'bb', 'a', 'a'], compute) == [1, 2, 1, 1]
+    assert m.map(['bb', 'ccc'], compute) == [2, 3]
+    assert calls == [['a', 'bb'], ['ccc']]
+    assert m.stats() == {'size': 3, 'maxsize': 10, 'hits': 1, 'misses': 3, 'duplicates': 2, 'hit_rate': 0.5}
+
+
+def test_bounded_and_disabled():
+    m = LineMemo(maxsize=2)
+    m.map(['a', 'b', 'c'], lambda lines: [None] * len(lines))
+    assert len(m) == 2
+    m.resize(0)
+    calls = []
+    assert m.map(['x', 'x'], lambda lines: calls.append(lines) or [1]) == [1, 1]
+    assert calls == [['x']] and len(m) == 0
+
+
+def test_parse_text_matches_uncached_parse(memo):
+    expected = [rec for rec in map(parse_line, split_lines(TEXT)) if rec is not None]
+    assert parse_text(TEXT) == expected
+    assert parse_text(TEXT) == expected
+    stats = memo.stats()
+    assert stats['misses'] == 2 and stats['hits'] == 2 and stats['duplicates'] == 4
+
+
+def test_cached_values_are_immutable_and_records_independent(memo):
+    first = parse_records(TEXT)
+    first[0]['cure'] = 'honey'
+    second = parse_records(TEXT)
+    assert second[0]['cure'] == 'garlic' and second[1]['start'] != second[0]['start']
+    assert isinstance(next(iter(memo._data.values())), ParsedLine)
+    parse_text(TEXT)[0]['cure'] = 'honey'
+    assert parse_text(TEXT)[0]['cure'] == 'garlic'
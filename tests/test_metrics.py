@@ -0,0 +1,55 @@
+# tests/test_metrics.py
+"""
+Unit tests for stage timers and Prometheus rendering.
+"""
+import pytest
+from src.utils.metrics import Registry, STAGE_SECONDS, collect_timings, size_class, timed_stage
+
+
+def test_size_class_buckets():
+    assert size_class(None) == ''
+    assert size_class(0) == '0'
+    assert size_class(42) == '<=100'
+    assert size_class(5_000) == '<=10k'
+    assert size_class(50_000_000) == '>10M'
+
+
+def test_histogram_renders_prometheus_text():
+    reg = Registry()
+    h = reg.histogram('demo_seconds', 'Demo latency.', labelnames=('stage',), buckets=(0.1, 1.0))
+    h.observe(0.05, stage='parse')
+    h.observe(0.5, stage='parse')
+    h.observe(5.0, stage='parse')
+    text = reg.render()
+    assert '# TYPE demo_seconds histogram' in text
+    assert 'demo_seconds_bucket{stage="parse",le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{stage="parse",le="1.0"} 2' in text
+    assert 'demo_seconds_bucket{stage="parse",le="+Inf"} 3' in text
+    assert 'demo_seconds_count{stage="parse"} 3' in text
+
+
+def test_counter_labels_are_escaped():
+    reg = Registry()
+    c = reg.counter('demo_total', 'Demo counter.', labelnames=('route',))
+    c.inc(route='a"b')
+    c.inc(2, route='a"b')
+    assert 'demo_total{route="a\\"b"} 3.0' in reg.render()
+
+
+def test_timed_stage_records_histogram_and_timings():
+    before = STAGE_SECONDS.count(stage='unit_test_stage', records='<=100', bytes='<=1k')
+    with collect_timings() as timings:
+        with timed_stage('unit_test_stage', nbytes=500) as st:
+            st['records'] = 3
+        with timed_stage('unit_test_stage', records=1, nbytes=10):
+            pass
+    assert 'unit_test_stage' in timings
+    assert timings['unit_test_stage'] >= 0
+    assert STAGE_SECONDS.count(stage='unit_test_stage', records='<=100', bytes='<=1k') == before + 1
+
+
+def test_timed_stage_outside_collection_and_on_error():
+    with pytest.raises(RuntimeError):
+        with timed_stage('unit_test_failing'):
+            raise RuntimeError('boom')
+    assert STAGE_SECONDS.count(stage='unit_test_failing', records='', bytes='') >= 1
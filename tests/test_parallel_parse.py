@@ -0,0 +1,32 @@
+# tests/test_parallel_parse.py
+"""
+Parallel parsing must return exactly what serial parsing returns.
+"""
+from benchmarks.corpus import CorpusGenerator
+from src.nlp import parallel
+from src.nlp.parallel import chunk_lines, parse_text_parallel
+from src.nlp.rule_based import parse_text
+
+
+def test_chunk_lines_keeps_order_and_every_line():
+    lines = [str(i) for i in range(10)]
+    chunks = chunk_lines(lines, 3)
+    assert len(chunks) == 3
+    assert [line for c in chunks for line in c] == lines
+    assert chunk_lines([], 4) == []
+
+
+def test_parallel_matches_serial():
+    text = CorpusGenerator(seed=11).text(3000)
+    try:
+        assert parse_text_parallel(text, workers=2, min_bytes=0) == parse_text(text)
+    finally:
+        parallel.shutdown()
+
+
+def test_small_text_skips_pool(monkeypatch):
+    def no_pool(workers):
+        raise AssertionError('pool used for a small text')
+    monkeypatch.setattr(parallel, '_get_pool', no_pool)
+    text = 'Healer A used garlic for infection, it worked well.'
+    assert parse_text_parallel(text, workers=4) == parse_text(text)
@@ -0,0 +1,97 @@
+# tests/test_profiling.py
+"""
+Unit tests for the opt-in request profiler.
+"""
+import hashlib
+import json
+import os
+import pstats
+import time
+
+import pytest
+from src.utils.profiling import RequestProfiler
+
+
+def test_should_profile_requires_matching_token(tmp_path):
+    prof = RequestProfiler(str(tmp_path), token='s3cret')
+    assert prof.should_profile('s3cret') == (True, 'admin')
+    assert prof.should_profile('wrong') == (False, '')
+    assert prof.should_profile(None) == (False, '')
+
+
+def test_empty_token_never_authorizes(tmp_path):
+    prof = RequestProfiler(str(tmp_path), token='')
+    assert prof.should_profile('') == (False, '')
+
+
+def test_sampling_rate(tmp_path):
+    prof = RequestProfiler(str(tmp_path), sample_rate=0.01, rng=lambda: 0.005)
+    assert prof.should_profile(None) == (True, 'sampled')
+    prof = RequestProfiler(str(tmp_path), sample_rate=0.01, rng=lambda: 0.5)
+    assert prof.should_profile(None) == (False, '')
+
+
+def test_run_stores_profile_and_input_hash(tmp_path):
+    prof = RequestProfiler(str(tmp_path), token='t')
+    body = b'Healer A used garlic for infection, it worked.'
+    result, profile_id = prof.run(lambda: sum(range(1000)), body, {'path': '/api/process'})
+    assert result == sum(range(1000))
+    with open(os.path.join(tmp_path, profile_id + '.json'), encoding='utf-8') as f:
+        meta = json.load(f)
+    assert meta['id'] == profile_id
+    assert meta['path'] == '/api/process'
+    assert meta['input_sha256'] == hashlib.sha256(body).hexdigest()
+    assert meta['input_bytes'] == len(body)
+    stats = pstats.Stats(os.path.join(tmp_path, profile_id + '.prof'))
+    assert stats.total_calls > 0
+
+
+def test_run_saves_profile_when_view_fails(tmp_path):
+    prof = RequestProfiler(str(tmp_path))
+
+    def boom():
+        raise ValueError('bad input')
+
+    with pytest.raises(ValueError):
+        prof.run(boom, b'x')
+    metas = [f for f in os.listdir(tmp_path) if f.endswith('.json')]
+    assert len(metas) == 1
+
+
+def test_save_prunes_old_and_excess_profiles(tmp_path):
+    prof = RequestProfiler(str(tmp_path), token='t', max_files=3, max_age=3600)
+    stale = tmp_path / '20200101-000000-deadbeef'
+    for ext in ('.prof', '.json'):
+        path = stale.with_suffix(ext)
+        path.write_text('{}')
+        os.utime(path, (time.time() - 7200,) * 2)
+    tmp_path.joinpath('notes.txt').write_text('kept')
+
+    ids = []
+    for i in range(5):
+        ids.append(prof.run(lambda: None, b'x')[1])
+        time.sleep(0.02)  # distinct mtimes (coarse on some filesystems)
+    names = set(os.listdir(tmp_path))
+    assert names == {f'{pid}{ext}' for pid in ids[-3:] for ext in ('.prof', '.json')} | {'notes.txt'}
+
+    unlimited = RequestProfiler(str(tmp_path), token='t', max_files=0, max_age=0)
+    unlimited.run(lambda: None, b'x')
+    assert len([n for n in os.listdir(tmp_path) if n.endswith('.json')]) == 4
+
+
+def test_get_requests_do_not_consume_samples(tmp_path, monkeypatch):
+    import app as app_module
+
+    draws = []
+
+    def rng():
+        draws.append(1)
+        return 0.0
+
+    monkeypatch.setattr(app_module, '_PROFILER', RequestProfiler(str(tmp_path), sample_rate=1.0, rng=rng))
+    client = app_module.app.test_client()
+    res = client.get('/app')
+    assert res.status_code == 200 and 'X-Profile-Id' not in res.headers and draws == []
+
+    res = client.post('/app', data={'text': 'Healer A used garlic for infection, it worked well.'})
+    assert 'X-Profile-Id' in res.headers and draws == [1]
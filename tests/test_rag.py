@@ -0,0 +1,138 @@
+# tests/test_rag.py
+"""
+Tests for /ask-rag: JSON answers and the server-sent-event stream, against the local Groq stub.
+"""
+import json
+import threading
+
+import pytest
+import requests
+
+import app as app_module
+from benchmarks.groq_stub import ANSWER, start_stub
+from config.settings import settings
+
+NOTES = "Healer A used garlic for infection, it worked well. Healer B used willow bark for fever, it helped."
+
+
+@pytest.fixture
+def client(monkeypatch):
+    server = start_stub(0, latency_ms=10)
+    monkeypatch.setattr(settings, 'GROQ_API_URL', f'http://127.0.0.1:{server.server_address[1]}/v1/chat/completions')
+    monkeypatch.setattr(app_module, 'GROQ_API_KEY', 'stub')
+    app_module._RAG_ANSWER_CACHE.clear()
+    try:
+        yield app_module.app.test_client()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _events(body):
+    """``[(event, data), ...]`` of an SSE body (event is None for default frames)."""
+    events = []
+    for frame in body.decode('utf-8').split('\n\n'):
+        if not frame.strip():
+            continue
+        event, data = None, None
+        for line in frame.split('\n'):
+            if line.startswith('event: '):
+                event = line[len('event: '):]
+            elif line.startswith('data: '):
+                data = json.loads(line[len('data: '):])
+        events.append((event, data))
+    return events
+
+
+def _ask(client, question='Which cure worked best?', stream=True):
+    return client.post('/ask-rag' + ('?stream=1' if stream else ''), json={'question': question, 'text': NOTES})
+
+
+def test_json_answer(client):
+    res = _ask(client, stream=False)
+    assert res.status_code == 200 and res.get_json()['answer'] == ANSWER
+
+
+def test_stream_deltas_then_done_then_cached(client):
+    res = _ask(client)
+    assert res.mimetype == 'text/event-stream'
+    events = _events(res.get_data())
+    deltas = [data['delta'] for event, data in events if event is None]
+    assert len(deltas) > 1 and ''.join(deltas) == ANSWER
+    assert events[-1][0] == 'done' and events[-1][1]['answer'] == ANSWER and 'cached' not in events[-1][1]
+
+    # the same question is answered from the cache in one delta
+    events = _events(_ask(client).get_data())
+    assert events == [(None, {'delta': ANSWER}),
+                      ('done', {'answer': ANSWER, 'question': 'Which cure worked best?', 'cached': True})]
+
+
+class _Upstream:
+    """requests.Response stand-in: ``lines`` are yielded, then ``error`` (if any) is raised."""
+
+    def __init__(self, status_code=200, lines=(), error=None):
+        self.status_code, self.text, self.lines, self.error = status_code, 'upstream says no', lines, error
+        self.closed = False
+
+    def iter_lines(self, decode_unicode=False):
+        yield from self.lines
+        if self.error is not None:
+            raise self.error
+
+    def close(self):
+        self.closed = True
+
+
+def _frame(content):
+    return 'data: ' + json.dumps({'choices': [{'delta': {'content': content}}]})
+
+
+def test_stream_upstream_error_status(client, monkeypatch):
+    upstream = _Upstream(status_code=503)
+    monkeypatch.setattr(requests, 'post', lambda *a, **kw: upstream)
+    events = _events(_ask(client).get_data())
+    assert events == [('error', {'error': 'Groq API error: 503 upstream says no'})]
+    assert upstream.closed
+
+
+def test_stream_failure_mid_stream_sends_error_frame(client, monkeypatch):
+    upstream = _Upstream(lines=[_frame('Willow'), _frame(' bark')],
+                         error=requests.exceptions.ChunkedEncodingError('connection broken'))
+    monkeypatch.setattr(requests, 'post', lambda *a, **kw: upstream)
+    events = _events(_ask(client, question='What helped the fever?').get_data())
+    assert events[:2] == [(None, {'delta': 'Willow'}), (None, {'delta': ' bark'})]
+    assert events[-1][0] == 'error' and 'interrupted' in events[-1][1]['error']
+    assert upstream.closed
+    # a partial answer is not cached
+    assert app_module._RAG_ANSWER_CACHE.get(app_module._rag_cache_key('What helped the fever?', NOTES)) is None
+
+
+def test_concurrent_identical_streams_share_one_upstream_call(client, monkeypatch):
+    real_post = requests.post
+    calls = []
+
+    def counting_post(*args, **kwargs):
+        calls.append(kwargs.get('stream', False))
+        return real_post(*args, **kwargs)
+
+    monkeypatch.setattr(requests, 'post', counting_post)
+    bodies = []
+
+    def ask(stream):
+        res = _ask(app_module.app.test_client(), question='Which cure helped most?', stream=stream)
+        bodies.append((stream, res.get_data()))
+
+    threads = [threading.Thread(target=ask, args=(stream,)) for stream in (True, True, True, False)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    for stream, body in bodies:
+        if not stream:
+            assert json.loads(body)['answer'] == ANSWER
+            continue
+        events = _events(body)
+        assert ''.join(data['delta'] for event, data in events if event is None) == ANSWER
+        assert events[-1][0] == 'done' and events[-1][1]['answer'] == ANSWER
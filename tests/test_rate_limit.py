@@ -0,0 +1,71 @@
+# tests/test_rate_limit.py
+"""
+Unit tests for the token-bucket rate limiter.
+"""
+import pytest
+from src.utils.rate_limit import MemoryBucketStore, RateLimiter, SQLiteBucketStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_limiter_allows_burst_then_blocks():
+    clock = FakeClock()
+    limiter = RateLimiter(per_minute=3, clock=clock)
+    assert [limiter.check('1.2.3.4')[0] for _ in range(3)] == [True, True, True]
+    allowed, retry_after = limiter.check('1.2.3.4')
+    assert not allowed
+    assert retry_after == pytest.approx(20.0)
+    # other clients have their own bucket
+    assert limiter.check('5.6.7.8')[0]
+
+
+def test_limiter_refills_over_time():
+    clock = FakeClock()
+    limiter = RateLimiter(per_minute=60, burst=1, clock=clock)
+    assert limiter.check('ip')[0]
+    assert not limiter.check('ip')[0]
+    clock.now += 1.0
+    assert limiter.check('ip')[0]
+
+
+def test_disabled_limiter_always_allows():
+    limiter = RateLimiter(per_minute=0)
+    assert all(limiter.check('ip')[0] for _ in range(100))
+
+
+def test_memory_store_evicts_idle_buckets():
+    clock = FakeClock()
+    store = MemoryBucketStore(idle_ttl=60, maxsize=1000)
+    limiter = RateLimiter(per_minute=10, store=store, clock=clock)
+    for i in range(50):
+        limiter.check(f'ip-{i}')
+    assert len(store) == 50
+    clock.now += 61
+    limiter.check('fresh')
+    assert len(store) == 1
+
+
+def test_memory_store_is_size_bounded():
+    store = MemoryBucketStore(idle_ttl=3600, maxsize=10)
+    limiter = RateLimiter(per_minute=10, store=store)
+    for i in range(100):
+        limiter.check(f'ip-{i}')
+    assert len(store) <= 11
+
+
+def test_sqlite_store_is_shared_between_limiters(tmp_path):
+    clock = FakeClock()
+    path = str(tmp_path / 'rl.sqlite3')
+    # two limiters on the same file behave like two workers sharing one budget
+    a = RateLimiter(per_minute=2, store=SQLiteBucketStore(path), name='rag', clock=clock)
+    b = RateLimiter(per_minute=2, store=SQLiteBucketStore(path), name='rag', clock=clock)
+    assert a.check('ip')[0]
+    assert b.check('ip')[0]
+    assert not a.check('ip')[0]
+    assert not b.check('ip')[0]
@@ -0,0 +1,63 @@
+# tests/test_records.py
+"""
+Unit tests for the span-based Record type.
+"""
+import json
+import pickle
+
+from benchmarks.corpus import CorpusGenerator
+from src.core.nlp_pipeline import clean_text
+from src.nlp import parallel
+from src.nlp.records import line_spans, parse_records, to_serializable
+from src.nlp.rule_based import parse_text
+
+TEXT = clean_text("Healer A used garlic for infection, it worked well.\nHealer B used saltwater for fever — it didn't help.")
+
+
+def _plain(rec):
+    return {k: v for k, v in rec.items() if k not in ('start', 'end')}
+
+
+def test_records_match_parse_text():
+    text = clean_text(CorpusGenerator(seed=3).text(2000))
+    assert [_plain(r) for r in parse_records(text)] == parse_text(text)
+
+
+def test_spans_point_into_source():
+    for rec in parse_records(TEXT):
+        assert TEXT[rec['start']:rec['end']] == rec['raw']
+        assert rec['outcome'] in rec['raw']
+    assert len(line_spans(TEXT)) == 2
+
+
+def test_record_reads_like_a_dict():
+    rec = parse_records(TEXT)[0]
+    assert rec.get('cure') == 'garlic' and rec['healer'] == 'A'
+    assert rec.get('classification') is None and 'classification' not in rec
+    rec['classification'] = 'effective'
+    assert list(rec)[-1] == 'classification'
+    copy = rec.copy()
+    copy['similarity_score'] = 1.0  # callers may extend the plain-dict copy
+    assert isinstance(copy, dict) and 'similarity_score' not in rec
+
+
+def test_evolve_leaves_original_untouched():
+    rec = parse_records(TEXT)[0]
+    new = rec.evolve(cure='garlic clove')
+    assert new['cure'] == 'garlic clove' and rec['cure'] == 'garlic'
+    assert new['raw'] == rec['raw']
+
+
+def test_serialization_materializes_strings():
+    recs = parse_records(TEXT)
+    data = json.loads(json.dumps(recs, default=to_serializable))
+    assert data[1]['outcome'] == recs[1]['outcome']
+    assert pickle.loads(pickle.dumps(recs[0])) == recs[0].to_dict()
+
+
+def test_parallel_records_match_serial():
+    text = clean_text(CorpusGenerator(seed=4).text(2000))
+    try:
+        assert parallel.parse_records_parallel(text, workers=2, min_bytes=0) == parse_records(text)
+    finally:
+        parallel.shutdown()
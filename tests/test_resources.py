@@ -0,0 +1,81 @@
+# tests/test_resources.py
+"""
+Unit tests for optional-dependency checks, lazy loaders and the offline resource bootstrap.
+"""
+import threading
+import zipfile
+
+from src.utils.resources import (NLTK_RESOURCES, Lazy, bootstrap, main, module_available, nltk_data_dirs,
+                                 nltk_resource_available)
+
+
+def test_module_available_does_not_import():
+    assert module_available('json')
+    assert not module_available('no_such_module_xyz')
+    assert not module_available('no_such_package_xyz.sub')
+
+
+def test_lazy_builds_once_and_caches_failures():
+    calls = []
+
+    def build():
+        calls.append(1)
+        return object()
+
+    lazy = Lazy(build)
+    assert not lazy.loaded
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(lazy())) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1 and len({id(r) for r in results}) == 1 and lazy.loaded
+
+    def broken():
+        calls.append(1)
+        raise ImportError('missing model')
+
+    failing = Lazy(broken, default='fallback')
+    assert failing() == 'fallback' and failing() == 'fallback'
+    assert len(calls) == 2
+
+
+def _nltk_package(path, name, member='lexicon.txt'):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with zipfile.ZipFile(path, 'w') as zf:
+        zf.writestr(f'{name}/{member}', 'data')
+
+
+def test_bootstrap_installs_nltk_data_from_local_source(tmp_path, monkeypatch):
+    target = tmp_path / 'nltk_data'
+    monkeypatch.setattr('src.utils.resources.nltk_data_dirs', lambda: [str(target)])
+    source = tmp_path / 'mirror'
+    # a downloader mirror layout and a flat one
+    _nltk_package(source / 'packages' / 'sentiment' / 'vader_lexicon.zip', 'vader_lexicon')
+    _nltk_package(source / 'stopwords.zip', 'stopwords', 'english')
+
+    assert not nltk_resource_available(NLTK_RESOURCES['vader_lexicon'])
+    report = bootstrap(str(source), nltk=['vader_lexicon', 'stopwords', 'punkt'], spacy_models=())
+    assert [(r.name, r.status) for r in report] == [
+        ('vader_lexicon', 'installed'), ('stopwords', 'installed'), ('punkt', 'missing')]
+    assert (target / 'sentiment' / 'vader_lexicon.zip').is_file()
+    assert (target / 'corpora' / 'stopwords' / 'english').is_file()
+    assert nltk_resource_available(NLTK_RESOURCES['vader_lexicon'])
+
+    # a second run only verifies
+    report = bootstrap(str(source), nltk=['vader_lexicon'], spacy_models=())
+    assert report[0].status == 'present'
+
+
+def test_bootstrap_cli_exit_status(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr('src.utils.resources.nltk_data_dirs', lambda: [str(tmp_path)])
+    assert main(['--nltk', 'punkt', '--spacy', '']) == 1
+    (tmp_path / 'tokenizers' / 'punkt').mkdir(parents=True)
+    assert main(['--nltk', 'punkt', '--spacy', '']) == 0
+    assert 'present' in capsys.readouterr().out
+
+
+def test_nltk_data_dirs_honours_env(monkeypatch, tmp_path):
+    monkeypatch.setenv('NLTK_DATA', str(tmp_path))
+    assert nltk_data_dirs()[0] == str(tmp_path)
@@ -0,0 +1,55 @@
+# tests/test_serialization.py
+"""
+Unit tests for the pluggable JSON encoder.
+"""
+import json
+
+import pytest
+
+from src.nlp.records import parse_records
+from src.utils import serialization
+
+np = pytest.importorskip('numpy')
+
+RECORDS = parse_records("Healer A used garlic for infection, it worked well.")
+VALUE = {
+    'records': RECORDS,
+    'scores': np.array([0.5, -0.25], dtype=np.float32),
+    'count': np.int64(3),
+    'ok': np.bool_(True),
+    'tags': ('a', 'b'),
+    'unicode': 'fièvre — thé',
+}
+EXPECTED = {'records': [RECORDS[0].to_dict()], 'scores': [0.5, -0.25], 'count': 3, 'ok': True,
+            'tags': ['a', 'b'], 'unicode': 'fièvre — thé'}
+
+
+@pytest.fixture
+def restore_backend():
+    previous = serialization.backend()
+    yield
+    serialization.configure(previous)
+
+
+@pytest.mark.parametrize('name', ['stdlib', 'orjson'])
+def test_backends_encode_records_and_numpy(name, restore_backend):
+    if name == 'orjson':
+        pytest.importorskip('orjson')
+    assert serialization.configure(name) == name
+    data = serialization.dumps(VALUE)
+    assert json.loads(data) == EXPECTED
+    assert 'fièvre'.encode('utf-8') in data  # not \u-escaped
+
+
+def test_orjson_falls_back_for_unsupported_arrays(restore_backend):
+    pytest.importorskip('orjson')
+    serialization.configure('orjson')
+    strided = np.arange(6)[::2]
+    assert json.loads(serialization.dumps({'x': strided, 'o': np.array(['a'], dtype=object)})) == {'x': [0, 2, 4], 'o': ['a']}
+
+
+def test_unknown_backend_rejected():
+    with pytest.raises(ValueError):
+        serialization.configure('simdjson')
+    with pytest.raises(TypeError):
+        serialization.dumps(object())
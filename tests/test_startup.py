@@ -0,0 +1,31 @@
+# tests/test_startup.py
+"""
+Tests for the cold-start benchmark and the import-time budget of the app.
+"""
+from benchmarks.startup import HEAVY, cold_start, format_report, parse_importtime, summarize
+
+IMPORTTIME = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:      2343 |     235523 |   plotly.express
+import time:      6486 |     209644 | app
+"""
+
+
+def test_parse_importtime():
+    assert parse_importtime(IMPORTTIME) == [('_io', 120, 120), ('plotly.express', 2343, 235523), ('app', 6486, 209644)]
+
+
+def test_summarize_and_report():
+    runs = [{'import_ms': 200.0, 'first_request_ms': 20.0, 'cold_start_ms': 220.0, 'heavy': []},
+            {'import_ms': 300.0, 'first_request_ms': 30.0, 'cold_start_ms': 330.0, 'heavy': ['plotly']}]
+    summary = summarize(runs)
+    assert summary['cold_start_ms'] == {'p50': 220.0, 'max': 330.0}
+    assert summary['heavy'] == ['plotly']
+    report = format_report(summary, target_ms=200)
+    assert 'OVER TARGET' in report and 'plotly' in report
+
+
+def test_app_import_leaves_heavy_libraries_unloaded():
+    run = cold_start('Healer A used garlic for infection, it worked well.', heavy=HEAVY)
+    assert run['status'] == 200
+    assert run['heavy'] == []
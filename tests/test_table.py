@@ -0,0 +1,107 @@
+# tests/test_table.py
+"""
+Unit tests for the columnar RecordTable.
+"""
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from benchmarks.corpus import CorpusGenerator  # noqa: E402
+from src.core.nlp_pipeline import clean_text, count_cures, process_scrolls  # noqa: E402
+from src.nlp.records import parse_records  # noqa: E402
+from src.nlp.rule_based import parse_text  # noqa: E402
+from src.nlp.table import RecordTable  # noqa: E402
+
+TEXT = CorpusGenerator(seed=21).text(500)
+
+
+def test_round_trips_list_of_dicts():
+    records = parse_text(TEXT)
+    assert RecordTable.from_records(records).to_records() == records
+
+
+def test_records_share_source_text_as_pool():
+    text = clean_text(TEXT)
+    records = parse_records(text)
+    table = RecordTable.from_records(records)
+    assert table.pool.startswith(text)
+    assert table.to_records() == [r.to_dict() for r in records]
+
+
+def test_cure_counts_match_count_cures():
+    records = parse_text(TEXT)
+    assert RecordTable.from_records(records).cure_counts() == count_cures(records)
+
+
+def test_filter_and_value_counts():
+    records = parse_text(TEXT)
+    table = RecordTable.from_records(records)
+    positive = table.filter(sentiment='positive')
+    assert len(positive) == sum(1 for r in records if r['sentiment'] == 'positive')
+    assert set(positive.column('sentiment')) == {'positive'}
+    either = table.mask(sentiment=['positive', 'negative'], healer='no such healer')
+    assert not either.any()
+    counts = table.value_counts('sentiment')
+    assert sum(counts.values()) == len(records)
+
+
+def test_scores_and_mean():
+    records = parse_text(TEXT)[:3]
+    table = RecordTable.from_records(records, scores=[1.0, 0.0, -1.0])
+    assert table.record(0)['score'] == 1.0
+    by_sentiment = {}
+    for rec, score in zip(records, [1.0, 0.0, -1.0]):
+        by_sentiment.setdefault(rec['sentiment'], []).append(score)
+    expected = {k: sum(v) / len(v) for k, v in by_sentiment.items()}
+    assert table.mean_score('sentiment') == pytest.approx(expected)
+    with pytest.raises(ValueError):
+        RecordTable.from_records(records, scores=[1.0])
+
+
+def test_pipeline_table_field():
+    res = process_scrolls(TEXT, ['table', 'cures_pos_counts'])
+    assert res['table'].cure_counts()[0] == res['cures_pos_counts']
+
+
+def test_pair_counts_match_crosstab():
+    table = RecordTable.from_records(parse_text(TEXT))
+    matrix = table.crosstab('healer', 'cure')
+    pairs = table.pair_counts('healer', 'cure')
+    assert sum(n for _, _, n in pairs) == len(table) == matrix.sum()
+    h, c, n = pairs[0]
+    assert n == matrix.max()
+    assert n == matrix[table.dictionaries['healer'].lookup(h), table.dictionaries['cure'].lookup(c)]
+    assert len(table.pair_counts('healer', 'cure', limit=3)) == 3
+
+
+def test_running_effectiveness_is_thinned_cumulative_score():
+    records = parse_text(TEXT)
+    table = RecordTable.from_records(records)
+    series = table.running_effectiveness(top=2, max_points=10)
+    assert list(series) == list(table.value_counts('cure'))[:2]
+    cure = next(iter(series))
+    steps = {'positive': 1, 'negative': -1}
+    full = [i for i, r in enumerate(records) if r['cure'] == cure]
+    assert len(series[cure]['x']) <= 10 and series[cure]['x'][-1] == full[-1]
+    assert series[cure]['y'][-1] == sum(steps.get(records[i]['sentiment'], 0) for i in full)
+
+
+def test_to_columnar_decodes_to_records():
+    text = clean_text(TEXT)
+    records = parse_records(text)
+    cols = RecordTable.from_records(records).to_columnar()['columns']
+    for i in (0, len(records) - 1):
+        for name in ('healer', 'cure', 'sentiment'):
+            assert cols[name]['dictionary'][cols[name]['codes'][i]] == records[i][name]
+        assert cols['raw'][i] == records[i]['raw'] and cols['start'][i] == records[i]['start']
+    assert RecordTable.from_records(parse_text(TEXT)).to_columnar()['columns']['start'][0] is None
+
+
+def test_process_columnar_format():
+    from app import app
+
+    client = app.test_client()
+    res = client.post('/api/process?format=columnar&original_text=0&mode=fast', json={'text': TEXT})
+    body = res.get_json()
+    assert 'original_text' not in body and body['records']['length'] == len(parse_text(TEXT))
+    assert client.post('/api/process?format=xml', json={'text': TEXT}).status_code == 400